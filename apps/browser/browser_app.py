@@ -4,17 +4,21 @@ Web Browser Application with Touch Keyboard
 
 import pygame
 from config import settings
+from ui.fonts import get_font
+from ui.text_cache import render_text
 from ui.widgets.keyboard import OnScreenKeyboard
 
 class BrowserApp:
+    tracks_damage = True
+    
     def __init__(self, screen_manager):
         self.screen_manager = screen_manager
         self.name = "Browser"
         self.icon = "🌐"
         
-        self.font_small = pygame.font.Font(None, settings.FONTS['SMALL'])
-        self.font_medium = pygame.font.Font(None, settings.FONTS['MEDIUM'])
-        self.font_large = pygame.font.Font(None, settings.FONTS['LARGE'])
+        self.font_small = get_font(settings.FONTS['SMALL'])
+        self.font_medium = get_font(settings.FONTS['MEDIUM'])
+        self.font_large = get_font(settings.FONTS['LARGE'])
         
         self.url = "https://www.example.com"
         self.bookmarks = [
@@ -27,12 +31,11 @@ class BrowserApp:
         self.page_content = "Welcome to the browser!\n\nThis is a simple web browser.\nEnter a URL to browse."
     
     def handle_event(self, event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            self.screen_manager.mark_dirty()
+        
         if self.keyboard.visible:
-            window_width = self.screen_manager.window.get_width()
-            bottom_x_offset = (window_width - self.screen_manager.bottom_width) // 2
-            bottom_y_offset = self.screen_manager.top_height + 20
-            
-            if self.keyboard.handle_event(event, bottom_x_offset, bottom_y_offset):
+            if self.keyboard.handle_event(event, *self.screen_manager.bottom_origin):
                 if not self.keyboard.visible:
                     self.url = self.keyboard.text
                     self.load_url(self.url)
@@ -50,17 +53,10 @@ class BrowserApp:
         return True
     
     def handle_touch(self, pos):
-        window_width = self.screen_manager.window.get_width()
-        bottom_x_offset = (window_width - self.screen_manager.bottom_width) // 2
-        bottom_y_offset = self.screen_manager.top_height + 20
-        
-        touch_x = pos[0] - bottom_x_offset
-        touch_y = pos[1] - bottom_y_offset
-        
-        if touch_x < 0 or touch_x > self.screen_manager.bottom_width:
-            return
-        if touch_y < 0 or touch_y > self.screen_manager.bottom_height:
+        local = self.screen_manager.to_bottom_local(pos)
+        if not local:
             return
+        touch_x, touch_y = local
         
         url_bar = pygame.Rect(10, 10, 300, 25)
         if url_bar.collidepoint(touch_x, touch_y):
@@ -86,12 +82,12 @@ class BrowserApp:
         
         pygame.draw.rect(top_surface, settings.COLORS['SECONDARY'], (0, 0, top_surface.get_width(), 40))
         
-        url_text = self.font_small.render(f"🌐 {self.url}", True, settings.COLORS['WHITE'])
+        url_text = render_text(self.font_small, f"🌐 {self.url}", settings.COLORS['WHITE'])
         top_surface.blit(url_text, (10, 12))
         
         content_y = 60
         for line in self.page_content.split('\n'):
-            line_surf = self.font_small.render(line, True, settings.COLORS['DARK'])
+            line_surf = render_text(self.font_small, line, settings.COLORS['DARK'])
             top_surface.blit(line_surf, (20, content_y))
             content_y += 25
         
@@ -102,10 +98,10 @@ class BrowserApp:
         else:
             url_bar = pygame.Rect(10, 10, 300, 25)
             pygame.draw.rect(bottom_surface, settings.COLORS['WHITE'], url_bar)
-            url_surf = self.font_small.render(self.url[:30], True, settings.COLORS['DARK'])
+            url_surf = render_text(self.font_small, self.url[:30], settings.COLORS['DARK'])
             bottom_surface.blit(url_surf, (15, 15))
             
-            bookmarks_label = self.font_small.render("Bookmarks:", True, settings.COLORS['DARK'])
+            bookmarks_label = render_text(self.font_small, "Bookmarks:", settings.COLORS['DARK'])
             bottom_surface.blit(bookmarks_label, (10, 40))
             
             bookmark_y = 50
@@ -114,5 +110,5 @@ class BrowserApp:
                 pygame.draw.rect(bottom_surface, settings.COLORS['DARK'], bookmark_rect)
                 
                 bookmark_text = bookmark[:35]
-                bookmark_surf = self.font_small.render(bookmark_text, True, settings.COLORS['WHITE'])
+                bookmark_surf = render_text(self.font_small, bookmark_text, settings.COLORS['WHITE'])
                 bottom_surface.blit(bookmark_surf, (15, bookmark_y + i * 30 + 5))
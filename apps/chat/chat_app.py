@@ -4,17 +4,25 @@ Chat Application with Real-Time Messaging via Supabase
 
 import pygame
 from config import settings
+from ui.fonts import get_font
+from ui.text_cache import render_text
 from ui.widgets.keyboard import OnScreenKeyboard
+from ui.components.virtual_list import VirtualList
+
+MESSAGE_START_Y = 60
+MESSAGE_HEIGHT = 35
 
 class ChatApp:
+    tracks_damage = True
+    
     def __init__(self, screen_manager):
         self.screen_manager = screen_manager
         self.name = "Chat"
         self.icon = "💬"
         
-        self.font_small = pygame.font.Font(None, settings.FONTS['SMALL'])
-        self.font_medium = pygame.font.Font(None, settings.FONTS['MEDIUM'])
-        self.font_large = pygame.font.Font(None, settings.FONTS['LARGE'])
+        self.font_small = get_font(settings.FONTS['SMALL'])
+        self.font_medium = get_font(settings.FONTS['MEDIUM'])
+        self.font_large = get_font(settings.FONTS['LARGE'])
         
         self.messages = []
         self.current_message = ""
@@ -22,9 +30,13 @@ class ChatApp:
         self.friend_id = None
         
         self.keyboard = OnScreenKeyboard(self.screen_manager.bottom_width, self.screen_manager.bottom_height)
+        self.list = VirtualList((0, MESSAGE_START_Y, screen_manager.top_width,
+                                 screen_manager.top_height - MESSAGE_START_Y - 10), MESSAGE_HEIGHT,
+                                self.paint_message, background='LIGHT', selectable=False,
+                                on_invalidate=lambda rect: self.screen_manager.mark_dirty('top', rect))
         
-        from services.supabase_service import SupabaseService
-        self.supabase = SupabaseService()
+        from services.supabase_service import get_supabase_service
+        self.supabase = get_supabase_service()
         
         self.load_demo_messages()
     
@@ -34,14 +46,21 @@ class ChatApp:
             {'sender': 'me', 'message': 'Good! Just playing some games.', 'time': '10:31'},
             {'sender': 'friend', 'message': 'Nice! Want to play together?', 'time': '10:32'},
         ]
+        self.show_latest()
+    
+    def show_latest(self):
+        """Sync the list with the messages, following new ones if the view was at the bottom."""
+        at_bottom = self.list.scroll >= self.list.max_scroll
+        self.list.set_count(len(self.messages))
+        if at_bottom:
+            self.list.set_scroll(self.list.max_scroll)
     
     def handle_event(self, event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            self.screen_manager.mark_dirty()
+        
         if self.keyboard.visible:
-            window_width = self.screen_manager.window.get_width()
-            bottom_x_offset = (window_width - self.screen_manager.bottom_width) // 2
-            bottom_y_offset = self.screen_manager.top_height + 20
-            
-            if self.keyboard.handle_event(event, bottom_x_offset, bottom_y_offset):
+            if self.keyboard.handle_event(event, *self.screen_manager.bottom_origin):
                 if not self.keyboard.visible:
                     self.current_message = self.keyboard.text
                     if self.current_message:
@@ -54,6 +73,8 @@ class ChatApp:
                 self.keyboard.show("", lambda text: self.send_message(text))
             elif event.key == pygame.K_b or event.key == pygame.K_ESCAPE:
                 self.screen_manager.pop_screen()
+            else:
+                self.list.handle_key(event.key)
         
         if event.type == pygame.MOUSEBUTTONDOWN:
             self.handle_touch(event.pos)
@@ -61,17 +82,10 @@ class ChatApp:
         return True
     
     def handle_touch(self, pos):
-        window_width = self.screen_manager.window.get_width()
-        bottom_x_offset = (window_width - self.screen_manager.bottom_width) // 2
-        bottom_y_offset = self.screen_manager.top_height + 20
-        
-        touch_x = pos[0] - bottom_x_offset
-        touch_y = pos[1] - bottom_y_offset
-        
-        if touch_x < 0 or touch_x > self.screen_manager.bottom_width:
-            return
-        if touch_y < 0 or touch_y > self.screen_manager.bottom_height:
+        local = self.screen_manager.to_bottom_local(pos)
+        if not local:
             return
+        touch_x, touch_y = local
         
         send_btn = pygame.Rect(200, 200, 100, 30)
         if send_btn.collidepoint(touch_x, touch_y):
@@ -86,46 +100,48 @@ class ChatApp:
             'message': message,
             'time': '10:35'
         })
+        self.show_latest()
         
         if self.supabase.is_connected() and self.friend_id:
             self.supabase.send_message(self.user_id, self.friend_id, message)
     
+    def is_animating(self):
+        return self.list.is_animating()
+    
     def update(self, dt):
-        pass
+        self.list.update(dt)
+    
+    def paint_message(self, surface, index, selected):
+        msg = self.messages[index]
+        is_me = msg['sender'] == 'me'
+        x = 400 if is_me else 20
+        
+        bubble_color = settings.COLORS['PRIMARY'] if is_me else settings.COLORS['SECONDARY']
+        bubble_rect = pygame.Rect(x, 0, 350, 30)
+        pygame.draw.rect(surface, bubble_color, bubble_rect, border_radius=10)
+        
+        text_color = settings.COLORS['WHITE'] if is_me else settings.COLORS['DARK']
+        msg_surf = render_text(self.font_small, msg['message'][:40], text_color)
+        surface.blit(msg_surf, (x + 10, 8))
     
     def render(self, top_surface, bottom_surface):
         top_surface.fill(settings.COLORS['LIGHT'])
         
-        title = self.font_medium.render("💬 Chat", True, settings.COLORS['DARK'])
+        title = render_text(self.font_medium, "💬 Chat", settings.COLORS['DARK'])
         top_surface.blit(title, (20, 20))
         
-        message_start_y = 60
-        message_height = 35
-        
-        for i, msg in enumerate(self.messages[-8:]):
-            y = message_start_y + i * message_height
-            
-            is_me = msg['sender'] == 'me'
-            x = 400 if is_me else 20
-            
-            bubble_color = settings.COLORS['PRIMARY'] if is_me else settings.COLORS['SECONDARY']
-            bubble_rect = pygame.Rect(x, y, 350, 30)
-            pygame.draw.rect(top_surface, bubble_color, bubble_rect, border_radius=10)
-            
-            text_color = settings.COLORS['WHITE'] if is_me else settings.COLORS['DARK']
-            msg_surf = self.font_small.render(msg['message'][:40], True, text_color)
-            top_surface.blit(msg_surf, (x + 10, y + 8))
+        self.list.render(top_surface)
         
         bottom_surface.fill(settings.COLORS['DARK'])
         
         if self.keyboard.visible:
             self.keyboard.render(bottom_surface)
         else:
-            input_label = self.font_small.render("Tap to type message:", True, settings.COLORS['WHITE'])
+            input_label = render_text(self.font_small, "Tap to type message:", settings.COLORS['WHITE'])
             bottom_surface.blit(input_label, (10, 180))
             
             send_btn = pygame.Rect(200, 200, 100, 30)
             pygame.draw.rect(bottom_surface, settings.COLORS['PRIMARY'], send_btn)
-            send_text = self.font_small.render("Type Message", True, settings.COLORS['WHITE'])
+            send_text = render_text(self.font_small, "Type Message", settings.COLORS['WHITE'])
             send_text_rect = send_text.get_rect(center=send_btn.center)
             bottom_surface.blit(send_text, send_text_rect)
@@ -2,27 +2,59 @@
 Friends Application with Supabase Integration
 """
 
+import threading
 import pygame
 from config import settings
+from ui.fonts import get_font
+from ui.text_cache import render_text
+from ui.components.virtual_list import VirtualList
+
+ITEM_HEIGHT = 40
+LIST_START_Y = 40
 
 class FriendsApp:
+    tracks_damage = True
+    
     def __init__(self, screen_manager):
         self.screen_manager = screen_manager
         self.name = "Friends"
         self.icon = "👥"
         
-        self.font_small = pygame.font.Font(None, settings.FONTS['SMALL'])
-        self.font_medium = pygame.font.Font(None, settings.FONTS['MEDIUM'])
-        self.font_large = pygame.font.Font(None, settings.FONTS['LARGE'])
+        self.font_small = get_font(settings.FONTS['SMALL'])
+        self.font_medium = get_font(settings.FONTS['MEDIUM'])
+        self.font_large = get_font(settings.FONTS['LARGE'])
         
         self.friends = []
-        self.selected = 0
+        self.list = VirtualList((5, LIST_START_Y, screen_manager.bottom_width - 10,
+                                 screen_manager.bottom_height - LIST_START_Y - 5), ITEM_HEIGHT,
+                                self.paint_row, on_activate=self.activate_row,
+                                on_invalidate=lambda rect: self.screen_manager.mark_dirty('bottom', rect))
         self.user_id = "demo_user"
         
-        from services.supabase_service import SupabaseService
-        self.supabase = SupabaseService()
+        from services.supabase_service import get_supabase_service
+        self.supabase = get_supabase_service()
+        
+        self.polled_friends = None
+        self.polling = False
         
         self.load_friends()
+        self.list.set_count(len(self.friends))
+        
+        if self.supabase.is_connected():
+            self.screen_manager.timers.register(settings.NETWORK['PRESENCE_POLL_INTERVAL'],
+                                                self.poll_presence, owner=self)
+    
+    def poll_presence(self):
+        if self.polling:
+            return
+        self.polling = True
+        threading.Thread(target=self.fetch_presence, daemon=True).start()
+    
+    def fetch_presence(self):
+        try:
+            self.polled_friends = self.supabase.get_friends(self.user_id)
+        finally:
+            self.polling = False
     
     def load_friends(self):
         if self.supabase.is_connected():
@@ -34,101 +66,92 @@ class FriendsApp:
                 {'id': '3', 'name': 'Player3', 'status': 'online', 'avatar': '👤'},
             ]
     
+    @property
+    def selected(self):
+        return self.list.selected
+    
     def handle_event(self, event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            self.screen_manager.mark_dirty()
+        
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_DOWN:
-                self.selected = min(self.selected + 1, len(self.friends) - 1)
-            elif event.key == pygame.K_UP:
-                self.selected = max(self.selected - 1, 0)
-            elif event.key == pygame.K_a or event.key == pygame.K_RETURN:
+            if event.key == pygame.K_a or event.key == pygame.K_RETURN:
                 if 0 <= self.selected < len(self.friends):
                     self.open_friend_profile(self.friends[self.selected])
             elif event.key == pygame.K_b or event.key == pygame.K_ESCAPE:
                 self.screen_manager.pop_screen()
-        
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            self.handle_touch(event.pos)
+            elif self.list.handle_key(event.key):
+                self.screen_manager.mark_dirty('top')
+        else:
+            self.list.handle_event(event, self.screen_manager.to_bottom_local)
         
         return True
     
-    def handle_touch(self, pos):
-        window_width = self.screen_manager.window.get_width()
-        bottom_x_offset = (window_width - self.screen_manager.bottom_width) // 2
-        bottom_y_offset = self.screen_manager.top_height + 20
-        
-        touch_x = pos[0] - bottom_x_offset
-        touch_y = pos[1] - bottom_y_offset
-        
-        if touch_x < 0 or touch_x > self.screen_manager.bottom_width:
-            return
-        if touch_y < 0 or touch_y > self.screen_manager.bottom_height:
-            return
-        
-        item_height = 40
-        start_y = 40
-        
-        for i in range(len(self.friends)):
-            y = start_y + i * item_height
-            if touch_y >= y and touch_y < y + item_height:
-                self.selected = i
-                self.open_friend_profile(self.friends[i])
-                break
+    def activate_row(self, index):
+        self.screen_manager.mark_dirty('top')
+        self.open_friend_profile(self.friends[index])
     
     def open_friend_profile(self, friend):
         print(f"Opening profile for {friend.get('name', 'Unknown')}")
     
+    def is_animating(self):
+        return self.list.is_animating()
+    
     def update(self, dt):
-        pass
+        self.list.update(dt)
+        if self.polled_friends is not None:
+            friends, self.polled_friends = self.polled_friends, None
+            if friends != self.friends:
+                self.friends = friends
+                self.list.set_count(len(self.friends))
+                self.list.invalidate()
+                self.screen_manager.mark_dirty()
     
     def render(self, top_surface, bottom_surface):
         top_surface.fill(settings.COLORS['LIGHT'])
         
-        title = self.font_large.render("👥 Friends", True, settings.COLORS['DARK'])
+        title = render_text(self.font_large, "👥 Friends", settings.COLORS['DARK'])
         top_surface.blit(title, (20, 20))
         
         if self.friends and 0 <= self.selected < len(self.friends):
             friend = self.friends[self.selected]
             
             profile_y = 100
-            avatar = self.font_large.render(friend.get('avatar', '👤'), True, settings.COLORS['PRIMARY'])
+            avatar = render_text(self.font_large, friend.get('avatar', '👤'), settings.COLORS['PRIMARY'])
             avatar_rect = avatar.get_rect(center=(top_surface.get_width() // 2, profile_y))
             top_surface.blit(avatar, avatar_rect)
             
-            name = self.font_medium.render(friend.get('name', 'Unknown'), True, settings.COLORS['DARK'])
+            name = render_text(self.font_medium, friend.get('name', 'Unknown'), settings.COLORS['DARK'])
             name_rect = name.get_rect(center=(top_surface.get_width() // 2, profile_y + 60))
             top_surface.blit(name, name_rect)
             
             status = friend.get('status', 'offline')
             status_color = settings.COLORS['ONLINE_GREEN'] if status == 'online' else settings.COLORS['OFFLINE_GRAY']
             status_text = f"● {status.capitalize()}"
-            status_surf = self.font_small.render(status_text, True, status_color)
+            status_surf = render_text(self.font_small, status_text, status_color)
             status_rect = status_surf.get_rect(center=(top_surface.get_width() // 2, profile_y + 90))
             top_surface.blit(status_surf, status_rect)
         
         bottom_surface.fill(settings.COLORS['SECONDARY'])
         
-        list_title = self.font_small.render("Friend List:", True, settings.COLORS['DARK'])
+        list_title = render_text(self.font_small, "Friend List:", settings.COLORS['DARK'])
         bottom_surface.blit(list_title, (10, 10))
         
         if not self.friends:
-            no_friends = self.font_small.render("No friends yet", True, settings.COLORS['GRAY'])
+            no_friends = render_text(self.font_small, "No friends yet", settings.COLORS['GRAY'])
             bottom_surface.blit(no_friends, (10, 40))
         else:
-            item_height = 40
-            start_y = 40
-            
-            for i, friend in enumerate(self.friends):
-                y = start_y + i * item_height
-                
-                if i == self.selected:
-                    pygame.draw.rect(bottom_surface, settings.COLORS['PRIMARY'], (5, y, bottom_surface.get_width() - 10, item_height - 2))
-                
-                status = friend.get('status', 'offline')
-                status_color = settings.COLORS['ONLINE_GREEN'] if status == 'online' else settings.COLORS['OFFLINE_GRAY']
-                
-                pygame.draw.circle(bottom_surface, status_color, (20, y + 20), 5)
-                
-                name_text = friend.get('name', 'Unknown')
-                color = settings.COLORS['WHITE'] if i == self.selected else settings.COLORS['DARK']
-                name_surf = self.font_small.render(name_text, True, color)
-                bottom_surface.blit(name_surf, (35, y + 12))
+            self.list.render(bottom_surface)
+    
+    def paint_row(self, surface, index, selected):
+        friend = self.friends[index]
+        if selected:
+            pygame.draw.rect(surface, settings.COLORS['PRIMARY'], (0, 0, surface.get_width(), ITEM_HEIGHT - 2))
+        
+        status = friend.get('status', 'offline')
+        status_color = settings.COLORS['ONLINE_GREEN'] if status == 'online' else settings.COLORS['OFFLINE_GRAY']
+        pygame.draw.circle(surface, status_color, (15, 20), 5)
+        
+        color = settings.COLORS['WHITE'] if selected else settings.COLORS['DARK']
+        name_surf = render_text(self.font_small, friend.get('name', 'Unknown'), color)
+        surface.blit(name_surf, (30, 12))
@@ -2,39 +2,165 @@
 Music Player Application with Playlist Management
 """
 
+import time
 import pygame
-from pathlib import Path
 from config import settings
+from ui.fonts import get_font
+from ui.text_cache import render_text
+from ui.components.virtual_list import VirtualList
+from ui.components.spectrum import SpectrumVisualizer
+from services.music_library import get_music_library, SORT_FIELDS
+from services.audio_player import get_audio_player
+from services.playlist_store import get_playlist_store
+
+PAGE_SIZE = 50
+ROW_HEIGHT = 20
+QUEUE_PLAYLIST = 'Queue'
 
 class MusicApp:
+    tracks_damage = True
+    
     def __init__(self, screen_manager):
         self.screen_manager = screen_manager
         self.name = "Music"
         self.icon = "🎵"
         
-        self.font_small = pygame.font.Font(None, settings.FONTS['SMALL'])
-        self.font_medium = pygame.font.Font(None, settings.FONTS['MEDIUM'])
-        self.font_large = pygame.font.Font(None, settings.FONTS['LARGE'])
+        self.font_small = get_font(settings.FONTS['SMALL'])
+        self.font_medium = get_font(settings.FONTS['MEDIUM'])
+        self.font_large = get_font(settings.FONTS['LARGE'])
         
-        self.playlist = []
-        self.current_track = 0
-        self.playing = False
+        self.list = VirtualList((5, 32, screen_manager.bottom_width - 10, 7 * ROW_HEIGHT), ROW_HEIGHT,
+                                self.paint_row, on_activate=self.play_index, background='DARK',
+                                on_invalidate=lambda rect: self.screen_manager.mark_dirty('bottom', rect))
+        self.spectrum = SpectrumVisualizer((40, 230, screen_manager.top_width - 80, screen_manager.top_height - 260),
+                                           on_invalidate=lambda rect: self.screen_manager.mark_dirty('top', rect))
+        self.current_id = None
         self.volume = settings.AUDIO['DEFAULT_VOLUME']
         
-        self.scan_music()
-    
-    def scan_music(self):
-        music_path = settings.PATHS['DATA'] / 'music'
-        if not music_path.exists():
-            music_path.mkdir(parents=True, exist_ok=True)
-            return
+        self.sort = 'title'
+        self.descending = False
+        self.queue = get_playlist_store().open(QUEUE_PLAYLIST)
+        self.show_queue = False
+        self.track_count = 0
+        self.pages = {}
         
-        for ext in settings.AUDIO['MUSIC_FORMATS']:
-            self.playlist.extend([str(f) for f in music_path.glob(f'*{ext}')])
+        self.player = get_audio_player()
+        self.player_version = self.player.version
+        if self.player.current:
+            self.current_id = self.player.current['id']
         
-        self.playlist.sort()
+        self.library = get_music_library()
+        self.library_version = None
+        self.reload_tracks()
+        self.library.start_scan()
+        if self.player.current:
+            self.player.set_next_track(self.track_after)
+    
+    @property
+    def playing(self):
+        return self.player.playing
+    
+    @property
+    def current_track(self):
+        return self.list.selected
+    
+    @current_track.setter
+    def current_track(self, index):
+        self.list.select(index)
+    
+    def remember_current(self):
+        track = self.track_at(self.current_track)
+        if track:
+            self.current_id = track['id']
+    
+    def reload_tracks(self):
+        """Re-read the track count and drop cached pages after a scan batch or sort change.
+        
+        The current track is looked up again by id, so it stays selected
+        when rows are inserted before it or the order changes.
+        """
+        self.remember_current()
+        self.library_version = self.library.version
+        self.track_count = len(self.queue) if self.show_queue else self.library.count()
+        self.pages = {}
+        self.list.set_count(self.track_count)
+        self.list.invalidate()
+        if self.current_id is not None:
+            position = self.position_of(self.current_id)
+            if position is not None:
+                self.current_track = position
+        self.screen_manager.mark_dirty()
+    
+    def track_at(self, index):
+        if not 0 <= index < self.track_count:
+            return None
+        page, row = divmod(index, PAGE_SIZE)
+        if page not in self.pages:
+            if self.show_queue:
+                # Only the playlist pages under this window are read.
+                self.pages[page] = self.library.get_tracks_by_ids(self.queue.slice(page * PAGE_SIZE, PAGE_SIZE))
+            else:
+                self.pages[page] = self.library.get_tracks(self.sort, self.descending, page * PAGE_SIZE, PAGE_SIZE)
+        tracks = self.pages[page]
+        return tracks[row] if row < len(tracks) else None
+    
+    def position_of(self, track_id):
+        if self.show_queue:
+            return self.queue.index_of(track_id)
+        return self.library.position(track_id, self.sort, self.descending)
+    
+    def order_changed(self):
+        self.reload_tracks()
+        if self.player.current:
+            self.player.set_next_track(self.track_after)
+    
+    def toggle_view(self):
+        self.remember_current()
+        self.show_queue = not self.show_queue
+        self.order_changed()
+    
+    def enqueue_selected(self):
+        track = self.track_at(self.current_track)
+        if track:
+            self.queue.append([track['id']])
+            print(f"Queued {track['title']}")
+    
+    def remove_selected(self):
+        if self.current_track < len(self.queue):
+            self.queue.delete(self.queue.stored_index(self.current_track))
+            self.order_changed()
+    
+    def raise_selected(self):
+        """Move the selected queue entry up one place (only in stored order)."""
+        index = self.current_track
+        if self.queue.seed or not 0 < index < len(self.queue):
+            return
+        self.queue.move(index, index - 1)
+        self.order_changed()
+    
+    def toggle_shuffle(self):
+        self.remember_current()
+        if self.queue.seed:
+            self.queue.unshuffle()
+        else:
+            self.queue.shuffle()
+        self.order_changed()
+    
+    def cycle_sort(self):
+        self.remember_current()
+        fields = list(SORT_FIELDS)
+        self.sort = fields[(fields.index(self.sort) + 1) % len(fields)]
+        self.order_changed()
+    
+    def toggle_order(self):
+        self.remember_current()
+        self.descending = not self.descending
+        self.order_changed()
     
     def handle_event(self, event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            self.screen_manager.mark_dirty()
+        
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
                 self.toggle_play()
@@ -42,26 +168,47 @@ class MusicApp:
                 self.next_track()
             elif event.key == pygame.K_LEFT:
                 self.previous_track()
+            elif event.key == pygame.K_UP:
+                self.list.move(-1)
+            elif event.key == pygame.K_DOWN:
+                self.list.move(1)
+            elif event.key == pygame.K_q:
+                self.list.page(-1)
+            elif event.key == pygame.K_e:
+                self.list.page(1)
+            elif event.key == pygame.K_a:
+                self.play_index(self.current_track)
+            elif event.key == pygame.K_BACKSPACE:
+                self.toggle_view()
+            elif event.key == pygame.K_RETURN:
+                if self.show_queue:
+                    self.remove_selected()
+                else:
+                    self.enqueue_selected()
+            elif event.key == pygame.K_w:
+                if self.show_queue:
+                    self.toggle_shuffle()
+                else:
+                    self.cycle_sort()
+            elif event.key == pygame.K_d:
+                if self.show_queue:
+                    self.raise_selected()
+                else:
+                    self.toggle_order()
             elif event.key == pygame.K_b or event.key == pygame.K_ESCAPE:
                 self.screen_manager.pop_screen()
         
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            self.handle_touch(event.pos)
+        elif not self.list.handle_event(event, self.screen_manager.to_bottom_local):
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self.handle_touch(event.pos)
         
         return True
     
     def handle_touch(self, pos):
-        window_width = self.screen_manager.window.get_width()
-        bottom_x_offset = (window_width - self.screen_manager.bottom_width) // 2
-        bottom_y_offset = self.screen_manager.top_height + 20
-        
-        touch_x = pos[0] - bottom_x_offset
-        touch_y = pos[1] - bottom_y_offset
-        
-        if touch_x < 0 or touch_x > self.screen_manager.bottom_width:
-            return
-        if touch_y < 0 or touch_y > self.screen_manager.bottom_height:
+        local = self.screen_manager.to_bottom_local(pos)
+        if not local:
             return
+        touch_x, touch_y = local
         
         prev_btn = pygame.Rect(40, 180, 60, 40)
         play_btn = pygame.Rect(110, 180, 60, 40)
@@ -75,75 +222,136 @@ class MusicApp:
             self.next_track()
     
     def toggle_play(self):
-        if not self.playlist:
+        if not self.track_count:
             return
         
-        self.playing = not self.playing
-        
-        try:
-            if self.playing:
-                if 0 <= self.current_track < len(self.playlist):
-                    pygame.mixer.music.load(self.playlist[self.current_track])
-                    pygame.mixer.music.play()
-            else:
-                pygame.mixer.music.pause()
-        except Exception as e:
-            print(f"Music playback error: {e}")
+        track = self.track_at(self.current_track)
+        if self.player.playing:
+            self.player.pause()
+        elif self.player.current and track and self.player.current['id'] == track['id']:
+            self.player.resume()
+        elif track:
+            self.play_track(track)
+    
+    def play_index(self, index):
+        track = self.track_at(index)
+        if track:
+            self.play_track(track)
+    
+    def play_track(self, track):
+        self.current_id = track['id']
+        self.player.play(track, self.track_after)
+        self.player_version = self.player.version
+    
+    def track_after(self, track):
+        """The track following ``track`` in the current sort order, wrapping at the end."""
+        current = self.track_at(self.current_track)
+        if current and current['id'] == track['id']:
+            position = self.current_track
+        else:
+            position = self.position_of(track['id'])
+        if position is None or not self.track_count:
+            return None
+        return self.track_at((position + 1) % self.track_count)
     
     def next_track(self):
-        if not self.playlist:
+        if not self.track_count:
             return
-        self.current_track = (self.current_track + 1) % len(self.playlist)
+        self.current_track = (self.current_track + 1) % self.track_count
         if self.playing:
-            self.playing = False
-            self.toggle_play()
+            self.play_track(self.track_at(self.current_track))
     
     def previous_track(self):
-        if not self.playlist:
+        if not self.track_count:
             return
-        self.current_track = (self.current_track - 1) % len(self.playlist)
+        self.current_track = (self.current_track - 1) % self.track_count
         if self.playing:
-            self.playing = False
-            self.toggle_play()
+            self.play_track(self.track_at(self.current_track))
+    
+    def is_animating(self):
+        return self.list.is_animating()
+    
+    def next_deadline(self):
+        """Wake for the spectrum's next analysis, only while there are samples to draw."""
+        if not self.spectrum.enabled or not self.playing:
+            return None
+        if self.player.starting:
+            # Samples appear once the worker has loaded and decoded the track.
+            return time.monotonic() + self.spectrum.interval
+        if self.player.get_samples()[0] is None:
+            return None
+        return self.spectrum.next_update()
     
     def update(self, dt):
-        pass
+        self.list.update(dt)
+        if self.playing:
+            samples, position = self.player.get_samples()
+            self.spectrum.update(dt, samples, position)
+        if self.library_version != self.library.version:
+            self.reload_tracks()
+        if self.player_version != self.player.version:
+            # The player moved on by itself; follow it.
+            self.player_version = self.player.version
+            if self.player.current:
+                self.current_id = self.player.current['id']
+                position = self.position_of(self.current_id)
+                if position is not None:
+                    self.current_track = position
+            self.screen_manager.mark_dirty()
+    
+    def paint_row(self, surface, index, selected):
+        track = self.track_at(index)
+        if track:
+            color = settings.COLORS['PRIMARY'] if selected else settings.COLORS['WHITE']
+            track_surf = render_text(self.font_small, f"{index+1}. {track['title'][:25]}", color)
+            surface.blit(track_surf, (5, 3))
     
     def render(self, top_surface, bottom_surface):
         top_surface.fill(settings.COLORS['DARK'])
         
-        title = self.font_large.render("🎵 Music Player", True, settings.COLORS['WHITE'])
+        title = render_text(self.font_large, "🎵 Music Player", settings.COLORS['WHITE'])
         top_surface.blit(title, (20, 20))
         
-        if self.playlist:
-            if 0 <= self.current_track < len(self.playlist):
-                track_name = Path(self.playlist[self.current_track]).stem
-                track_surf = self.font_medium.render(track_name, True, settings.COLORS['WHITE'])
-                track_rect = track_surf.get_rect(center=(top_surface.get_width() // 2, 150))
+        if self.track_count:
+            track = self.track_at(self.current_track)
+            if track:
+                track_surf = render_text(self.font_medium, track['title'], settings.COLORS['WHITE'])
+                track_rect = track_surf.get_rect(center=(top_surface.get_width() // 2, 130))
                 top_surface.blit(track_surf, track_rect)
+                
+                artist_surf = render_text(self.font_small, f"{track['artist']} — {track['album']}", settings.COLORS['GRAY'])
+                artist_rect = artist_surf.get_rect(center=(top_surface.get_width() // 2, 165))
+                top_surface.blit(artist_surf, artist_rect)
             
             status = "▶️ Playing" if self.playing else "⏸️ Paused"
-            status_surf = self.font_small.render(status, True, settings.COLORS['SUCCESS'] if self.playing else settings.COLORS['GRAY'])
+            status_surf = render_text(self.font_small, status, settings.COLORS['SUCCESS'] if self.playing else settings.COLORS['GRAY'])
             status_rect = status_surf.get_rect(center=(top_surface.get_width() // 2, 200))
             top_surface.blit(status_surf, status_rect)
+            
+            self.spectrum.render(top_surface)
         else:
-            no_music = self.font_medium.render("No music files found", True, settings.COLORS['GRAY'])
+            if self.show_queue:
+                message = "Queue is empty"
+            elif self.library.is_scanning():
+                message = "Scanning music library..."
+            else:
+                message = "No music files found"
+            no_music = render_text(self.font_medium, message, settings.COLORS['GRAY'])
             no_music_rect = no_music.get_rect(center=(top_surface.get_width() // 2, 150))
             top_surface.blit(no_music, no_music_rect)
         
         bottom_surface.fill(settings.COLORS['DARK'])
         
-        if self.playlist:
-            playlist_title = self.font_small.render("Playlist:", True, settings.COLORS['WHITE'])
+        if self.track_count:
+            if self.show_queue:
+                heading = f"{QUEUE_PLAYLIST} ({self.track_count})" + (" · Shuffle" if self.queue.seed else "")
+            else:
+                order = "▼" if self.descending else "▲"
+                heading = f"Library ({self.track_count}) · {self.sort.title()} {order}"
+            playlist_title = render_text(self.font_small, heading, settings.COLORS['WHITE'])
             bottom_surface.blit(playlist_title, (10, 10))
             
-            y = 35
-            for i, track in enumerate(self.playlist[:5]):
-                track_name = Path(track).stem[:25]
-                color = settings.COLORS['PRIMARY'] if i == self.current_track else settings.COLORS['WHITE']
-                track_surf = self.font_small.render(f"{i+1}. {track_name}", True, color)
-                bottom_surface.blit(track_surf, (10, y))
-                y += 20
+            self.list.render(bottom_surface)
         
         prev_btn = pygame.Rect(40, 180, 60, 40)
         play_btn = pygame.Rect(110, 180, 60, 40)
@@ -153,9 +361,9 @@ class MusicApp:
         pygame.draw.rect(bottom_surface, settings.COLORS['PRIMARY'], play_btn)
         pygame.draw.rect(bottom_surface, settings.COLORS['SECONDARY'], next_btn)
         
-        prev_text = self.font_medium.render("⏮️", True, settings.COLORS['WHITE'])
-        play_text = self.font_medium.render("▶️" if not self.playing else "⏸️", True, settings.COLORS['WHITE'])
-        next_text = self.font_medium.render("⏭️", True, settings.COLORS['WHITE'])
+        prev_text = render_text(self.font_medium, "⏮️", settings.COLORS['WHITE'])
+        play_text = render_text(self.font_medium, "▶️" if not self.playing else "⏸️", settings.COLORS['WHITE'])
+        next_text = render_text(self.font_medium, "⏭️", settings.COLORS['WHITE'])
         
         bottom_surface.blit(prev_text, (prev_btn.centerx - 10, prev_btn.centery - 10))
         bottom_surface.blit(play_text, (play_btn.centerx - 10, play_btn.centery - 10))
@@ -4,16 +4,24 @@ Comprehensive Settings Application
 
 import pygame
 from config import settings
+from ui.fonts import get_font
+from ui.text_cache import render_text
+from ui.components.virtual_list import VirtualList
+
+ITEM_HEIGHT = 30
+LIST_START_Y = 10
 
 class SettingsApp:
+    tracks_damage = True
+    
     def __init__(self, screen_manager):
         self.screen_manager = screen_manager
         self.name = "Settings"
         self.icon = "⚙️"
         
-        self.font_small = pygame.font.Font(None, settings.FONTS['SMALL'])
-        self.font_medium = pygame.font.Font(None, settings.FONTS['MEDIUM'])
-        self.font_large = pygame.font.Font(None, settings.FONTS['LARGE'])
+        self.font_small = get_font(settings.FONTS['SMALL'])
+        self.font_medium = get_font(settings.FONTS['MEDIUM'])
+        self.font_large = get_font(settings.FONTS['LARGE'])
         
         self.sections = [
             {'id': 'profile', 'name': 'User Profile', 'icon': '👤'},
@@ -30,90 +38,74 @@ class SettingsApp:
             {'id': 'about', 'name': 'About', 'icon': 'ℹ️'},
         ]
         
-        self.selected = 0
         self.current_section = None
+        
+        self.list = VirtualList((5, LIST_START_Y, screen_manager.bottom_width - 10,
+                                 screen_manager.bottom_height - 2 * LIST_START_Y), ITEM_HEIGHT,
+                                self.paint_row, count=len(self.sections),
+                                on_activate=lambda i: self.open_section(self.sections[i]['id']),
+                                on_invalidate=lambda rect: self.screen_manager.mark_dirty('bottom', rect))
+    
+    @property
+    def selected(self):
+        return self.list.selected
     
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_DOWN:
-                self.selected = min(self.selected + 1, len(self.sections) - 1)
-            elif event.key == pygame.K_UP:
-                self.selected = max(self.selected - 1, 0)
-            elif event.key == pygame.K_a or event.key == pygame.K_RETURN:
+            if event.key == pygame.K_a or event.key == pygame.K_RETURN:
                 self.open_section(self.sections[self.selected]['id'])
             elif event.key == pygame.K_b or event.key == pygame.K_ESCAPE:
                 if self.current_section:
                     self.current_section = None
+                    self.screen_manager.mark_dirty('top')
                 else:
                     self.screen_manager.pop_screen()
-        
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            self.handle_touch(event.pos)
+            elif self.list.handle_key(event.key):
+                self.screen_manager.mark_dirty('top')
+        else:
+            self.list.handle_event(event, self.screen_manager.to_bottom_local)
         
         return True
     
-    def handle_touch(self, pos):
-        window_width = self.screen_manager.window.get_width()
-        bottom_x_offset = (window_width - self.screen_manager.bottom_width) // 2
-        bottom_y_offset = self.screen_manager.top_height + 20
-        
-        touch_x = pos[0] - bottom_x_offset
-        touch_y = pos[1] - bottom_y_offset
-        
-        if touch_x < 0 or touch_x > self.screen_manager.bottom_width:
-            return
-        if touch_y < 0 or touch_y > self.screen_manager.bottom_height:
-            return
-        
-        item_height = 30
-        start_y = 10
-        
-        for i, section in enumerate(self.sections):
-            y = start_y + i * item_height
-            if touch_y >= y and touch_y < y + item_height:
-                self.selected = i
-                self.open_section(section['id'])
-                break
-    
     def open_section(self, section_id):
         self.current_section = section_id
+        self.screen_manager.mark_dirty('top')
         print(f"Opening settings section: {section_id}")
     
+    def is_animating(self):
+        return self.list.is_animating()
+    
     def update(self, dt):
-        pass
+        self.list.update(dt)
     
     def render(self, top_surface, bottom_surface):
         top_surface.fill(settings.COLORS['LIGHT'])
         
-        title = self.font_large.render("Settings", True, settings.COLORS['DARK'])
+        title = render_text(self.font_large, "Settings", settings.COLORS['DARK'])
         top_surface.blit(title, (20, 20))
         
         if self.current_section:
             section = next((s for s in self.sections if s['id'] == self.current_section), None)
             if section:
-                section_title = self.font_medium.render(f"{section['icon']} {section['name']}", True, settings.COLORS['DARK'])
+                section_title = render_text(self.font_medium, f"{section['icon']} {section['name']}", settings.COLORS['DARK'])
                 top_surface.blit(section_title, (20, 70))
                 
-                content_text = self.font_small.render(f"Configure {section['name'].lower()} settings here", True, settings.COLORS['GRAY'])
+                content_text = render_text(self.font_small, f"Configure {section['name'].lower()} settings here", settings.COLORS['GRAY'])
                 top_surface.blit(content_text, (20, 110))
         else:
             if 0 <= self.selected < len(self.sections):
                 section = self.sections[self.selected]
-                preview_title = self.font_medium.render(f"{section['icon']} {section['name']}", True, settings.COLORS['PRIMARY'])
+                preview_title = render_text(self.font_medium, f"{section['icon']} {section['name']}", settings.COLORS['PRIMARY'])
                 top_surface.blit(preview_title, (20, 70))
         
         bottom_surface.fill(settings.COLORS['SECONDARY'])
-        
-        item_height = 30
-        start_y = 10
-        
-        for i, section in enumerate(self.sections):
-            y = start_y + i * item_height
-            
-            if i == self.selected:
-                pygame.draw.rect(bottom_surface, settings.COLORS['PRIMARY'], (5, y, bottom_surface.get_width() - 10, item_height - 2))
-            
-            text = f"{section['icon']} {section['name']}"
-            color = settings.COLORS['WHITE'] if i == self.selected else settings.COLORS['DARK']
-            text_surf = self.font_small.render(text, True, color)
-            bottom_surface.blit(text_surf, (15, y + 8))
+        self.list.render(bottom_surface)
+    
+    def paint_row(self, surface, index, selected):
+        section = self.sections[index]
+        rect = pygame.Rect(0, 0, surface.get_width(), ITEM_HEIGHT - 2)
+        if selected:
+            pygame.draw.rect(surface, settings.COLORS['PRIMARY'], rect)
+        color = settings.COLORS['WHITE'] if selected else settings.COLORS['DARK']
+        text_surf = render_text(self.font_small, f"{section['icon']} {section['name']}", color)
+        surface.blit(text_surf, text_surf.get_rect(midleft=(10, rect.centery)))
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Headless UI Benchmark Harness
+Boots GamingSystem on SDL's dummy drivers, replays a scripted input
+sequence and reports per-screen throughput as JSON.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from config import settings
+
+FRAME_DT = 1.0 / 60
+
+def build_default_script():
+    """Open every app from HomeScreen, scroll, type on the keyboard and pop back."""
+    script = [{
+        'name': 'home_navigation',
+        'steps': [['key', 'RIGHT']] * 4 + [['key', 'LEFT']] * 4 + [['key', 'DOWN'], ['key', 'UP']],
+    }]
+    
+    for index, app in enumerate(['settings', 'music', 'friends', 'chat', 'browser']):
+        steps = [['key', 'LEFT']] * 5 + [['key', 'RIGHT']] * index + [['key', 'a']]
+        script.append({'name': f'open_{app}', 'steps': steps})
+        script.append({
+            'name': f'scroll_{app}',
+            'steps': [['key', 'DOWN']] * 10 + [['key', 'UP']] * 10,
+        })
+        if app in ('chat', 'browser'):
+            script.append({
+                'name': f'type_{app}',
+                'steps': [['key', 'RETURN'], ['type', 'hello world']],
+            })
+        script.append({'name': f'close_{app}', 'steps': [['key', 'b']]})
+    
+    script.append({'name': 'idle_home', 'steps': [['idle', 60]]})
+    return script
+
+class BenchmarkRunner:
+    def __init__(self, frames_per_step=3, full_redraw=False, trace_alloc=False):
+        settings.SYSTEM['AUTO_UPDATE'] = False
+        
+        from main import GamingSystem
+        self.system = GamingSystem()
+        self.frames_per_step = frames_per_step
+        self.full_redraw = full_redraw
+        self.trace_alloc = trace_alloc
+        self.phase_stats = None
+        
+        self.phases = []
+        self.screens = {}
+    
+    def post_key(self, name):
+        key = getattr(pygame, f'K_{name}')
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0))
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode='', scancode=0))
+    
+    def post_touch(self, x, y):
+        origin = self.system.screen_manager.bottom_origin
+        pos = (origin[0] + x, origin[1] + y)
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1))
+    
+    def type_text(self, text):
+        keyboard = getattr(self.system.screen_manager.current_screen, 'keyboard', None)
+        if not keyboard or not keyboard.visible:
+            return 0
+        
+        frames = 0
+        for char in text:
+            center = keyboard.get_key_center('space' if char == ' ' else char)
+            if center:
+                self.post_touch(*center)
+                frames += self.run_frames(self.frames_per_step)
+        return frames
+    
+    def run_frames(self, count):
+        screen_manager = self.system.screen_manager
+        for _ in range(count):
+            if self.full_redraw:
+                screen_manager.invalidate_all()
+            
+            blocks_before = sys.getallocatedblocks()
+            if self.trace_alloc:
+                import tracemalloc
+                tracemalloc.reset_peak()
+                traced_before = tracemalloc.get_traced_memory()[0]
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            
+            self.system.run_frame(pygame.event.get(), FRAME_DT)
+            
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            stats = self.screens.setdefault(type(screen_manager.current_screen).__name__,
+                                            new_stats(self.trace_alloc))
+            stats['frames'] += 1
+            stats['wall_s'] += wall
+            stats['cpu_s'] += cpu
+            stats['alloc_blocks'] += max(0, sys.getallocatedblocks() - blocks_before)
+            if self.trace_alloc:
+                traced = tracemalloc.get_traced_memory()[1] - traced_before
+                stats['alloc_bytes'] += traced
+                if self.phase_stats:
+                    self.phase_stats['alloc_bytes'] += traced
+        return count
+    
+    def run_phase(self, phase):
+        stats = self.phase_stats = new_stats(self.trace_alloc)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        blocks_before = sys.getallocatedblocks()
+        
+        frames = 0
+        for step in phase['steps']:
+            kind = step[0]
+            if kind == 'key':
+                self.post_key(step[1])
+                frames += self.run_frames(self.frames_per_step)
+            elif kind == 'touch':
+                self.post_touch(step[1], step[2])
+                frames += self.run_frames(self.frames_per_step)
+            elif kind == 'type':
+                frames += self.type_text(step[1])
+            elif kind == 'idle':
+                frames += self.run_frames(step[1])
+            else:
+                raise ValueError(f"Unknown benchmark step: {kind}")
+        
+        stats['frames'] = frames
+        stats['wall_s'] = time.perf_counter() - wall_start
+        stats['cpu_s'] = time.process_time() - cpu_start
+        stats['alloc_blocks'] = max(0, sys.getallocatedblocks() - blocks_before)
+        self.phase_stats = None
+        result = summarize(stats)
+        result['name'] = phase['name']
+        result['screen'] = type(self.system.screen_manager.current_screen).__name__
+        self.phases.append(result)
+    
+    def run(self, script, repeat=1):
+        if self.trace_alloc:
+            import tracemalloc
+            tracemalloc.start()
+        
+        from ui.text_cache import text_cache
+        text_cache.reset_stats()
+        
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        for _ in range(repeat):
+            for phase in script:
+                self.run_phase(phase)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        
+        total_frames = sum(phase['frames'] for phase in self.phases)
+        report = {
+            'config': {
+                'performance_mode': self.system.frame_scheduler.mode,
+                'dirty_rects': settings.DISPLAY['DIRTY_RECTS'],
+                'output_backend': settings.DISPLAY['OUTPUT_BACKEND'],
+                'frames_per_step': self.frames_per_step,
+                'full_redraw': self.full_redraw,
+                'repeat': repeat,
+            },
+            'total': {
+                'frames': total_frames,
+                'wall_s': wall,
+                'cpu_s': cpu,
+                'fps': total_frames / wall if wall else 0.0,
+                'cpu_ms_per_frame': cpu / total_frames * 1000 if total_frames else 0.0,
+            },
+            'screens': {name: summarize(stats) for name, stats in self.screens.items()},
+            'phases': self.phases,
+            'text_cache': text_cache.get_stats(),
+        }
+        
+        from services.profiler import profiler
+        if profiler.enabled:
+            report['profiler'] = profiler.get_report()
+        return report
+    
+    def run_launches(self, game_id, runs=3, settle=1.0):
+        """Launch a game alternately cold (evicted from the page cache) and prewarmed."""
+        from services.game_scanner import get_game_scanner
+        from services.prelaunch import get_prelaunch_warmer
+        
+        scanner = get_game_scanner()
+        scanner.wait_for_scan()
+        game = scanner.get_game(game_id)
+        if game is None:
+            raise SystemExit(f"Unknown game: {game_id}")
+        
+        warmer = get_prelaunch_warmer()
+        supervisor = self.system.launch_supervisor
+        launches = {'cold': [], 'prewarmed': []}
+        for _ in range(runs):
+            for label in launches:
+                warmer.evict(game)
+                if label == 'prewarmed':
+                    warmer.warm(game, threading.Event(), delay=0)
+                # Same pause either way so readahead can land without skewing the cold runs.
+                time.sleep(settle)
+                
+                supervisor.request_launch(game)
+                record = supervisor.run_pending(self.system.screen_manager)
+                self.system.run_frame([], FRAME_DT)
+                supervisor.frame_presented()
+                launches[label].append(record)
+        
+        summary = {}
+        for label, records in launches.items():
+            summary[label] = {}
+            for key in ('launch_latency', 'first_frame_latency', 'return_latency'):
+                values = [r[key] for r in records if r[key] is not None]
+                summary[label][key] = sum(values) / len(values) if values else None
+        return {'game': game_id, 'runs': runs, 'summary': summary, 'launches': launches,
+                'prewarm': warmer.get_stats()}
+    
+    def close(self):
+        self.system.screen_manager.close()
+        pygame.quit()
+
+def new_stats(trace_alloc=False):
+    # alloc_bytes stays None (null in the report) unless tracemalloc measures it.
+    return {'frames': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'alloc_blocks': 0, 'alloc_bytes': 0 if trace_alloc else None}
+
+def summarize(stats):
+    frames = stats['frames'] or 1
+    return {
+        'frames': stats['frames'],
+        'wall_s': stats['wall_s'],
+        'cpu_s': stats['cpu_s'],
+        'fps': stats['frames'] / stats['wall_s'] if stats['wall_s'] else 0.0,
+        'cpu_ms_per_frame': stats['cpu_s'] / frames * 1000,
+        'alloc_blocks_per_frame': stats['alloc_blocks'] / frames,
+        'alloc_bytes_per_frame': stats['alloc_bytes'] / frames if stats['alloc_bytes'] is not None else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark for the gaming system UI loop")
+    parser.add_argument('--script', help="JSON file with a list of {name, steps} phases")
+    parser.add_argument('--repeat', type=int, default=1, help="run the script this many times")
+    parser.add_argument('--frames-per-step', type=int, default=3)
+    parser.add_argument('--mode', choices=sorted(settings.PERFORMANCE_MODES), help="performance mode to boot with")
+    parser.add_argument('--full-redraw', action='store_true', help="invalidate every frame (worst case)")
+    parser.add_argument('--no-dirty-rects', action='store_true', help="disable damage tracking")
+    parser.add_argument('--trace-alloc', action='store_true', help="measure allocated bytes per frame with tracemalloc")
+    parser.add_argument('--profile', action='store_true', help="include the frame profiler report")
+    parser.add_argument('--launch', metavar='GAME_ID', help="measure cold vs. prewarmed launch latency of a game")
+    parser.add_argument('--launch-runs', type=int, default=3)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    
+    if args.mode:
+        settings.SYSTEM['PERFORMANCE_MODE'] = args.mode
+    if args.no_dirty_rects:
+        settings.DISPLAY['DIRTY_RECTS'] = False
+    if args.profile:
+        settings.DEBUG['PROFILER'] = True
+    
+    if args.script:
+        with open(args.script, 'r') as f:
+            script = json.load(f)
+    else:
+        script = build_default_script()
+    
+    runner = BenchmarkRunner(args.frames_per_step, args.full_redraw, args.trace_alloc)
+    if args.launch:
+        report = runner.run_launches(args.launch, args.launch_runs)
+    else:
+        report = runner.run(script, args.repeat)
+    runner.close()
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -42,6 +42,7 @@ SCREENS = {
         'MODEL': 'Waveshare 5" HDMI LCD',
         'INTERFACE': 'HDMI',
         'FRAMEBUFFER': '/dev/fb0',
+        'BPP': 32,
     },
     'BOTTOM_SCREEN': {
         'WIDTH': 320,
@@ -51,6 +52,7 @@ SCREENS = {
         'CONTROLLER': 'ILI9341',
         'INTERFACE': 'SPI',
         'FRAMEBUFFER': '/dev/fb1',
+        'BPP': 16,
         'TOUCH_DEVICE': '/dev/input/event0',
         'SPI_SPEED': 64000000,
     }
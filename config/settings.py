@@ -14,6 +14,8 @@ DISPLAY = {
     'BOTTOM_HEIGHT': 240,
     'FPS': 60,
     'DEFAULT_BRIGHTNESS': 80,
+    'DIRTY_RECTS': True,
+    'OUTPUT_BACKEND': 'window',
 }
 
 COLORS = {
@@ -39,6 +41,20 @@ FONTS = {
     'STATUS_BAR': 14,
 }
 
+CACHE = {
+    'TEXT_CACHE_BYTES': 4 * 1024 * 1024,
+}
+
+LIBRARY = {
+    'LOADER_WORKERS': 4,
+    'LOADER_BATCH': 9,
+    'THUMBNAIL_SIZE': (96, 96),
+    'PREWARM': True,
+    'PREWARM_DELAY': 0.4,
+    'PREWARM_BUDGET': 64 * 1024 * 1024,
+    'PREWARM_FILES': 8,
+}
+
 ANIMATION = {
     'TRANSITION_SPEED': 0.2,
     'FADE_SPEED': 0.15,
@@ -58,12 +74,40 @@ AUDIO = {
     'DEFAULT_VOLUME': 70,
     'MUSIC_FORMATS': ['.mp3', '.ogg', '.wav', '.flac'],
     'SOUND_EFFECTS': True,
+    'PREFETCH_MAX_BYTES': 48 * 1024 * 1024,
+    'VISUALIZER': True,
+    'VISUALIZER_FPS': 30,
+    'VISUALIZER_BUDGET_MS': 2.0,
+    'VISUALIZER_PCM_BYTES': 64 * 1024 * 1024,
 }
 
 NETWORK = {
     'SUPABASE_URL': os.getenv('SUPABASE_URL', ''),
     'SUPABASE_KEY': os.getenv('SUPABASE_KEY', ''),
     'AUTO_CONNECT': True,
+    'PRESENCE_POLL_INTERVAL': 30,
+    'KEEPALIVE_SECONDS': 120,
+    'MAX_CONNECTIONS': 4,
+}
+
+SAVE_SYNC = {
+    'ENABLED': False,
+    'REMOTE_DIR': os.getenv('SAVE_SYNC_DIR', ''),
+    'INTERVAL': 600,
+    'MIN_CHUNK': 2 * 1024,
+    'AVG_CHUNK': 8 * 1024,
+    'MAX_CHUNK': 64 * 1024,
+}
+
+PERFORMANCE_MODES = {
+    'performance': {'FPS': 60, 'IDLE_TIMEOUT': 0.25, 'MIXER_BUFFER': 256},
+    'balanced': {'FPS': 45, 'IDLE_TIMEOUT': 1.0, 'MIXER_BUFFER': 512},
+    'powersave': {'FPS': 30, 'IDLE_TIMEOUT': 5.0, 'MIXER_BUFFER': 1024},
+}
+
+DEBUG = {
+    'PROFILER': False,
+    'PROFILER_WINDOW': 300,
 }
 
 SYSTEM = {
@@ -71,6 +115,8 @@ SYSTEM = {
     'PERFORMANCE_MODE': 'balanced',
     'SCREEN_TIMEOUT': 300,
     'LANGUAGE': 'en',
+    'WATCH_GAMES': True,
+    'RELEASE_DISPLAY_ON_LAUNCH': True,
     'AUTO_UPDATE': True,
     'UPDATE_CHECK_INTERVAL': 3600,
     'UPDATE_REPO_URL': os.getenv('UPDATE_REPO_URL', ''),
@@ -1,4 +1,5 @@
 #!/bin/bash
 echo "Demo Game Started!"
+[ -n "$GAMING_SYSTEM_READY_FD" ] && echo ready >&"$GAMING_SYSTEM_READY_FD"
 echo "This is where your game would run"
 sleep 5
@@ -14,12 +14,20 @@ load_dotenv()
 from config import settings
 from ui.screen_manager import ScreenManager
 from ui.input_handler import InputHandler
+from ui.frame_scheduler import FrameScheduler
 from services.notification_service import NotificationService
 from services.app_registry import AppRegistry
 from services.update_service import UpdateService
+from services.profiler import profiler
+from services.launch_supervisor import get_launch_supervisor
+from services.save_sync import get_save_sync
+from services.audio_player import get_audio_player, MUSIC_ENDED
+from services.sound_service import configure_mixer, get_sound_service
+from services.playlist_store import get_playlist_store
 
 class GamingSystem:
     def __init__(self):
+        configure_mixer()
         pygame.init()
         pygame.font.init()
         
@@ -29,13 +37,19 @@ class GamingSystem:
             print("⚠️  Audio device not available, running without sound")
         
         self.running = True
-        self.clock = pygame.time.Clock()
+        self.frame_scheduler = FrameScheduler()
         
-        self.screen_manager = ScreenManager()
+        self.app_registry = AppRegistry()
+        self.screen_manager = ScreenManager(self.app_registry)
         self.input_handler = InputHandler()
         self.notification_service = NotificationService()
-        self.app_registry = AppRegistry()
         self.update_service = UpdateService()
+        self.launch_supervisor = get_launch_supervisor()
+        self.audio_player = get_audio_player()
+        self.sound_service = get_sound_service()
+        self.save_sync = get_save_sync()
+        if self.save_sync:
+            self.save_sync.start()
         
         self.register_apps()
         self.check_updates()
@@ -53,11 +67,22 @@ class GamingSystem:
         self.app_registry.register('chat', ChatApp)
         self.app_registry.register('browser', BrowserApp)
     
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, events=None):
+        if events is None:
+            events = pygame.event.get()
+        
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+                self.screen_manager.invalidate_all()
+                continue
+            elif event.type == MUSIC_ENDED:
+                self.audio_player.handle_end()
+                continue
             
+            self.sound_service.play_for_event(event)
             self.input_handler.handle_event(event)
             self.screen_manager.handle_event(event)
         
@@ -77,22 +102,45 @@ class GamingSystem:
         self.notification_service.update(dt)
     
     def render(self):
-        self.screen_manager.render()
-        pygame.display.flip()
+        dirty_rects = self.screen_manager.render()
+        if dirty_rects is None:
+            pygame.display.flip()
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
+    
+    def run_frame(self, events, dt):
+        profiler.begin_frame(1.0 / self.frame_scheduler.fps_cap)
+        with profiler.section('handle_events'):
+            self.handle_events(events)
+        with profiler.section('update'):
+            self.update(dt)
+        with profiler.section('render'):
+            self.render()
+        profiler.end_frame()
     
     def run(self):
         print("🎮 Gaming System Starting...")
         print(f"   Top Screen: {settings.DISPLAY['TOP_WIDTH']}x{settings.DISPLAY['TOP_HEIGHT']}")
         print(f"   Bottom Screen: {settings.DISPLAY['BOTTOM_WIDTH']}x{settings.DISPLAY['BOTTOM_HEIGHT']}")
+        print(f"   Performance Mode: {self.frame_scheduler.mode} ({self.frame_scheduler.fps_cap} FPS cap)")
         
         while self.running:
-            dt = self.clock.tick(settings.DISPLAY['FPS']) / 1000.0
+            events, dt = self.frame_scheduler.wait_for_frame(self.screen_manager.is_animating(),
+                                                             self.screen_manager.next_deadline())
+            self.run_frame(events, dt)
+            self.launch_supervisor.frame_presented()
             
-            self.handle_events()
-            self.update(dt)
-            self.render()
+            if self.launch_supervisor.pending:
+                self.launch_supervisor.run_pending(self.screen_manager)
         
         print("🛑 Gaming System Shutting Down...")
+        profiler.dump()
+        self.screen_manager.home_screen.game_scanner.stop_watching()
+        if self.save_sync:
+            self.save_sync.stop()
+        self.audio_player.shutdown()
+        get_playlist_store().close()
+        self.screen_manager.close()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,314 @@
+"""
+Gapless Prefetching Audio Player
+"""
+
+import io
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+import pygame
+from config import settings
+
+MUSIC_ENDED = pygame.event.custom_type()
+PREFETCH_SLOTS = 2
+# End events this soon after a track was loaded belong to the track it replaced.
+STALE_END_SECONDS = 0.5
+
+class AudioPlayer:
+    """Music playback driven by a worker thread, so the UI never waits on the mixer.
+    
+    play(), pause(), resume() and stop() only queue commands. The worker
+    reads each track into memory before handing it to the mixer, and as
+    soon as a track starts it prefetches the next one and queues it with
+    pygame.mixer.music.queue, so SDL_mixer switches over without a gap.
+    The main loop forwards MUSIC_ENDED to handle_end(), which records the
+    switch and asks ``next_track`` for the track after that one.
+    
+    release_device() closes the mixer for a launched game that needs the
+    audio device, remembering the play position; restore_device() reopens
+    it and carries on from there.
+    """
+    
+    def __init__(self):
+        self.enabled = bool(pygame.mixer.get_init())
+        self.commands = queue.Queue()
+        self.buffers = OrderedDict()
+        self.decoded = OrderedDict()
+        self.buffer_lock = threading.Lock()
+        
+        self.current = None
+        self.upcoming = None
+        self.queued = None
+        self.next_track = None
+        self.playing = False
+        self.starting = False
+        self.started_at = 0.0
+        # Seconds into the track where the mixer started playing it.
+        self.start_offset = 0.0
+        self.released = False
+        self.version = 0
+        self.stats = {'played': 0, 'gapless': 0, 'prefetched': 0, 'prefetch_hits': 0}
+        
+        self.thread = None
+        if self.enabled:
+            pygame.mixer.music.set_endevent(MUSIC_ENDED)
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+    
+    def play(self, track, next_track=None):
+        """Start ``track`` (a dict with 'path'); ``next_track(track)`` picks what follows it."""
+        if not self.enabled:
+            return
+        self.current = track
+        self.next_track = next_track
+        self.upcoming = None
+        self.queued = None
+        self.playing = True
+        self.starting = True
+        self.version += 1
+        self.commands.put(('play', track))
+        self.prepare_next()
+    
+    def pause(self):
+        self.playing = False
+        self.commands.put(('pause', None))
+    
+    def resume(self):
+        if self.current is None:
+            return
+        self.playing = True
+        self.commands.put(('resume', None))
+    
+    def stop(self):
+        self.playing = False
+        self.current = None
+        self.upcoming = None
+        self.version += 1
+        self.commands.put(('stop', None))
+    
+    def release_device(self):
+        """Stop playback and prefetching and close the mixer; blocks until the worker has."""
+        if not self.enabled or self.released:
+            return
+        self.released = True
+        # Pending loads and prefetches are redone by restore_device().
+        while True:
+            try:
+                self.commands.get_nowait()
+            except queue.Empty:
+                break
+        done = threading.Event()
+        self.commands.put(('release', done))
+        done.wait()
+    
+    def restore_device(self):
+        """Reopen the mixer and resume the current track where release_device() left it."""
+        if not self.enabled or not self.released:
+            return
+        self.released = False
+        self.upcoming = None
+        self.starting = self.current is not None
+        done = threading.Event()
+        self.commands.put(('restore', done))
+        done.wait()
+        if self.current is not None:
+            # Decoding for the visualizer waits until the shell is back on screen.
+            self.commands.put(('decode', self.current))
+        self.prepare_next()
+    
+    def shutdown(self):
+        if self.thread:
+            self.commands.put(('quit', None))
+    
+    def set_upcoming(self, track):
+        """Prefetch and queue ``track`` to follow the current one."""
+        if not self.enabled or track is None or track == self.upcoming:
+            return
+        self.upcoming = track
+        self.commands.put(('queue', track))
+    
+    def set_next_track(self, next_track):
+        """Replace the function choosing what follows, e.g. after the playlist order changed."""
+        self.next_track = next_track
+        self.upcoming = None
+        self.prepare_next()
+    
+    def prepare_next(self):
+        if self.next_track and self.current:
+            self.set_upcoming(self.next_track(self.current))
+    
+    def handle_end(self):
+        """React to MUSIC_ENDED: note a gapless switch, or start the next track by hand."""
+        if (not self.playing or self.starting or self.current is None
+                or time.monotonic() - self.started_at < STALE_END_SECONDS):
+            # Nothing playing, or an event from the track play() replaced.
+            return
+        busy = pygame.mixer.music.get_busy()
+        if busy and self.queued is not None:
+            self.current = self.queued
+            self.queued = None
+            self.upcoming = None
+            self.version += 1
+            self.stats['gapless'] += 1
+            self.prepare_next()
+        elif not busy:
+            # The next track was not ready in time (or there is none).
+            upcoming = self.upcoming or (self.next_track(self.current) if self.next_track else None)
+            if upcoming:
+                self.play(upcoming, self.next_track)
+            else:
+                self.playing = False
+                self.version += 1
+        # Busy with nothing queued: a late event from a track that was replaced.
+    
+    def fetch(self, path):
+        """The file's bytes as a BytesIO, or the path itself when it is too big to hold."""
+        with self.buffer_lock:
+            data = self.buffers.get(path)
+            if data is not None:
+                self.buffers.move_to_end(path)
+                self.stats['prefetch_hits'] += 1
+                return io.BytesIO(data)
+        
+        if os.path.getsize(path) > settings.AUDIO['PREFETCH_MAX_BYTES']:
+            return path
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self.buffer_lock:
+            self.buffers[path] = data
+            while len(self.buffers) > PREFETCH_SLOTS:
+                self.buffers.popitem(last=False)
+        return io.BytesIO(data)
+    
+    def run(self):
+        music = pygame.mixer.music
+        while True:
+            command, track = self.commands.get()
+            if command == 'quit':
+                return
+            try:
+                if command == 'play':
+                    if track is not self.current:
+                        continue
+                    source = self.fetch(track['path'])
+                    music.load(source, os.path.splitext(track['path'])[1][1:])
+                    music.play()
+                    self.start_offset = 0.0
+                    self.started_at = time.monotonic()
+                    self.queued = None
+                    self.stats['played'] += 1
+                    self.decode(track)
+                elif command == 'queue':
+                    if track is not self.upcoming:
+                        continue
+                    source = self.fetch(track['path'])
+                    music.queue(source, os.path.splitext(track['path'])[1][1:])
+                    self.queued = track
+                    self.stats['prefetched'] += 1
+                    self.decode(track)
+                elif command == 'pause':
+                    music.pause()
+                elif command == 'resume':
+                    music.unpause()
+                elif command == 'stop':
+                    # stop() fires the end event; keep it from reading as end of track.
+                    music.set_endevent()
+                    music.stop()
+                    music.set_endevent(MUSIC_ENDED)
+                    self.queued = None
+                elif command == 'decode':
+                    if track is self.current:
+                        self.decode(track)
+                elif command == 'release':
+                    self.release_mixer()
+                elif command == 'restore':
+                    self.restore_mixer()
+            except Exception as e:
+                print(f"Music playback error: {e}")
+            finally:
+                if command == 'play' and track is self.current:
+                    self.starting = False
+                elif command in ('release', 'restore'):
+                    if command == 'restore':
+                        self.starting = False
+                    track.set()
+    
+    def release_mixer(self):
+        music = pygame.mixer.music
+        if self.current is not None:
+            self.start_offset += max(0, music.get_pos()) / 1000.0
+        music.set_endevent()
+        music.stop()
+        music.unload()
+        self.queued = None
+        with self.buffer_lock:
+            # Sounds do not survive the mixer closing.
+            self.decoded.clear()
+        pygame.mixer.quit()
+    
+    def restore_mixer(self):
+        pygame.mixer.init()
+        music = pygame.mixer.music
+        music.set_endevent(MUSIC_ENDED)
+        track = self.current
+        if track is None:
+            return
+        music.load(self.fetch(track['path']), os.path.splitext(track['path'])[1][1:])
+        try:
+            music.play(start=self.start_offset)
+        except pygame.error:
+            # Formats without seeking start over.
+            music.play()
+            self.start_offset = 0.0
+        self.started_at = time.monotonic()
+        if not self.playing:
+            music.pause()
+    
+    def decode(self, track):
+        """Decode a buffered track to PCM in the mixer's format, for the visualizer.
+        
+        SDL_mixer streams music without exposing its samples, so the
+        worker decodes a second copy through pygame.mixer.Sound, skipping
+        tracks whose PCM would exceed AUDIO['VISUALIZER_PCM_BYTES'].
+        """
+        path = track['path']
+        if not settings.AUDIO['VISUALIZER'] or path in self.decoded:
+            return
+        with self.buffer_lock:
+            data = self.buffers.get(path)
+        if data is None:
+            return
+        frequency, size, channels = pygame.mixer.get_init()
+        pcm_bytes = track.get('duration', 0) * frequency * channels * abs(size) // 8
+        if not pcm_bytes or pcm_bytes > settings.AUDIO['VISUALIZER_PCM_BYTES']:
+            return
+        sound = pygame.mixer.Sound(file=io.BytesIO(data))
+        with self.buffer_lock:
+            self.decoded[path] = (sound, pygame.sndarray.samples(sound))
+            while len(self.decoded) > PREFETCH_SLOTS:
+                self.decoded.popitem(last=False)
+    
+    def get_samples(self):
+        """(samples, position in ms) of the current track, or (None, 0) when not decoded."""
+        if not self.playing or self.current is None or self.starting:
+            return None, 0
+        with self.buffer_lock:
+            entry = self.decoded.get(self.current['path'])
+        if entry is None:
+            return None, 0
+        return entry[1], self.start_offset * 1000 + pygame.mixer.music.get_pos()
+    
+    def get_stats(self):
+        with self.buffer_lock:
+            buffered = sum(len(data) for data in self.buffers.values())
+        return dict(self.stats, buffered_bytes=buffered, pending=self.commands.qsize())
+
+_audio_player = None
+
+def get_audio_player():
+    global _audio_player
+    if _audio_player is None:
+        _audio_player = AudioPlayer()
+    return _audio_player
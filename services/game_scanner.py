@@ -4,39 +4,407 @@ Game Scanner for Auto-Detecting Games from Folders
 
 import os
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+import pygame
 from config import settings
+from services.game_search import GameSearchIndex
+from services.thumbnail_cache import get_thumbnail_cache
+
+INDEX_VERSION = 1
+GAME_FILE_SUFFIXES = ['.sh', '.py', '.bin']
+WATCH_DEBOUNCE = 0.5
+DEFAULT_THUMBNAIL = 'thumbnail.png'
+
+GAME_LIBRARY_CHANGED = pygame.event.custom_type()
+
+def thumbnail_key(game_id):
+    return f"game:{game_id}"
 
 class GameScanner:
     def __init__(self):
         self.games_path = settings.PATHS['GAMES']
+        self.index_path = settings.PATHS['DATA'] / 'game_index.json'
         self.games = []
+        self.entries = {}
+        self.search_index = GameSearchIndex()
+        self.version = 0
+        self.lock = threading.RLock()
+        # Serializes index and atlas writes from the loader and the watcher.
+        self.save_lock = threading.Lock()
+        
+        self.observer = None
+        self.pending = set()
+        self.pending_event = threading.Event()
+        
+        self.thumbnail_cache = get_thumbnail_cache()
+        self.loader = None
+        self.load_stats = {'total': 0, 'loaded': 0, 'batches': 0, 'first_batch': None, 'elapsed': None}
+        
+        self.load_index()
         self.scan_games()
     
-    def scan_games(self):
-        self.games = []
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Error loading game index: {e}")
+            return False
+        
+        if index.get('version') != INDEX_VERSION or index.get('root') != str(self.games_path):
+            return False
+        
+        for name, (sig, game) in index['entries'].items():
+            self.set_entry(name, {'sig': sig, 'game': game})
+        self.rebuild_games()
+        return True
+    
+    def save_index(self):
+        """Write the index from a snapshot taken under the lock; the disk write happens outside it."""
+        with self.save_lock:
+            with self.lock:
+                index = {
+                    'version': INDEX_VERSION,
+                    'root': str(self.games_path),
+                    'entries': {name: [entry['sig'], entry['game']] for name, entry in self.entries.items()},
+                }
+            try:
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.index_path.with_suffix('.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump(index, f, separators=(',', ':'))
+                os.replace(tmp_path, self.index_path)
+            except Exception as e:
+                print(f"Error saving game index: {e}")
+    
+    def entry_signature(self, entry):
+        """Cheap change signature for a library entry: inode and mtime of the
+        entry itself, plus the mtime of game.json for directories (editing a
+        file in place does not touch its directory's mtime).
+        """
+        try:
+            if entry.is_dir():
+                st = entry.stat()
+                try:
+                    info_mtime = os.stat(os.path.join(os.fspath(entry), 'game.json')).st_mtime_ns
+                except FileNotFoundError:
+                    info_mtime = 0
+                return [st.st_ino, st.st_mtime_ns, info_mtime]
+            if os.path.splitext(entry.name)[1] in GAME_FILE_SUFFIXES:
+                st = entry.stat()
+                return [st.st_ino, st.st_mtime_ns]
+        except OSError:
+            pass
+        return None
+    
+    def scan_games(self, wait=False):
+        """Re-scan the library. Unchanged entries come straight from the index;
+        new or modified ones are loaded on a thread pool and stream in batches,
+        each bumping ``version`` and posting GAME_LIBRARY_CHANGED.
+        """
+        self.wait_for_scan()
         
         if not self.games_path.exists():
             self.games_path.mkdir(parents=True, exist_ok=True)
+            with self.lock:
+                for name in list(self.entries):
+                    self.set_entry(name, None)
+                self.rebuild_games()
             return
         
-        for item in self.games_path.iterdir():
-            if item.is_dir():
-                game_info = self.load_game_info(item)
-                if game_info:
-                    self.games.append(game_info)
-            elif item.suffix in ['.sh', '.py', '.bin']:
-                game_info = {
-                    'id': item.stem,
-                    'name': item.stem.replace('_', ' ').title(),
-                    'path': str(item),
-                    'executable': str(item),
-                    'icon': '🎮',
-                    'description': 'Game',
-                }
-                self.games.append(game_info)
+        # Directory walk and stats run unlocked; the lock only covers the diff.
+        found = {}
+        with os.scandir(self.games_path) as it:
+            for entry in it:
+                sig = self.entry_signature(entry)
+                if sig is not None:
+                    found[entry.name] = sig
+        
+        with self.lock:
+            entries = {}
+            jobs = []
+            for name, sig in found.items():
+                cached = self.entries.get(name)
+                if cached and cached['sig'] == sig:
+                    entries[name] = cached
+                else:
+                    jobs.append((name, sig, None))
+            
+            changed = entries.keys() != self.entries.keys() or bool(jobs)
+            for name in self.entries.keys() - entries.keys():
+                self.set_entry(name, None)
+            self.rebuild_games()
+        
+        for name, cached in entries.items():
+            if cached['game'] and self.artwork_stale(cached['game']):
+                jobs.append((name, cached['sig'], cached['game']))
+        
+        if not jobs:
+            if changed:
+                self.save_index()
+            self.save_thumbnails()
+            return
+        
+        jobs.sort()
+        self.loader = threading.Thread(target=self.load_batches, args=(jobs, changed), daemon=True)
+        self.loader.start()
+        if wait:
+            self.wait_for_scan()
+    
+    def wait_for_scan(self, timeout=None):
+        if self.loader and self.loader is not threading.current_thread():
+            self.loader.join(timeout)
+        return not (self.loader and self.loader.is_alive())
+    
+    def load_batches(self, jobs, changed):
+        stats = self.load_stats
+        stats.update(total=len(jobs), loaded=0, batches=0, first_batch=None, elapsed=None)
+        start = time.perf_counter()
+        batch_size = settings.LIBRARY['LOADER_BATCH']
+        
+        batch = []
+        with ThreadPoolExecutor(max_workers=settings.LIBRARY['LOADER_WORKERS']) as pool:
+            futures = [pool.submit(self.load_job, *job) for job in jobs]
+            for future in as_completed(futures):
+                batch.append(future.result())
+                if len(batch) >= batch_size:
+                    self.apply_batch(batch, start)
+                    batch = []
+        if batch:
+            self.apply_batch(batch, start)
+        
+        stats['elapsed'] = time.perf_counter() - start
+        if changed:
+            self.save_index()
+        self.save_thumbnails()
+    
+    def load_job(self, name, sig, game):
+        """Runs on a pool thread: parse metadata (unless cached) and decode artwork."""
+        if game is None:
+            try:
+                game = self.load_entry(self.games_path / name)
+            except Exception as e:
+                print(f"Error loading game entry {name}: {e}")
+        thumbnail = self.load_thumbnail(game) if game else None
+        return name, sig, game, thumbnail
+    
+    def apply_batch(self, batch, start):
+        added = []
+        with self.lock:
+            for name, sig, game, thumbnail in batch:
+                if game and name not in self.entries:
+                    added.append(game['id'])
+                self.set_entry(name, {'sig': sig, 'game': game})
+                if thumbnail:
+                    self.store_thumbnail(game, thumbnail)
+            self.rebuild_games()
+        
+        stats = self.load_stats
+        stats['loaded'] += len(batch)
+        stats['batches'] += 1
+        if stats['first_batch'] is None:
+            stats['first_batch'] = time.perf_counter() - start
+        self.post_change_event({'added': added, 'removed': [], 'updated': []},
+                               loaded=stats['loaded'], total=stats['total'])
+    
+    def artwork_mtime(self, game):
+        path = Path(game['path'])
+        if not path.is_dir():
+            return None
+        try:
+            return (path / game.get('thumbnail', DEFAULT_THUMBNAIL)).stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def artwork_stale(self, game):
+        mtime = self.artwork_mtime(game)
+        return mtime is not None and not self.thumbnail_cache.is_fresh(thumbnail_key(game['id']), mtime)
+    
+    def load_thumbnail(self, game):
+        """Decode and downscale a game's artwork unless the atlas already holds this version.
+        
+        Returns (mtime_ns, pixels, size) with pixels in the atlas' format, or None.
+        """
+        mtime = self.artwork_mtime(game)
+        if mtime is None or self.thumbnail_cache.is_fresh(thumbnail_key(game['id']), mtime):
+            return None
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+        try:
+            with Image.open(Path(game['path']) / game.get('thumbnail', DEFAULT_THUMBNAIL)) as image:
+                image.draft('RGB', self.thumbnail_cache.size)
+                image.thumbnail(self.thumbnail_cache.size)
+                image = image.convert('RGBA')
+                return mtime, image.tobytes('raw', self.thumbnail_cache.pixel_format), image.size
+        except Exception as e:
+            print(f"Error loading artwork for {game.get('name')}: {e}")
+            return None
+    
+    def store_thumbnail(self, game, thumbnail):
+        mtime, pixels, size = thumbnail
+        self.thumbnail_cache.store(thumbnail_key(game['id']), mtime, pixels, size)
+    
+    def save_thumbnails(self):
+        with self.save_lock:
+            with self.lock:
+                keys = {thumbnail_key(game['id']) for game in self.games}
+            self.thumbnail_cache.prune(keys)
+            self.thumbnail_cache.save()
+    
+    def get_thumbnail(self, game_id):
+        """Surface for a game's artwork from the thumbnail atlas, or None. Call from the main thread."""
+        return self.thumbnail_cache.get_surface(thumbnail_key(game_id))
+    
+    def get_load_stats(self):
+        return dict(self.load_stats)
+    
+    def refresh_entry(self, name):
+        """Re-check a single top-level entry; returns ('added'|'removed'|'updated', game) or None.
+        
+        Runs on the watcher thread. The stat, metadata parse, artwork decode
+        and disk writes all happen outside the lock, which is held only to
+        swap the entry in, so the UI's getters and search never wait on I/O.
+        """
+        path = self.games_path / name
+        sig = self.entry_signature(path) if os.path.lexists(path) else None
+        with self.lock:
+            cached = self.entries.get(name)
         
-        self.games.sort(key=lambda x: x['name'])
+        if sig is None:
+            if not cached:
+                return None
+            with self.lock:
+                self.set_entry(name, None)
+                self.rebuild_games()
+            change = ('removed', cached['game'])
+        elif cached and cached['sig'] == sig:
+            # Artwork can be rewritten in place without touching the signature.
+            thumbnail = self.load_thumbnail(cached['game']) if cached['game'] else None
+            if not thumbnail:
+                return None
+            self.store_thumbnail(cached['game'], thumbnail)
+            with self.save_lock:
+                self.thumbnail_cache.save()
+            with self.lock:
+                self.version += 1
+            return ('updated', cached['game'])
+        else:
+            game = self.load_entry(path)
+            thumbnail = self.load_thumbnail(game) if game else None
+            if thumbnail:
+                self.store_thumbnail(game, thumbnail)
+            with self.lock:
+                self.set_entry(name, {'sig': sig, 'game': game})
+                self.rebuild_games()
+            change = ('updated' if cached else 'added', game)
+        
+        self.save_index()
+        self.save_thumbnails()
+        return change
+    
+    def set_entry(self, name, entry):
+        """Replace (or with None, drop) an entry, keeping the search index in step."""
+        old = self.entries.pop(name, None)
+        if old and old['game']:
+            self.search_index.remove(old['game']['id'])
+        if entry:
+            self.entries[name] = entry
+            if entry['game']:
+                self.search_index.add(entry['game'])
+    
+    def rebuild_games(self):
+        games = [entry['game'] for entry in self.entries.values() if entry['game']]
+        games.sort(key=lambda x: x['name'])
+        self.games = games
+        self.version += 1
+    
+    def start_watching(self):
+        if self.observer:
+            return True
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            print("⚠️  watchdog not installed, live game library updates disabled")
+            return False
+        
+        scanner = self
+        
+        class LibraryEventHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                for path in (event.src_path, getattr(event, 'dest_path', '')):
+                    if path:
+                        scanner.queue_path(path)
+        
+        self.games_path.mkdir(parents=True, exist_ok=True)
+        self.observer = Observer()
+        self.observer.daemon = True
+        self.observer.schedule(LibraryEventHandler(), str(self.games_path), recursive=True)
+        self.observer.start()
+        
+        threading.Thread(target=self.process_changes, daemon=True).start()
+        return True
+    
+    def stop_watching(self):
+        if self.observer:
+            self.observer.stop()
+            self.observer = None
+            self.pending_event.set()
+    
+    def queue_path(self, path):
+        try:
+            relative = Path(os.fsdecode(path)).relative_to(self.games_path)
+        except ValueError:
+            return
+        if not relative.parts or relative.parts[0] == '.' or self.index_path.name == relative.parts[0]:
+            return
+        with self.lock:
+            self.pending.add(relative.parts[0])
+        self.pending_event.set()
+    
+    def process_changes(self):
+        while self.observer:
+            self.pending_event.wait()
+            # Let bursts (copying a whole game folder) settle before re-reading.
+            time.sleep(WATCH_DEBOUNCE)
+            self.pending_event.clear()
+            
+            with self.lock:
+                names, self.pending = self.pending, set()
+            
+            changes = {'added': [], 'removed': [], 'updated': []}
+            for name in names:
+                change = self.refresh_entry(name)
+                if change and change[1]:
+                    changes[change[0]].append(change[1]['id'])
+            
+            if any(changes.values()):
+                self.post_change_event(changes)
+    
+    def post_change_event(self, changes, **extra):
+        try:
+            pygame.event.post(pygame.event.Event(GAME_LIBRARY_CHANGED, version=self.version, **changes, **extra))
+        except pygame.error:
+            pass
+    
+    def load_entry(self, item):
+        if item.is_dir():
+            return self.load_game_info(item)
+        return {
+            'id': item.stem,
+            'name': item.stem.replace('_', ' ').title(),
+            'path': str(item),
+            'executable': str(item),
+            'icon': '🎮',
+            'description': 'Game',
+        }
     
     def load_game_info(self, game_dir):
         info_file = game_dir / 'game.json'
@@ -72,13 +440,25 @@ class GameScanner:
     def get_games(self):
         return self.games
     
+    def get_game(self, game_id):
+        return self.search_index.get(game_id)
+    
+    def search_games(self, query, limit=None):
+        with self.lock:
+            return self.search_index.search(query, limit)
+    
     def launch_game(self, game_id):
-        game = next((g for g in self.games if g['id'] == game_id), None)
+        """Queue a game for the launch supervisor; it runs between frames with the shell suspended."""
+        game = self.get_game(game_id)
         if game and 'executable' in game:
-            try:
-                import subprocess
-                subprocess.Popen([game['executable']], cwd=game['path'])
-                return True
-            except Exception as e:
-                print(f"Error launching game: {e}")
+            from services.launch_supervisor import get_launch_supervisor
+            return get_launch_supervisor().request_launch(game)
         return False
+
+_game_scanner = None
+
+def get_game_scanner():
+    global _game_scanner
+    if _game_scanner is None:
+        _game_scanner = GameScanner()
+    return _game_scanner
@@ -0,0 +1,139 @@
+"""
+Incremental Search Index for the Game Library
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+SHORT_PREFIX_LENGTH = 2
+
+def normalize(text):
+    return ' '.join(str(text).lower().split())
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class GameSearchIndex:
+    """id -> game map plus a search index over name and description.
+
+    Terms of three or more characters are looked up through a trigram
+    index and confirmed with a substring check. Shorter terms match word
+    prefixes. A query that extends the previous one only filters the
+    previous results, so type-ahead costs stay proportional to the
+    shrinking result set rather than the library size. Results come back
+    in name order, kept incrementally in a sorted list.
+    """
+
+    def __init__(self):
+        self.games = {}
+        self.texts = {}
+        self.names = {}
+        self.trigram_index = defaultdict(set)
+        self.prefix_index = defaultdict(set)
+        self.ordered = []
+        self.last_terms = []
+        self.last_matches = []
+
+    def __len__(self):
+        return len(self.games)
+
+    def get(self, game_id):
+        return self.games.get(game_id)
+
+    def add(self, game):
+        game_id = game['id']
+        if game_id in self.games:
+            self.remove(game_id)
+
+        name = normalize(game.get('name', game_id))
+        text = f"{name} {normalize(game.get('description', ''))}"
+        self.games[game_id] = game
+        self.names[game_id] = name
+        self.texts[game_id] = text
+
+        for gram in trigrams(text):
+            self.trigram_index[gram].add(game_id)
+        for prefix in self.word_prefixes(text):
+            self.prefix_index[prefix].add(game_id)
+        insort(self.ordered, (name, game_id))
+        self.last_terms = []
+
+    def remove(self, game_id):
+        if game_id not in self.games:
+            return
+        text = self.texts.pop(game_id)
+        name = self.names.pop(game_id)
+        del self.games[game_id]
+        del self.ordered[bisect_left(self.ordered, (name, game_id))]
+
+        for gram in trigrams(text):
+            ids = self.trigram_index[gram]
+            ids.discard(game_id)
+            if not ids:
+                del self.trigram_index[gram]
+        for prefix in self.word_prefixes(text):
+            ids = self.prefix_index[prefix]
+            ids.discard(game_id)
+            if not ids:
+                del self.prefix_index[prefix]
+        self.last_terms = []
+
+    def clear(self):
+        self.__init__()
+
+    def word_prefixes(self, text):
+        return {word[:length] for word in text.split() for length in range(1, SHORT_PREFIX_LENGTH + 1)}
+
+    def match_term(self, term, candidates=None):
+        if len(term) <= SHORT_PREFIX_LENGTH:
+            ids = self.prefix_index.get(term, set())
+            return ids if candidates is None else candidates & ids
+
+        if candidates is None:
+            grams = sorted((self.trigram_index.get(gram, set()) for gram in trigrams(term)), key=len)
+            candidates = grams[0].intersection(*grams[1:])
+            if len(term) == 3:
+                return candidates
+        texts = self.texts
+        return {game_id for game_id in candidates if term in texts[game_id]}
+
+    def search(self, query, limit=None):
+        """Games matching every term of the query, in name order."""
+        terms = normalize(query).split()
+        if not terms:
+            return []
+
+        previous = self.last_terms
+        common = 0
+        while common < min(len(terms), len(previous)) and terms[common] == previous[common]:
+            common += 1
+
+        stack = self.last_matches[:common]
+        matches = stack[-1] if stack else None
+        for i in range(common, len(terms)):
+            candidates = matches
+            if (i == common and i < len(previous) and len(previous[i]) > SHORT_PREFIX_LENGTH
+                    and terms[i].startswith(previous[i])):
+                # The term only grew: its matches are among the previous ones.
+                candidates = self.last_matches[i]
+            matches = self.match_term(terms[i], candidates)
+            stack.append(matches)
+
+        self.last_terms = terms
+        self.last_matches = stack
+        return [self.games[game_id] for game_id in self.rank(matches, limit)]
+
+    def rank(self, matches, limit):
+        if len(matches) * 8 < len(self.ordered):
+            if limit is None:
+                return sorted(matches, key=self.names.__getitem__)
+            return heapq.nsmallest(limit, matches, key=self.names.__getitem__)
+
+        ranked = []
+        for _, game_id in self.ordered:
+            if game_id in matches:
+                ranked.append(game_id)
+                if len(ranked) == limit:
+                    break
+        return ranked
@@ -0,0 +1,203 @@
+"""
+Launch Supervisor for Running Games with the Shell Suspended
+"""
+
+import os
+import sys
+import json
+import select
+import shlex
+import subprocess
+import time
+from datetime import datetime
+from config import settings
+
+READY_ENV = 'GAMING_SYSTEM_READY_FD'
+READY_POLL_INTERVAL = 0.5
+HISTORY_LIMIT = 100
+
+class LaunchSupervisor:
+    """Runs one game at a time while the shell is suspended.
+    
+    Launches are requested from the UI and carried out by the main loop
+    between frames: the display and framebuffer are released, the child is
+    spawned and reaped, and the shell is restored. Each launch records its
+    exit status, runtime and latencies in a persistent history.
+    
+    Games may signal their first frame by writing a byte to the file
+    descriptor named in $GAMING_SYSTEM_READY_FD.
+    """
+    
+    def __init__(self):
+        self.history_path = settings.PATHS['DATA'] / 'launch_history.json'
+        self.history = []
+        self.pending = None
+        self.requested_at = None
+        self.returning = None
+        
+        self.load_history()
+    
+    def load_history(self):
+        try:
+            with open(self.history_path, 'r') as f:
+                self.history = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading launch history: {e}")
+    
+    def save_history(self):
+        self.history = self.history[-HISTORY_LIMIT:]
+        try:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.history_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(self.history, f, indent=2)
+            os.replace(tmp_path, self.history_path)
+        except Exception as e:
+            print(f"Error saving launch history: {e}")
+    
+    def request_launch(self, game):
+        if self.pending or 'executable' not in game:
+            return False
+        self.pending = game
+        self.requested_at = time.perf_counter()
+        return True
+    
+    def build_command(self, game):
+        executable = os.path.join(game['path'], game['executable'])
+        if os.access(executable, os.X_OK):
+            return [executable]
+        # Games copied from FAT-formatted cards often lose the exec bit.
+        try:
+            with open(executable, 'rb') as f:
+                first_line = f.readline().decode(errors='replace').strip()
+        except OSError:
+            first_line = ''
+        if first_line.startswith('#!'):
+            return shlex.split(first_line[2:]) + [executable]
+        if executable.endswith('.py'):
+            return [sys.executable, executable]
+        return ['/bin/sh', executable]
+    
+    def run_pending(self, screen_manager):
+        """Run the requested game to completion; blocks the caller until it exits."""
+        game, self.pending = self.pending, None
+        if game is None:
+            return None
+        
+        record = {
+            'id': game['id'],
+            'name': game.get('name', game['id']),
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'exit_code': None,
+            'runtime': None,
+            'launch_latency': None,
+            'first_frame_latency': None,
+            'return_latency': None,
+            'prewarmed_bytes': 0,
+        }
+        
+        from services.prelaunch import get_prelaunch_warmer
+        record['prewarmed_bytes'] = get_prelaunch_warmer().consume(game['id'])
+        
+        # The game gets the audio device too: no shell music over it, no decoding behind it.
+        from services.audio_player import get_audio_player
+        from services.sound_service import get_sound_service
+        get_sound_service().release()
+        get_audio_player().release_device()
+        screen_manager.suspend(settings.SYSTEM['RELEASE_DISPLAY_ON_LAUNCH'])
+        
+        read_fd, write_fd = os.pipe()
+        env = dict(os.environ, **{READY_ENV: str(write_fd)})
+        cwd = game['path'] if os.path.isdir(game['path']) else os.path.dirname(game['path'])
+        try:
+            process = subprocess.Popen(self.build_command(game), cwd=cwd, env=env, pass_fds=(write_fd,))
+        except OSError as e:
+            print(f"Error launching game: {e}")
+            process = None
+        finally:
+            os.close(write_fd)
+        
+        if process:
+            spawned = time.perf_counter()
+            record['launch_latency'] = spawned - self.requested_at
+            
+            ready_at = self.wait(process, read_fd)
+            exited = time.perf_counter()
+            
+            record['exit_code'] = process.returncode
+            record['runtime'] = exited - spawned
+            if ready_at:
+                record['first_frame_latency'] = ready_at - self.requested_at
+        else:
+            os.close(read_fd)
+            exited = time.perf_counter()
+        
+        screen_manager.resume()
+        # Counted in return_latency, which runs from ``exited`` to the first frame.
+        get_audio_player().restore_device()
+        get_sound_service().restore()
+        self.returning = (record, exited)
+        
+        from services.save_sync import get_save_sync
+        save_sync = get_save_sync()
+        if save_sync:
+            save_sync.request_sync()
+        self.history.append(record)
+        return record
+    
+    def wait(self, process, read_fd):
+        """Wait for the child to exit (reaping it) and return when it reported its first frame."""
+        ready_at = None
+        watching = True
+        while watching:
+            readable, _, _ = select.select([read_fd], [], [], READY_POLL_INTERVAL)
+            if readable:
+                if os.read(read_fd, 64):
+                    ready_at = time.perf_counter()
+                watching = False
+            elif process.poll() is not None:
+                watching = False
+        process.wait()
+        os.close(read_fd)
+        return ready_at
+    
+    def frame_presented(self):
+        """Called by the main loop after each frame; completes the return-to-home measurement."""
+        if self.returning is None:
+            return
+        record, exited = self.returning
+        self.returning = None
+        record['return_latency'] = time.perf_counter() - exited
+        self.save_history()
+        
+        print(f"🎮 {record['name']} exited with {record['exit_code']} after {record['runtime'] or 0:.1f}s "
+              f"(return to home {record['return_latency'] * 1000:.0f}ms)")
+    
+    def latency_summary(self):
+        """Mean launch and first-frame latency for prewarmed vs. cold launches."""
+        summary = {}
+        for label, warm in (('prewarmed', True), ('cold', False)):
+            records = [r for r in self.history if r['launch_latency'] is not None
+                       and bool(r.get('prewarmed_bytes')) == warm]
+            first_frames = [r['first_frame_latency'] for r in records if r['first_frame_latency'] is not None]
+            summary[label] = {
+                'launches': len(records),
+                'launch_latency': sum(r['launch_latency'] for r in records) / len(records) if records else None,
+                'first_frame_latency': sum(first_frames) / len(first_frames) if first_frames else None,
+            }
+        return summary
+    
+    def get_history(self, game_id=None):
+        if game_id is None:
+            return list(self.history)
+        return [record for record in self.history if record['id'] == game_id]
+
+_launch_supervisor = None
+
+def get_launch_supervisor():
+    global _launch_supervisor
+    if _launch_supervisor is None:
+        _launch_supervisor = LaunchSupervisor()
+    return _launch_supervisor
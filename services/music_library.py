@@ -0,0 +1,214 @@
+"""
+SQLite Music Library Indexer
+"""
+
+import os
+import time
+import wave
+import threading
+from pathlib import Path
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, Index, select, func, tuple_, delete, update
+from sqlalchemy.orm import declarative_base, Session
+from config import settings
+
+SCAN_BATCH = 500
+
+Base = declarative_base()
+
+class Track(Base):
+    __tablename__ = 'tracks'
+    
+    id = Column(Integer, primary_key=True)
+    path = Column(String, nullable=False, unique=True)
+    title = Column(String, nullable=False)
+    artist = Column(String, nullable=False)
+    album = Column(String, nullable=False)
+    track_number = Column(Integer, nullable=False, default=0)
+    duration = Column(Float, nullable=False, default=0.0)
+    mtime_ns = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_tracks_title', 'title'),
+        Index('ix_tracks_artist', 'artist'),
+        Index('ix_tracks_album', 'album'),
+        Index('ix_tracks_duration', 'duration'),
+        Index('ix_tracks_mtime', 'mtime_ns'),
+    )
+
+SORT_FIELDS = {
+    'title': Track.title,
+    'artist': Track.artist,
+    'album': Track.album,
+    'duration': Track.duration,
+    'added': Track.mtime_ns,
+}
+
+TRACK_COLUMNS = (Track.id, Track.path, Track.title, Track.artist, Track.album, Track.track_number, Track.duration)
+
+def read_tags(path):
+    """Tag metadata for a file; mutagen when installed, file name and wave headers otherwise."""
+    tags = {'title': path.stem, 'artist': 'Unknown Artist', 'album': 'Unknown Album',
+            'track_number': 0, 'duration': 0.0}
+    try:
+        import mutagen
+    except ImportError:
+        mutagen = None
+    
+    try:
+        if mutagen:
+            audio = mutagen.File(path, easy=True)
+            if audio is not None:
+                for key in ('title', 'artist', 'album'):
+                    if audio.get(key):
+                        tags[key] = audio[key][0]
+                if audio.get('tracknumber'):
+                    number = audio['tracknumber'][0].split('/')[0]
+                    tags['track_number'] = int(number) if number.isdigit() else 0
+                if audio.info:
+                    tags['duration'] = float(audio.info.length)
+        elif path.suffix.lower() == '.wav':
+            with wave.open(str(path), 'rb') as w:
+                tags['duration'] = w.getnframes() / float(w.getframerate())
+    except Exception as e:
+        print(f"Error reading tags for {path.name}: {e}")
+    return tags
+
+class MusicLibrary:
+    """Track index in data/music_library.db, kept current by a background scanner.
+    
+    A scan walks the music folder recursively, keeps rows whose mtime and
+    size are unchanged, reads tags only for new or modified files and
+    deletes rows for files that are gone, committing in batches so readers
+    see progress. Queries page through the table in any SORT_FIELDS order
+    using the column indexes, so nothing loads the whole library at once.
+    """
+    
+    def __init__(self, db_path=None, music_path=None):
+        self.music_path = Path(music_path or settings.PATHS['DATA'] / 'music')
+        db_path = db_path or settings.PATHS['DATA'] / 'music_library.db'
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        self.engine = create_engine(f"sqlite:///{db_path}")
+        event.listen(self.engine, 'connect', self.configure_connection)
+        Base.metadata.create_all(self.engine)
+        
+        self.version = 0
+        self.thread = None
+        self.scan_stats = {'scanned': 0, 'added': 0, 'updated': 0, 'removed': 0, 'elapsed': None}
+    
+    @staticmethod
+    def configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets the UI read while the scanner thread writes.
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+    
+    def start_scan(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self.scan, daemon=True)
+        self.thread.start()
+    
+    def is_scanning(self):
+        return bool(self.thread and self.thread.is_alive())
+    
+    def walk(self, path):
+        formats = set(settings.AUDIO['MUSIC_FORMATS'])
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from self.walk(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in formats:
+                        yield entry
+        except OSError as e:
+            print(f"Error scanning {path}: {e}")
+    
+    def scan(self):
+        start = time.perf_counter()
+        stats = {'scanned': 0, 'added': 0, 'updated': 0, 'removed': 0, 'elapsed': None}
+        self.music_path.mkdir(parents=True, exist_ok=True)
+        
+        with Session(self.engine) as session:
+            known = {path: (track_id, mtime_ns, size) for track_id, path, mtime_ns, size
+                     in session.execute(select(Track.id, Track.path, Track.mtime_ns, Track.size))}
+            seen = set()
+            pending = 0
+            
+            for entry in self.walk(self.music_path):
+                stats['scanned'] += 1
+                seen.add(entry.path)
+                st = entry.stat()
+                row = known.get(entry.path)
+                if row and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+                    continue
+                
+                values = dict(read_tags(Path(entry.path)), mtime_ns=st.st_mtime_ns, size=st.st_size)
+                if row:
+                    session.execute(update(Track).where(Track.id == row[0]).values(**values))
+                    stats['updated'] += 1
+                else:
+                    session.add(Track(path=entry.path, **values))
+                    stats['added'] += 1
+                
+                pending += 1
+                if pending >= SCAN_BATCH:
+                    session.commit()
+                    self.version += 1
+                    pending = 0
+            
+            removed = [row[0] for path, row in known.items() if path not in seen]
+            for i in range(0, len(removed), SCAN_BATCH):
+                session.execute(delete(Track).where(Track.id.in_(removed[i:i + SCAN_BATCH])))
+            stats['removed'] = len(removed)
+            
+            if pending or removed:
+                session.commit()
+                self.version += 1
+        
+        stats['elapsed'] = time.perf_counter() - start
+        self.scan_stats = stats
+    
+    def order_by(self, sort, descending=False):
+        column = SORT_FIELDS[sort]
+        if descending:
+            return (column.desc(), Track.id.desc())
+        return (column, Track.id)
+    
+    def count(self):
+        with Session(self.engine) as session:
+            return session.scalar(select(func.count(Track.id)))
+    
+    def get_tracks(self, sort='title', descending=False, offset=0, limit=50):
+        """A page of tracks as dicts, ordered by ``sort`` (a SORT_FIELDS key)."""
+        query = select(*TRACK_COLUMNS).order_by(*self.order_by(sort, descending)).offset(offset).limit(limit)
+        with Session(self.engine) as session:
+            return [dict(row._mapping) for row in session.execute(query)]
+    
+    def get_tracks_by_ids(self, track_ids):
+        """Tracks for a list of ids, in the same order; None where an id is no longer indexed."""
+        with Session(self.engine) as session:
+            rows = {row.id: dict(row._mapping) for row in
+                    session.execute(select(*TRACK_COLUMNS).where(Track.id.in_(set(track_ids))))}
+        return [rows.get(track_id) for track_id in track_ids]
+    
+    def position(self, track_id, sort='title', descending=False):
+        """Index of a track in the given order, or None if it is no longer indexed."""
+        column = SORT_FIELDS[sort]
+        with Session(self.engine) as session:
+            value = session.scalar(select(column).where(Track.id == track_id))
+            if value is None:
+                return None
+            key = tuple_(column, Track.id)
+            before = key > tuple_(value, track_id) if descending else key < tuple_(value, track_id)
+            return session.scalar(select(func.count(Track.id)).where(before))
+
+_music_library = None
+
+def get_music_library():
+    global _music_library
+    if _music_library is None:
+        _music_library = MusicLibrary()
+    return _music_library
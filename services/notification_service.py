@@ -2,6 +2,8 @@
 Notification Service for system-wide notifications
 """
 
+from services.sound_service import get_sound_service
+
 class NotificationService:
     def __init__(self):
         self.notifications = []
@@ -15,6 +17,7 @@ class NotificationService:
             'timestamp': 0
         }
         self.notifications.append(notification)
+        get_sound_service().play('notification')
     
     def set_badge(self, app_name, count):
         self.badges[app_name] = count
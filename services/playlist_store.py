@@ -0,0 +1,403 @@
+"""
+Paged Playlist Files with Lazy Loading
+"""
+
+import os
+import sys
+import struct
+import random
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from config import settings
+
+MAGIC = b'GSPL'
+FORMAT_VERSION = 1
+PAGE_BYTES = 4096
+PAGE_ENTRIES = PAGE_BYTES // 4
+# Header: magic, version, reserved, shuffle seed, entry count, first table page, generation.
+HEADER = struct.Struct('<4sHHQIIQ')
+# Table pages: next table page, entries on this page, then (slot, used) pairs.
+TABLE_HEADER = struct.Struct('<II')
+TABLE_ENTRY = struct.Struct('<II')
+TABLE_ENTRIES = (PAGE_BYTES - TABLE_HEADER.size) // TABLE_ENTRY.size
+NO_SLOT = 0xFFFFFFFF
+CACHED_PAGES = 16
+EXTENSION = '.playlist'
+
+def feistel_round(value, seed, round_key, mask):
+    mixed = (value * 0x9E3779B1 + seed + round_key * 0x85EBCA77) & 0xFFFFFFFFFFFFFFFF
+    mixed ^= mixed >> 29
+    mixed = (mixed * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    return (mixed >> 31) & mask
+
+def feistel_permute(index, count, seed, inverse=False):
+    """Map index to a unique position in range(count), shuffled by seed.
+    
+    A four-round Feistel network is a bijection on 2**(2*half) values;
+    cycle-walking folds it onto range(count). Any position can be mapped
+    on its own, so a shuffled playlist never materializes its order.
+    inverse=True undoes the mapping.
+    """
+    half = max(1, ((count - 1).bit_length() + 1) // 2)
+    mask = (1 << half) - 1
+    x = index
+    while True:
+        left, right = x >> half, x & mask
+        if inverse:
+            for round_key in range(3, -1, -1):
+                left, right = right ^ feistel_round(left, seed, round_key, mask), left
+        else:
+            for round_key in range(4):
+                left, right = right, left ^ feistel_round(right, seed, round_key, mask)
+        x = (left << half) | right
+        if x < count:
+            return x
+
+class Playlist:
+    """A playlist of library track ids stored in fixed 4 KB pages.
+    
+    The header points at an offset table listing, in order, which page
+    slot holds each run of entries and how many it uses. Opening reads
+    only the header and the table; pages are read when an index in them
+    is asked for. Edits are copy-on-write: changed pages and a new table
+    go to free slots, then the header is rewritten to point at them, so
+    an insert or delete writes a few pages whatever the playlist's size
+    and a crash leaves the previous version intact. Shuffle is a seed in
+    the header; positions are mapped through feistel_permute on read.
+    
+    Edits apply in memory and write their pages at once, but the commit
+    (fsync, then the header) runs on a writer thread, so a button press
+    never waits on the SD card. Edits arriving during a commit are folded
+    into the next one.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)[:-len(EXTENSION)]
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.lock = threading.RLock()
+        self.commit_lock = threading.Lock()
+        self.dirty = False
+        self.writer = None
+        self.wake_event = threading.Event()
+        
+        self.table = []
+        self.starts = []
+        self.count = 0
+        self.seed = 0
+        self.generation = 0
+        self.table_slots = []
+        self.free = []
+        self.released = []
+        self.released_before = []
+        self.slot_count = 0
+        self.pages = OrderedDict()
+        self.stats = {'page_reads': 0, 'page_writes': 0, 'commits': 0}
+        
+        self.load()
+    
+    def load(self):
+        header = os.pread(self.fd, HEADER.size, 0)
+        if len(header) < HEADER.size:
+            self.dirty = True
+            self.commit()
+            return
+        magic, version, _, self.seed, self.count, table_slot, self.generation = HEADER.unpack(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} playlist")
+        
+        while table_slot != NO_SLOT:
+            self.table_slots.append(table_slot)
+            data = self.read_slot(table_slot)
+            table_slot, entries = TABLE_HEADER.unpack_from(data)
+            for i in range(entries):
+                self.table.append(list(TABLE_ENTRY.unpack_from(data, TABLE_HEADER.size + i * TABLE_ENTRY.size)))
+        self.reindex()
+        
+        self.slot_count = max(0, os.fstat(self.fd).st_size // PAGE_BYTES - 1)
+        used = set(self.table_slots) | {slot for slot, _ in self.table}
+        self.free = [slot for slot in range(self.slot_count - 1, -1, -1) if slot not in used]
+    
+    def close(self):
+        self.flush()
+        with self.commit_lock, self.lock:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+        self.wake_event.set()
+    
+    def __len__(self):
+        return self.count
+    
+    def reindex(self):
+        self.starts = []
+        total = 0
+        for _, used in self.table:
+            self.starts.append(total)
+            total += used
+        self.count = total
+    
+    def read_slot(self, slot):
+        self.stats['page_reads'] += 1
+        return os.pread(self.fd, PAGE_BYTES, (slot + 1) * PAGE_BYTES)
+    
+    def write_slot(self, slot, data):
+        self.stats['page_writes'] += 1
+        os.pwrite(self.fd, data.ljust(PAGE_BYTES, b'\0'), (slot + 1) * PAGE_BYTES)
+    
+    def allocate(self):
+        if self.free:
+            return self.free.pop()
+        self.slot_count += 1
+        return self.slot_count - 1
+    
+    def page(self, page_index):
+        """Entries of the page at a table position, read from disk on first use."""
+        slot, used = self.table[page_index]
+        entries = self.pages.get(slot)
+        if entries is None:
+            entries = array('I')
+            entries.frombytes(self.read_slot(slot)[:used * 4])
+            if sys.byteorder == 'big':
+                entries.byteswap()
+            self.pages[slot] = entries
+            while len(self.pages) > CACHED_PAGES:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(slot)
+        return entries
+    
+    def locate(self, index):
+        """(table position, offset in page) of a stored index."""
+        page_index = bisect_right(self.starts, index) - 1
+        return page_index, index - self.starts[page_index]
+    
+    def stored_index(self, position):
+        return feistel_permute(position, self.count, self.seed) if self.seed else position
+    
+    def get(self, position):
+        """Track id at a play-order position (shuffled when shuffle is on)."""
+        with self.lock:
+            if not 0 <= position < self.count:
+                raise IndexError(position)
+            page_index, offset = self.locate(self.stored_index(position))
+            return self.page(page_index)[offset]
+    
+    def slice(self, start, limit):
+        """Track ids for positions start..start+limit, touching only the pages they live in."""
+        with self.lock:
+            stop = min(self.count, start + limit)
+            if not self.seed:
+                ids = []
+                index = start
+                while index < stop:
+                    page_index, offset = self.locate(index)
+                    entries = self.page(page_index)
+                    ids.extend(entries[offset:offset + stop - index])
+                    index = self.starts[page_index] + len(entries)
+                return ids
+            return [self.get(position) for position in range(start, stop)]
+    
+    def index_of(self, track_id):
+        """Play-order position of the first entry with this id, or None (scans every page)."""
+        with self.lock:
+            for page_index, start in enumerate(self.starts):
+                entries = self.page(page_index)
+                if track_id in entries:
+                    stored = start + entries.index(track_id)
+                    if not self.seed:
+                        return stored
+                    return feistel_permute(stored, self.count, self.seed, inverse=True)
+            return None
+    
+    def put_pages(self, page_index, remove, entries):
+        """Replace ``remove`` table entries at page_index with new pages holding ``entries``."""
+        new = []
+        pages = max(1, -(-len(entries) // PAGE_ENTRIES)) if entries else 0
+        for i in range(pages):
+            # Split evenly so the new pages keep room for later inserts.
+            chunk = entries[i * len(entries) // pages:(i + 1) * len(entries) // pages]
+            slot = self.allocate()
+            data = array('I', chunk)
+            self.pages[slot] = array('I', data)
+            if sys.byteorder == 'big':
+                data.byteswap()
+            self.write_slot(slot, data.tobytes())
+            new.append([slot, len(chunk)])
+        for slot, _ in self.table[page_index:page_index + remove]:
+            self.released.append(slot)
+            self.pages.pop(slot, None)
+        self.table[page_index:page_index + remove] = new
+    
+    def insert(self, index, track_ids):
+        """Insert ids before stored index ``index`` (the unshuffled order)."""
+        track_ids = list(track_ids)
+        if not track_ids:
+            return
+        with self.lock:
+            self.insert_entries(max(0, min(index, self.count)), track_ids)
+            self.schedule_commit()
+    
+    def insert_entries(self, index, track_ids):
+        if not self.table:
+            self.put_pages(0, 0, track_ids)
+            return
+        page_index, offset = self.locate(index)
+        entries = list(self.page(page_index))
+        self.put_pages(page_index, 1, entries[:offset] + track_ids + entries[offset:])
+    
+    def append(self, track_ids):
+        self.insert(self.count, track_ids)
+    
+    def delete(self, index, length=1):
+        """Remove ``length`` entries starting at stored index ``index``."""
+        with self.lock:
+            length = min(length, self.count - index)
+            if index < 0 or length <= 0:
+                return
+            self.remove_range(index, length)
+            self.schedule_commit()
+    
+    def remove_range(self, index, length):
+        first, offset = self.locate(index)
+        last, last_offset = self.locate(index + length - 1)
+        kept = list(self.page(first)[:offset]) + list(self.page(last)[last_offset + 1:])
+        self.put_pages(first, last - first + 1, kept)
+    
+    def move(self, source, target):
+        """Move the entry at stored index ``source`` so it ends up at ``target``."""
+        with self.lock:
+            if source == target or not (0 <= source < self.count and 0 <= target < self.count):
+                return
+            page_index, offset = self.locate(source)
+            track_id = self.page(page_index)[offset]
+            self.remove_range(source, 1)
+            self.reindex()
+            self.insert_entries(target, [track_id])
+            self.schedule_commit()
+    
+    def shuffle(self, seed=None):
+        """Turn shuffle on with a new (or given) seed; no entry is rewritten."""
+        with self.lock:
+            self.seed = seed if seed is not None else random.getrandbits(63) | 1
+            self.schedule_commit()
+    
+    def unshuffle(self):
+        with self.lock:
+            self.seed = 0
+            self.schedule_commit()
+    
+    def schedule_commit(self):
+        """Count the edit in and hand the commit to the writer thread."""
+        self.reindex()
+        self.dirty = True
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.run_writer, daemon=True)
+            self.writer.start()
+        self.wake_event.set()
+    
+    def run_writer(self):
+        while True:
+            self.wake_event.wait()
+            self.wake_event.clear()
+            if self.fd is None:
+                return
+            try:
+                self.commit()
+            except OSError as e:
+                print(f"Error committing playlist {self.name}: {e}")
+    
+    def flush(self):
+        """Commit pending edits on the calling thread, e.g. before closing."""
+        self.commit()
+    
+    def commit(self):
+        """Write the offset table to free slots and switch the header over to it.
+        
+        The table and header are built under the lock; the fsync runs
+        outside it, so reads and further edits carry on meanwhile. Those
+        only ever write to free slots, which no durable header refers to.
+        """
+        with self.commit_lock:
+            with self.lock:
+                if not self.dirty or self.fd is None:
+                    return
+                self.dirty = False
+                self.reindex()
+                old_table_slots = self.table_slots
+                self.table_slots = [self.allocate() for _ in range(-(-len(self.table) // TABLE_ENTRIES))]
+                for i, slot in enumerate(self.table_slots):
+                    chunk = self.table[i * TABLE_ENTRIES:(i + 1) * TABLE_ENTRIES]
+                    next_slot = self.table_slots[i + 1] if i + 1 < len(self.table_slots) else NO_SLOT
+                    data = TABLE_HEADER.pack(next_slot, len(chunk)) + b''.join(TABLE_ENTRY.pack(*entry) for entry in chunk)
+                    self.write_slot(slot, data)
+                generation = self.generation + 1
+                head = self.table_slots[0] if self.table_slots else NO_SLOT
+                header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, self.seed, self.count, head, generation)
+                released = self.released + old_table_slots
+                self.released = []
+            
+            # Pages and table must be on disk before the header refers to them.
+            os.fsync(self.fd)
+            os.pwrite(self.fd, header.ljust(PAGE_BYTES, b'\0'), 0)
+            
+            with self.lock:
+                self.generation = generation
+                self.stats['commits'] += 1
+                # Slots dropped by the previous commit are safe to reuse now that the
+                # header written before this fsync no longer refers to them.
+                self.free.extend(self.released_before)
+                self.released_before = released
+    
+    def get_stats(self):
+        return dict(self.stats, entries=self.count, pages=len(self.table), slots=self.slot_count,
+                    free=len(self.free), cached=len(self.pages), shuffled=bool(self.seed), pending=self.dirty)
+
+class PlaylistStore:
+    """Playlists as <name>.playlist files under PATHS['PLAYLISTS']."""
+    
+    def __init__(self, root=None):
+        self.root = root or settings.PATHS['PLAYLISTS']
+        self.open_playlists = {}
+    
+    def path_for(self, name):
+        return os.path.join(self.root, f"{name}{EXTENSION}")
+    
+    def list_playlists(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-len(EXTENSION)] for name in os.listdir(self.root) if name.endswith(EXTENSION))
+    
+    def open(self, name):
+        """Open (creating if needed) a playlist; repeated opens share one instance."""
+        playlist = self.open_playlists.get(name)
+        if playlist is None:
+            os.makedirs(self.root, exist_ok=True)
+            playlist = Playlist(self.path_for(name))
+            self.open_playlists[name] = playlist
+        return playlist
+    
+    def close(self):
+        """Commit pending edits and close every open playlist."""
+        for playlist in self.open_playlists.values():
+            playlist.close()
+        self.open_playlists.clear()
+    
+    def delete(self, name):
+        playlist = self.open_playlists.pop(name, None)
+        if playlist:
+            playlist.close()
+        try:
+            os.remove(self.path_for(name))
+        except FileNotFoundError:
+            pass
+
+_playlist_store = None
+
+def get_playlist_store():
+    global _playlist_store
+    if _playlist_store is None:
+        _playlist_store = PlaylistStore()
+    return _playlist_store
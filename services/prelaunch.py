@@ -0,0 +1,174 @@
+"""
+Prelaunch Warmer for Highlighted Games
+"""
+
+import os
+import heapq
+import threading
+from collections import Counter
+from config import settings
+
+CHUNK_BYTES = 1024 * 1024
+
+class PrelaunchWarmer:
+    """Pulls a game's files into the page cache while it is highlighted.
+    
+    After the selection has rested on a game for PREWARM_DELAY seconds, a
+    background thread asks the kernel to read ahead the executable and the
+    largest files in the game folder, up to PREWARM_BUDGET bytes, in
+    CHUNK_BYTES steps. Moving the selection cancels the pass between
+    chunks. Launch history predicts which game to warm when no game is
+    highlighted.
+    
+    Only a pass that finished during the current highlight counts as warm;
+    launching consumes it, so the game is warmed again the next time it is
+    highlighted instead of trusting pages that may since have been evicted.
+    """
+    
+    def __init__(self):
+        self.enabled = settings.LIBRARY['PREWARM']
+        self.target = None
+        self.cancel_event = threading.Event()
+        self.thread = None
+        # Guards stats and session against the warming threads.
+        self.lock = threading.Lock()
+        # (game id, bytes advised) of the pass that finished for the current highlight.
+        self.session = None
+        self.stats = {'started': 0, 'completed': 0, 'cancelled': 0, 'bytes': 0}
+    
+    def predict(self, games):
+        """The most launched of the given games, from the launch history."""
+        from services.launch_supervisor import get_launch_supervisor
+        counts = Counter(record['id'] for record in get_launch_supervisor().get_history())
+        ids = {game['id']: game for game in games}
+        for game_id, _ in counts.most_common():
+            if game_id in ids:
+                return ids[game_id]
+        return None
+    
+    def select(self, game):
+        """Warm ``game`` (or nothing, for None), cancelling any other pass in flight."""
+        if not self.enabled:
+            return
+        game_id = game['id'] if game else None
+        if game_id == self.target:
+            return
+        
+        self.cancel()
+        self.target = game_id
+        if game is None:
+            return
+        
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.warm, args=(game, self.cancel_event), daemon=True)
+        self.thread.start()
+    
+    def cancel(self):
+        with self.lock:
+            self.cancel_event.set()
+            self.session = None
+        self.target = None
+    
+    def plan(self, game, budget=None):
+        """(path, length) pairs to read ahead: the executable first, then the largest files."""
+        executable = os.path.join(game['path'], game['executable'])
+        candidates = []
+        for root, _, names in os.walk(game['path']):
+            for name in names:
+                path = os.path.join(root, name)
+                if path == executable or os.path.islink(path):
+                    continue
+                try:
+                    candidates.append((os.stat(path).st_size, path))
+                except OSError:
+                    pass
+        
+        paths = [executable] + [path for _, path in heapq.nlargest(settings.LIBRARY['PREWARM_FILES'], candidates)]
+        remaining = settings.LIBRARY['PREWARM_BUDGET'] if budget is None else budget
+        plan = []
+        for path in paths:
+            if remaining <= 0:
+                break
+            try:
+                length = min(os.stat(path).st_size, remaining)
+            except OSError:
+                continue
+            plan.append((path, length))
+            remaining -= length
+        return plan
+    
+    def warm(self, game, cancel_event, delay=None):
+        if cancel_event.wait(settings.LIBRARY['PREWARM_DELAY'] if delay is None else delay):
+            return 0
+        
+        with self.lock:
+            self.stats['started'] += 1
+        advised = 0
+        for path, length in self.plan(game):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                for offset in range(0, length, CHUNK_BYTES):
+                    if cancel_event.is_set():
+                        return self.finish(game, cancel_event, advised)
+                    size = min(CHUNK_BYTES, length - offset)
+                    advise(fd, offset, size, 'WILLNEED')
+                    advised += size
+            finally:
+                os.close(fd)
+        
+        return self.finish(game, cancel_event, advised)
+    
+    def finish(self, game, cancel_event, advised):
+        """Count the pass, and make it the session unless it was cancelled meanwhile."""
+        with self.lock:
+            if cancel_event.is_set():
+                self.stats['cancelled'] += 1
+            else:
+                self.session = (game['id'], advised)
+                self.stats['completed'] += 1
+            self.stats['bytes'] += advised
+        return advised
+    
+    def evict(self, game):
+        """Drop the game's files from the page cache, for cold-launch measurements."""
+        with self.lock:
+            if self.session and self.session[0] == game['id']:
+                self.session = None
+        for path, length in self.plan(game, budget=float('inf')):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                advise(fd, 0, length, 'DONTNEED')
+            finally:
+                os.close(fd)
+    
+    def consume(self, game_id):
+        """Bytes warmed for ``game_id`` in the current highlight (0 if none), ending the session."""
+        with self.lock:
+            warmed = self.session[1] if self.session and self.session[0] == game_id else 0
+        self.cancel()
+        return warmed
+    
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, warm_game=self.session[0] if self.session else None)
+
+def advise(fd, offset, length, advice):
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(fd, offset, length, getattr(os, f'POSIX_FADV_{advice}'))
+    elif advice == 'WILLNEED':
+        # No fadvise (e.g. macOS): reading the range has the same effect.
+        os.pread(fd, length, offset)
+
+_prelaunch_warmer = None
+
+def get_prelaunch_warmer():
+    global _prelaunch_warmer
+    if _prelaunch_warmer is None:
+        _prelaunch_warmer = PrelaunchWarmer()
+    return _prelaunch_warmer
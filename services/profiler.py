@@ -0,0 +1,145 @@
+"""
+Frame-Time Profiler with Rolling Percentiles and On-Screen Overlay
+"""
+
+import json
+import time
+from collections import deque
+import pygame
+from config import settings
+
+OVERLAY_ROWS = 12
+OVERLAY_WIDTH = 360
+OVERLAY_LINE_HEIGHT = 14
+
+class Section:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class NullSection:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SECTION = NullSection()
+
+class FrameProfiler:
+    def __init__(self):
+        self.enabled = settings.DEBUG['PROFILER']
+        self.overlay_visible = False
+        self.window = settings.DEBUG['PROFILER_WINDOW']
+        self.frame_budget = 1.0 / settings.DISPLAY['FPS']
+        
+        self.samples = {}
+        self.frames = 0
+        self.dropped_frames = 0
+        self.frame_start = None
+        self.font = None
+    
+    def section(self, name):
+        if not self.enabled:
+            return NULL_SECTION
+        return Section(self, name)
+    
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds * 1000.0)
+    
+    def begin_frame(self, frame_budget=None):
+        if not self.enabled:
+            return
+        if frame_budget:
+            self.frame_budget = frame_budget
+        self.frame_start = time.perf_counter()
+    
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        elapsed = time.perf_counter() - self.frame_start
+        self.frame_start = None
+        self.frames += 1
+        if elapsed > self.frame_budget:
+            self.dropped_frames += 1
+        self.record('frame', elapsed)
+    
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        if self.overlay_visible:
+            self.enabled = True
+    
+    def get_report(self):
+        sections = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            sections[name] = {
+                'count': len(ordered),
+                'p50_ms': percentile(ordered, 50),
+                'p95_ms': percentile(ordered, 95),
+                'p99_ms': percentile(ordered, 99),
+                'max_ms': ordered[-1] if ordered else 0.0,
+            }
+        return {
+            'frames': self.frames,
+            'dropped_frames': self.dropped_frames,
+            'frame_budget_ms': self.frame_budget * 1000.0,
+            'sections': sections,
+        }
+    
+    def render_overlay(self, surface):
+        """Draw the overlay on the top surface and return the rect it covers."""
+        from ui.fonts import get_font
+        if self.font is None:
+            self.font = get_font(settings.FONTS['SMALL'] + 2)
+        
+        report = self.get_report()
+        lines = [f"frames {report['frames']}  dropped {report['dropped_frames']}  "
+                 f"budget {report['frame_budget_ms']:.1f}ms"]
+        lines.append("section                      p50    p95    p99")
+        ranked = sorted(report['sections'].items(), key=lambda item: item[1]['p95_ms'], reverse=True)
+        for name, stats in ranked[:OVERLAY_ROWS - 2]:
+            lines.append(f"{name[:26]:<26} {stats['p50_ms']:6.2f} {stats['p95_ms']:6.2f} {stats['p99_ms']:6.2f}")
+        
+        rect = pygame.Rect(surface.get_width() - OVERLAY_WIDTH - 5, 35,
+                           OVERLAY_WIDTH, len(lines) * OVERLAY_LINE_HEIGHT + 8)
+        pygame.draw.rect(surface, settings.COLORS['BLACK'], rect)
+        for i, line in enumerate(lines):
+            # Values change every frame, so these bypass the shared text cache.
+            text_surf = self.font.render(line, True, settings.COLORS['SUCCESS'])
+            surface.blit(text_surf, (rect.x + 4, rect.y + 4 + i * OVERLAY_LINE_HEIGHT))
+        return rect
+    
+    def dump(self, path=None):
+        if not self.enabled or not self.frames:
+            return None
+        path = path or settings.PATHS['DATA'] / 'profile.json'
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(self.get_report(), f, indent=2)
+            print(f"📊 Frame profile written to {path}")
+            return path
+        except Exception as e:
+            print(f"Error writing frame profile: {e}")
+            return None
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+profiler = FrameProfiler()
@@ -0,0 +1,323 @@
+"""
+Deduplicating Save Data Sync with Content-Defined Chunks
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+import numpy as np
+from config import settings
+
+INDEX_VERSION = 1
+
+# Gear table for the rolling hash. Derived from SHA-256 so chunk boundaries
+# stay identical across installs and library versions.
+GEAR = np.array([int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], 'little') for i in range(256)],
+                dtype=np.uint32)
+
+def chunk_boundaries(data, min_size=None, avg_size=None, max_size=None):
+    """Return (offset, length) of content-defined chunks (gear hash, FastCDC-style).
+    
+    A boundary follows every byte where the rolling hash
+    sum(GEAR[data[i - k]] << k) has its low log2(avg_size) bits clear, so an
+    edit only moves the boundaries next to it and the remaining chunks keep
+    their hashes. Only the last log2(avg_size) bytes affect those bits, which
+    lets NumPy evaluate every position at once instead of looping per byte.
+    Chunks are then cut at the first candidate past min_size, or at max_size.
+    """
+    min_size = min_size or settings.SAVE_SYNC['MIN_CHUNK']
+    avg_size = avg_size or settings.SAVE_SYNC['AVG_CHUNK']
+    max_size = max_size or settings.SAVE_SYNC['MAX_CHUNK']
+    bits = avg_size.bit_length() - 1
+    
+    length = len(data)
+    gear = GEAR[np.frombuffer(data, dtype=np.uint8)]
+    h = gear.copy()
+    for k in range(1, min(bits, length)):
+        h[k:] += gear[:length - k] << np.uint32(k)
+    candidates = np.flatnonzero((h & np.uint32((1 << bits) - 1)) == 0) + 1
+    
+    chunks = []
+    start = 0
+    while start < length:
+        i = np.searchsorted(candidates, start + min_size)
+        cut = candidates[i] if i < len(candidates) else length
+        cut = min(int(cut), start + max_size, length)
+        chunks.append((start, cut - start))
+        start = cut
+    return chunks
+
+def chunk_file(path):
+    """Returns (chunk hashes, {hash: (offset, length)}) for a file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    hashes = []
+    offsets = {}
+    for offset, length in chunk_boundaries(data):
+        digest = hashlib.sha256(data[offset:offset + length]).hexdigest()
+        hashes.append(digest)
+        offsets.setdefault(digest, (offset, length))
+    return hashes, offsets
+
+class LocalDirectoryStore:
+    """Remote store backed by a directory: chunks/<ab>/<hash> plus manifest.json.
+    
+    Also the reference for other stores; anything with these five methods
+    can be passed to SaveSync.
+    """
+    
+    def __init__(self, root):
+        self.root = Path(root)
+        self.chunks_path = self.root / 'chunks'
+        self.manifest_path = self.root / 'manifest.json'
+    
+    def chunk_path(self, chunk_id):
+        return self.chunks_path / chunk_id[:2] / chunk_id
+    
+    def has_chunks(self, chunk_ids):
+        return {chunk_id for chunk_id in chunk_ids if self.chunk_path(chunk_id).exists()}
+    
+    def put_chunk(self, chunk_id, data):
+        path = self.chunk_path(chunk_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, data)
+    
+    def get_chunk(self, chunk_id):
+        with open(self.chunk_path(chunk_id), 'rb') as f:
+            return f.read()
+    
+    def get_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'files': {}}
+    
+    def put_manifest(self, manifest):
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.manifest_path, json.dumps(manifest, indent=1).encode())
+
+def write_atomic(path, data):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class SaveSync:
+    """Two-way sync of PATHS['SAVES'] against a remote store.
+    
+    The local index remembers, per save file, the stat signature and chunk
+    list last seen on disk and the chunk list at the last successful sync
+    (the base). Only files whose local or remote chunk list moved away
+    from the base are transferred, and only the chunks the other side
+    lacks: uploads skip chunks the store already has, downloads rebuild
+    the file from chunks already present in the local copy. When both
+    sides changed, the newer modification time wins.
+    """
+    
+    def __init__(self, store, saves_path=None):
+        self.store = store
+        self.saves_path = Path(saves_path or settings.PATHS['SAVES'])
+        self.index_path = settings.PATHS['DATA'] / 'save_index.json'
+        self.index = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.wake_event = threading.Event()
+        self.running = False
+        self.last_stats = None
+        
+        self.load_index()
+    
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error loading save index: {e}")
+            return
+        if index.get('version') == INDEX_VERSION:
+            self.index = index['files']
+    
+    def save_index(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.index_path, json.dumps({'version': INDEX_VERSION, 'files': self.index}).encode())
+    
+    def scan_local(self):
+        """Chunk lists of the local saves, re-chunking only files whose stat changed.
+        
+        Also returns the files that could not be read; sync() leaves those
+        alone this pass rather than mistaking them for deletions.
+        """
+        local = {}
+        offsets = {}
+        failed = set()
+        if not self.saves_path.exists():
+            return local, offsets, failed
+        for root, _, names in os.walk(self.saves_path):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = Path(root) / name
+                rel = path.relative_to(self.saves_path).as_posix()
+                try:
+                    st = path.stat()
+                    cached = self.index.get(rel)
+                    if cached and cached['mtime_ns'] == st.st_mtime_ns and cached['size'] == st.st_size:
+                        chunks = cached['chunks']
+                    else:
+                        chunks, offsets[rel] = chunk_file(path)
+                except Exception as e:
+                    print(f"Error reading save {rel}: {e}")
+                    failed.add(rel)
+                    continue
+                local[rel] = {'chunks': chunks, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        return local, offsets, failed
+    
+    def sync(self):
+        """Run one sync pass; returns transfer statistics."""
+        with self.lock:
+            start = time.perf_counter()
+            stats = {'uploaded_files': 0, 'downloaded_files': 0, 'deleted_files': 0,
+                     'uploaded_bytes': 0, 'downloaded_bytes': 0,
+                     'uploaded_chunks': 0, 'downloaded_chunks': 0, 'reused_chunks': 0}
+            
+            local, offsets, failed = self.scan_local()
+            manifest = self.store.get_manifest()
+            remote = manifest.setdefault('files', {})
+            manifest_changed = False
+            
+            for rel in sorted((set(local) | set(remote) | set(self.index)) - failed):
+                base = self.index.get(rel, {}).get('base')
+                mine = local.get(rel)
+                theirs = remote.get(rel)
+                mine_chunks = mine['chunks'] if mine else None
+                theirs_chunks = theirs['chunks'] if theirs else None
+                
+                local_changed = mine_chunks != base
+                remote_changed = theirs_chunks != base
+                if mine_chunks == theirs_chunks:
+                    action = None
+                elif local_changed and remote_changed:
+                    # Conflict: keep the newer copy, and never let a deletion win over an edit.
+                    if mine and theirs:
+                        action = 'upload' if mine['mtime_ns'] >= theirs['mtime_ns'] else 'download'
+                    else:
+                        action = 'upload' if mine else 'download'
+                elif local_changed:
+                    action = 'upload' if mine else 'delete_remote'
+                else:
+                    action = 'download' if theirs else 'delete_local'
+                
+                try:
+                    if action == 'upload':
+                        self.upload(rel, mine_chunks, offsets.get(rel), stats)
+                        remote[rel] = {'chunks': mine_chunks, 'size': mine['size'], 'mtime_ns': mine['mtime_ns']}
+                        manifest_changed = True
+                        stats['uploaded_files'] += 1
+                    elif action == 'download':
+                        mine = self.download(rel, theirs, mine, offsets.get(rel), stats)
+                        stats['downloaded_files'] += 1
+                    elif action == 'delete_remote':
+                        del remote[rel]
+                        manifest_changed = True
+                        stats['deleted_files'] += 1
+                    elif action == 'delete_local':
+                        (self.saves_path / rel).unlink(missing_ok=True)
+                        mine = None
+                        stats['deleted_files'] += 1
+                except Exception as e:
+                    # Leave the index as it was so the file is retried next pass.
+                    print(f"Error syncing save {rel}: {e}")
+                    continue
+                
+                if mine:
+                    self.index[rel] = dict(mine, base=mine['chunks'])
+                else:
+                    self.index.pop(rel, None)
+            
+            if manifest_changed:
+                self.store.put_manifest(manifest)
+            self.save_index()
+            
+            stats['elapsed'] = time.perf_counter() - start
+            self.last_stats = stats
+            return stats
+    
+    def read_chunks(self, rel, offsets):
+        """{hash: bytes} for every chunk of the current local copy of a file."""
+        path = self.saves_path / rel
+        if not path.exists():
+            return {}
+        if offsets is None:
+            _, offsets = chunk_file(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        return {digest: data[offset:offset + length] for digest, (offset, length) in offsets.items()}
+    
+    def upload(self, rel, chunks, offsets, stats):
+        missing = set(chunks) - self.store.has_chunks(set(chunks))
+        stats['reused_chunks'] += len(set(chunks)) - len(missing)
+        if not missing:
+            return
+        pieces = self.read_chunks(rel, offsets)
+        for chunk_id in missing:
+            self.store.put_chunk(chunk_id, pieces[chunk_id])
+            stats['uploaded_chunks'] += 1
+            stats['uploaded_bytes'] += len(pieces[chunk_id])
+    
+    def download(self, rel, theirs, mine, offsets, stats):
+        pieces = self.read_chunks(rel, offsets) if mine else {}
+        stats['reused_chunks'] += len(set(theirs['chunks']) & pieces.keys())
+        for chunk_id in set(theirs['chunks']) - pieces.keys():
+            pieces[chunk_id] = self.store.get_chunk(chunk_id)
+            stats['downloaded_chunks'] += 1
+            stats['downloaded_bytes'] += len(pieces[chunk_id])
+        
+        path = self.saves_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, b''.join(pieces[chunk_id] for chunk_id in theirs['chunks']))
+        os.utime(path, ns=(theirs['mtime_ns'], theirs['mtime_ns']))
+        st = path.stat()
+        return {'chunks': theirs['chunks'], 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    
+    def start(self, interval=None):
+        """Sync in a background thread every ``interval`` seconds and on request_sync()."""
+        if self.running:
+            return
+        self.running = True
+        interval = interval or settings.SAVE_SYNC['INTERVAL']
+        self.thread = threading.Thread(target=self.run, args=(interval,), daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.running = False
+        self.wake_event.set()
+    
+    def request_sync(self):
+        self.wake_event.set()
+    
+    def run(self, interval):
+        while self.running:
+            try:
+                stats = self.sync()
+                if stats['uploaded_files'] or stats['downloaded_files'] or stats['deleted_files']:
+                    print(f"💾 Saves synced: ↑{stats['uploaded_bytes']} B ↓{stats['downloaded_bytes']} B "
+                          f"in {stats['elapsed'] * 1000:.0f}ms")
+            except Exception as e:
+                print(f"Error syncing saves: {e}")
+            self.wake_event.wait(interval)
+            self.wake_event.clear()
+
+_save_sync = None
+
+def get_save_sync():
+    """Shared SaveSync for the configured remote, or None when sync is off."""
+    global _save_sync
+    if _save_sync is None and settings.SAVE_SYNC['ENABLED'] and settings.SAVE_SYNC['REMOTE_DIR']:
+        _save_sync = SaveSync(LocalDirectoryStore(settings.SAVE_SYNC['REMOTE_DIR']))
+    return _save_sync
@@ -0,0 +1,140 @@
+"""
+Low-Latency UI Sound Effects
+"""
+
+import numpy as np
+import pygame
+from config import settings
+
+EFFECTS = ('navigate', 'confirm', 'back', 'notification')
+EFFECT_FORMATS = ('.wav', '.ogg')
+MIXER_FREQUENCY = 44100
+EFFECTS_VOLUME = 0.5
+
+# (start Hz, end Hz, seconds) per tone; tones in a list play one after another.
+TONES = {
+    'navigate': [(1800, 1800, 0.018)],
+    'confirm': [(660, 660, 0.035), (990, 990, 0.05)],
+    'back': [(740, 494, 0.06)],
+    'notification': [(880, 880, 0.09), (1320, 1320, 0.18)],
+}
+
+def configure_mixer(mode=None):
+    """Set the mixer's buffer for the performance mode; call before pygame.init().
+    
+    SDL's default buffer of 4096 frames holds about 90 ms of audio at
+    44.1 kHz, so a click lands several frames after the key press.
+    PERFORMANCE_MODES[mode]['MIXER_BUFFER'] trades that latency against
+    the CPU time needed to refill a smaller buffer more often.
+    """
+    buffer = settings.PERFORMANCE_MODES[mode or settings.SYSTEM['PERFORMANCE_MODE']]['MIXER_BUFFER']
+    pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=-16, channels=2, buffer=buffer)
+
+class SoundService:
+    """UI sounds decoded into memory once, each with its own reserved channel.
+    
+    Effects load from ASSETS/sounds/<name>.wav or .ogg, or are synthesized
+    when there is no file. Playing one is a Channel.play on an already
+    decoded Sound, so the only delay left is the mixer buffer. Reserved
+    channels are never handed out by Sound.play elsewhere, and a repeated
+    effect restarts on its own channel rather than stacking up.
+    """
+    
+    def __init__(self):
+        self.enabled = bool(pygame.mixer.get_init())
+        self.sounds = {}
+        self.channels = {}
+        self.stats = {'played': 0}
+        if self.enabled:
+            self.prepare()
+    
+    def prepare(self):
+        if pygame.mixer.get_num_channels() < len(EFFECTS):
+            pygame.mixer.set_num_channels(8)
+        pygame.mixer.set_reserved(len(EFFECTS))
+        for index, name in enumerate(EFFECTS):
+            try:
+                sound = self.load(name) or self.synthesize(name)
+            except Exception as e:
+                print(f"⚠️  Could not prepare sound '{name}': {e}")
+                continue
+            sound.set_volume(EFFECTS_VOLUME)
+            self.sounds[name] = sound
+            self.channels[name] = pygame.mixer.Channel(index)
+    
+    def release(self):
+        """Drop the sounds before the mixer closes for a launched game."""
+        self.sounds.clear()
+        self.channels.clear()
+    
+    def restore(self):
+        """Rebuild the sounds and reserved channels once the mixer is open again."""
+        if self.enabled and pygame.mixer.get_init():
+            self.prepare()
+    
+    def load(self, name):
+        folder = settings.PATHS['ASSETS'] / 'sounds'
+        for extension in EFFECT_FORMATS:
+            path = folder / f"{name}{extension}"
+            if path.exists():
+                return pygame.mixer.Sound(str(path))
+        return None
+    
+    def synthesize(self, name):
+        """A short enveloped sine sweep in the mixer's own format."""
+        frequency, size, channels = pygame.mixer.get_init()
+        parts = []
+        for start, end, seconds in TONES[name]:
+            count = int(frequency * seconds)
+            pitch = np.linspace(start, end, count, dtype=np.float32)
+            phase = np.cumsum(pitch) * (2 * np.pi / frequency)
+            # 2 ms attack, exponential release to silence.
+            envelope = np.minimum(np.arange(count, dtype=np.float32) / (frequency * 0.002), 1.0)
+            envelope *= np.exp(-4.0 * np.arange(count, dtype=np.float32) / count)
+            parts.append(np.sin(phase) * envelope)
+        wave = np.concatenate(parts)
+        
+        if size < 0:
+            dtype = np.int8 if abs(size) == 8 else np.int16 if abs(size) == 16 else np.int32
+            wave = (wave * (np.iinfo(dtype).max * 0.8)).astype(dtype)
+        elif size == 8:
+            wave = (wave * 100 + 128).astype(np.uint8)
+        else:
+            wave = (wave * 26000 + 32768).astype(np.uint16)
+        if channels > 1:
+            wave = np.repeat(wave[:, None], channels, axis=1)
+        return pygame.sndarray.make_sound(np.ascontiguousarray(wave))
+    
+    def play(self, name):
+        if not self.enabled or not settings.AUDIO['SOUND_EFFECTS']:
+            return
+        sound = self.sounds.get(name)
+        if sound is not None:
+            self.channels[name].play(sound)
+            self.stats['played'] += 1
+    
+    def play_for_event(self, event):
+        """The feedback sound for a key press or touch, if it has one."""
+        if event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT):
+                self.play('navigate')
+            elif event.key in (pygame.K_a, pygame.K_RETURN):
+                self.play('confirm')
+            elif event.key in (pygame.K_b, pygame.K_ESCAPE):
+                self.play('back')
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self.play('navigate')
+    
+    def get_stats(self):
+        buffer = settings.PERFORMANCE_MODES[settings.SYSTEM['PERFORMANCE_MODE']]['MIXER_BUFFER']
+        mixer = pygame.mixer.get_init() if self.enabled else None
+        latency = buffer / mixer[0] * 1000 if mixer else 0.0
+        return dict(self.stats, loaded=len(self.sounds), buffer_latency_ms=latency)
+
+_sound_service = None
+
+def get_sound_service():
+    global _sound_service
+    if _sound_service is None:
+        _sound_service = SoundService()
+    return _sound_service
@@ -3,21 +3,38 @@ Supabase Service for Database Operations
 """
 
 import os
-from supabase import create_client, Client
+import threading
+import time
 from config import settings
 
 class SupabaseService:
+    """One Supabase client for the whole process, over a pooled keep-alive connection.
+    
+    Apps share it through get_supabase_service(), so opening Friends or
+    Chat again reuses the client, its HTTP session and any open TLS
+    connection instead of paying for create_client and a handshake. The
+    REST session is replaced with one httpx.Client whose idle connections
+    live for NETWORK['KEEPALIVE_SECONDS'], long enough to survive between
+    presence polls; a trace hook counts new connections against requests.
+    """
+    
     def __init__(self):
         self.client = None
         self.connected = False
         self.current_user = None
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'connections': 0, 'errors': 0, 'connect_ms': 0.0}
         
         try:
             supabase_url = os.getenv('SUPABASE_URL', '')
             supabase_key = os.getenv('SUPABASE_KEY', '')
             
             if supabase_url and supabase_key:
+                start = time.perf_counter()
+                from supabase import create_client
                 self.client = create_client(supabase_url, supabase_key)
+                self.pool_session()
+                self.stats['connect_ms'] = (time.perf_counter() - start) * 1000
                 self.connected = True
                 print("✅ Connected to Supabase")
             else:
@@ -25,6 +42,40 @@ class SupabaseService:
         except Exception as e:
             print(f"❌ Supabase connection failed: {e}")
     
+    def pool_session(self):
+        import httpx
+        postgrest = self.client.postgrest
+        session = postgrest.session
+        limits = httpx.Limits(max_connections=settings.NETWORK['MAX_CONNECTIONS'],
+                              max_keepalive_connections=settings.NETWORK['MAX_CONNECTIONS'],
+                              keepalive_expiry=settings.NETWORK['KEEPALIVE_SECONDS'])
+        postgrest.session = httpx.Client(base_url=session.base_url, headers=session.headers,
+                                         timeout=session.timeout, limits=limits,
+                                         event_hooks={'request': [self.on_request],
+                                                      'response': [self.on_response]})
+        session.close()
+    
+    def on_request(self, request):
+        request.extensions['trace'] = self.trace
+        with self.stats_lock:
+            self.stats['requests'] += 1
+    
+    def on_response(self, response):
+        if response.status_code >= 400:
+            with self.stats_lock:
+                self.stats['errors'] += 1
+    
+    def trace(self, event, info):
+        if event.endswith('connect_tcp.complete'):
+            with self.stats_lock:
+                self.stats['connections'] += 1
+    
+    def get_stats(self):
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats['reused'] = max(0, stats['requests'] - stats['connections'])
+        return stats
+    
     def is_connected(self):
         return self.connected
     
@@ -104,3 +155,11 @@ class SupabaseService:
         except Exception as e:
             print(f"Error updating status: {e}")
             return False
+
+_supabase_service = None
+
+def get_supabase_service():
+    global _supabase_service
+    if _supabase_service is None:
+        _supabase_service = SupabaseService()
+    return _supabase_service
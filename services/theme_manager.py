@@ -5,6 +5,7 @@ Theme Manager for Custom Themes and Wallpapers
 import pygame
 from config import settings
 from pathlib import Path
+from ui.text_cache import text_cache
 
 class ThemeManager:
     def __init__(self):
@@ -42,6 +43,22 @@ class ThemeManager:
         
         self.wallpaper = None
         self.wallpaper_path = settings.PATHS['ASSETS'] / 'wallpapers'
+        
+        self.scaled_wallpapers = {}
+        self.layers = {}
+        self.listeners = []
+        self.generation = 0
+    
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+    
+    def invalidate(self):
+        self.generation += 1
+        self.scaled_wallpapers.clear()
+        self.layers.clear()
+        text_cache.clear()
+        for callback in self.listeners:
+            callback()
     
     def get_themes(self):
         return [(key, theme['name']) for key, theme in self.themes.items()]
@@ -54,6 +71,7 @@ class ThemeManager:
             settings.COLORS['SECONDARY'] = theme['secondary']
             settings.COLORS['LIGHT'] = theme['light']
             settings.COLORS['DARK'] = theme['dark']
+            self.invalidate()
             return True
         return False
     
@@ -65,12 +83,50 @@ class ThemeManager:
             wallpaper_file = self.wallpaper_path / filename
             if wallpaper_file.exists():
                 self.wallpaper = pygame.image.load(str(wallpaper_file))
+                self.invalidate()
                 return True
         except Exception as e:
             print(f"Error loading wallpaper: {e}")
         return False
     
     def get_wallpaper(self, size):
-        if self.wallpaper:
-            return pygame.transform.scale(self.wallpaper, size)
-        return None
+        if not self.wallpaper:
+            return None
+        
+        size = tuple(size)
+        scaled = self.scaled_wallpapers.get(size)
+        if scaled is None:
+            scaled = to_display_format(pygame.transform.scale(self.wallpaper, size))
+            self.scaled_wallpapers[size] = scaled
+        return scaled
+    
+    def get_background(self, name, size, color, chrome=None):
+        """Return a cached background layer: the wallpaper (or a solid fill of
+        settings.COLORS[color]) with the screen's static chrome drawn on top.
+        """
+        key = (name, tuple(size))
+        layer = self.layers.get(key)
+        if layer is None:
+            layer = to_display_format(pygame.Surface(size))
+            wallpaper = self.get_wallpaper(size)
+            if wallpaper:
+                layer.blit(wallpaper, (0, 0))
+            else:
+                layer.fill(settings.COLORS[color])
+            if chrome:
+                chrome(layer)
+            self.layers[key] = layer
+        return layer
+
+def to_display_format(surface):
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert()
+
+_theme_manager = None
+
+def get_theme_manager():
+    global _theme_manager
+    if _theme_manager is None:
+        _theme_manager = ThemeManager()
+    return _theme_manager
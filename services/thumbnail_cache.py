@@ -0,0 +1,201 @@
+"""
+Memory-Mapped Thumbnail Atlas Cache
+"""
+
+import os
+import sys
+import json
+import mmap
+import threading
+import pygame
+from config import settings
+
+CACHE_VERSION = 1
+GROW_SLOTS = 32
+
+def display_pixel_format():
+    """Byte order matching the display surface, so cached pixels blit without swizzling."""
+    surface = pygame.display.get_surface() if pygame.display.get_init() else None
+    if (surface and surface.get_bitsize() == 32 and sys.byteorder == 'little'
+            and surface.get_masks()[:3] == (0xff0000, 0xff00, 0xff)):
+        return 'BGRA'
+    return 'RGBA'
+
+class ThumbnailCache:
+    """Pre-scaled icon pixels packed into fixed-size slots of one mmap'd file.
+    
+    The JSON index maps each key to its slot, the source image's mtime and
+    the thumbnail size. Surfaces are created straight over the mapping, so
+    showing a cached thumbnail needs no decoding and no copy. New pixels
+    always go to a slot no saved index refers to: a replaced or discarded
+    slot waits in ``pending_free`` until save() has written an index that
+    no longer mentions it, so after a crash every key on disk still maps
+    to its own pixels.
+    """
+    
+    def __init__(self, size=None, pixel_format=None):
+        self.size = tuple(size or settings.LIBRARY['THUMBNAIL_SIZE'])
+        self.pixel_format = pixel_format or display_pixel_format()
+        self.slot_bytes = self.size[0] * self.size[1] * 4
+        self.atlas_path = settings.PATHS['DATA'] / 'thumbnails.atlas'
+        self.index_path = settings.PATHS['DATA'] / 'thumbnails.json'
+        
+        self.entries = {}
+        self.free = []
+        self.pending_free = []
+        self.slots = 0
+        self.file = None
+        self.mm = None
+        self.surfaces = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.mapped = 0
+        self.misses = 0
+        
+        self.open()
+    
+    def open(self):
+        self.atlas_path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.atlas_path, 'a+b')
+        
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = None
+        except Exception as e:
+            print(f"Error loading thumbnail index: {e}")
+            index = None
+        
+        if (not index or index.get('version') != CACHE_VERSION or index.get('format') != self.pixel_format
+                or tuple(index.get('slot_size', ())) != self.size
+                or os.fstat(self.file.fileno()).st_size < index['slots'] * self.slot_bytes):
+            self.file.truncate(0)
+            return
+        
+        self.slots = index['slots']
+        self.entries = index['entries']
+        used = {entry[0] for entry in self.entries.values()}
+        self.free = [slot for slot in range(self.slots - 1, -1, -1) if slot not in used]
+        if self.slots:
+            self.mm = mmap.mmap(self.file.fileno(), self.slots * self.slot_bytes)
+    
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            index = {
+                'version': CACHE_VERSION,
+                'format': self.pixel_format,
+                'slot_size': list(self.size),
+                'slots': self.slots,
+                'entries': dict(self.entries),
+            }
+            released, self.pending_free = self.pending_free, []
+            self.dirty = False
+            if self.mm:
+                self.mm.flush()
+        try:
+            tmp_path = self.index_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(index, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"Error saving thumbnail index: {e}")
+            with self.lock:
+                self.pending_free.extend(released)
+                self.dirty = True
+            return
+        
+        # The index on disk no longer refers to these slots.
+        with self.lock:
+            self.free.extend(released)
+    
+    def is_fresh(self, key, mtime_ns):
+        entry = self.entries.get(key)
+        return bool(entry) and entry[1] == mtime_ns
+    
+    def grow(self):
+        slots = self.slots + GROW_SLOTS
+        self.file.truncate(slots * self.slot_bytes)
+        # Surfaces may still reference the old mapping, so it is left for
+        # the garbage collector instead of being closed.
+        self.mm = mmap.mmap(self.file.fileno(), slots * self.slot_bytes)
+        self.free.extend(range(slots - 1, self.slots - 1, -1))
+        self.slots = slots
+    
+    def store(self, key, mtime_ns, data, size):
+        """Store pixels already in ``pixel_format`` order; size must fit a slot."""
+        width, height = size
+        if width > self.size[0] or height > self.size[1]:
+            raise ValueError(f"Thumbnail {size} does not fit the {self.size} atlas slots")
+        
+        with self.lock:
+            if not self.free:
+                self.grow()
+            slot = self.free.pop()
+            offset = slot * self.slot_bytes
+            self.mm[offset:offset + len(data)] = data
+            
+            old = self.entries.get(key)
+            self.entries[key] = [slot, mtime_ns, width, height]
+            if old:
+                self.pending_free.append(old[0])
+            self.surfaces.pop(key, None)
+            self.dirty = True
+    
+    def discard(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry:
+                self.pending_free.append(entry[0])
+                self.surfaces.pop(key, None)
+                self.dirty = True
+    
+    def prune(self, keys):
+        """Drop every entry whose key is not in ``keys``."""
+        with self.lock:
+            stale = set(self.entries) - set(keys)
+        for key in stale:
+            self.discard(key)
+    
+    def get_surface(self, key):
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            slot, _, width, height = entry
+            offset = slot * self.slot_bytes
+            pixels = memoryview(self.mm)[offset:offset + width * height * 4]
+            surface = pygame.image.frombuffer(pixels, (width, height), self.pixel_format)
+            self.surfaces[key] = surface
+        self.mapped += 1
+        return surface
+    
+    def get_stats(self):
+        return {
+            'entries': len(self.entries),
+            'slots': self.slots,
+            'bytes': self.slots * self.slot_bytes,
+            'hits': self.hits,
+            'mapped': self.mapped,
+            'misses': self.misses,
+        }
+
+_thumbnail_cache = None
+
+def get_thumbnail_cache():
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
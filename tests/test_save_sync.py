@@ -0,0 +1,61 @@
+"""
+Tests for content-defined chunking and per-file error handling in save sync
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from services.save_sync import chunk_boundaries, SaveSync, LocalDirectoryStore
+
+
+@pytest.mark.parametrize('size', range(0, 40))
+def test_short_inputs_chunk(size):
+    data = bytes(range(size))
+    chunks = chunk_boundaries(data, min_size=2, avg_size=2048, max_size=8192)
+    assert sum(length for _, length in chunks) == size
+    if size:
+        assert chunks[0][0] == 0
+
+
+def test_chunks_cover_input():
+    data = os.urandom(200_000)
+    chunks = chunk_boundaries(data, min_size=1024, avg_size=4096, max_size=16384)
+    offset = 0
+    for start, length in chunks:
+        assert start == offset
+        assert 0 < length <= 16384
+        offset += length
+    assert offset == len(data)
+
+
+def test_unreadable_file_does_not_stop_sync(tmp_path, monkeypatch):
+    from config import settings
+    monkeypatch.setitem(settings.PATHS, 'DATA', tmp_path / 'data')
+    saves = tmp_path / 'saves'
+    saves.mkdir()
+    (saves / 'marker').write_bytes(b'abcde')
+    (saves / 'good.sav').write_bytes(os.urandom(5000))
+    (saves / 'bad.sav').write_bytes(b'x' * 100)
+    
+    sync = SaveSync(LocalDirectoryStore(tmp_path / 'remote'), saves_path=saves)
+    real_chunk_file = sys.modules['services.save_sync'].chunk_file
+    
+    def failing_chunk_file(path):
+        if path.name == 'bad.sav':
+            raise OSError("unreadable")
+        return real_chunk_file(path)
+    
+    monkeypatch.setattr('services.save_sync.chunk_file', failing_chunk_file)
+    stats = sync.sync()
+    assert stats['uploaded_files'] == 2
+    manifest = sync.store.get_manifest()['files']
+    assert set(manifest) == {'marker', 'good.sav'}
+    
+    # Once readable again the file syncs, and nothing was deleted meanwhile.
+    monkeypatch.setattr('services.save_sync.chunk_file', real_chunk_file)
+    stats = sync.sync()
+    assert stats['uploaded_files'] == 1
+    assert stats['deleted_files'] == 0
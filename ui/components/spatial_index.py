@@ -0,0 +1,49 @@
+"""
+Grid-Bucket Spatial Index for Widget Hit-Testing
+"""
+
+class SpatialIndex:
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.buckets = {}
+        self.rects = {}
+    
+    def cells_for(self, rect):
+        size = self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield (cx, cy)
+    
+    def insert(self, item, rect):
+        if item in self.rects:
+            self.remove(item)
+        self.rects[item] = rect.copy()
+        for cell in self.cells_for(rect):
+            self.buckets.setdefault(cell, []).append(item)
+    
+    def remove(self, item):
+        rect = self.rects.pop(item, None)
+        if rect is None:
+            return
+        for cell in self.cells_for(rect):
+            bucket = self.buckets.get(cell)
+            if bucket and item in bucket:
+                bucket.remove(item)
+                if not bucket:
+                    del self.buckets[cell]
+    
+    def query_point(self, x, y):
+        bucket = self.buckets.get((int(x) // self.cell_size, int(y) // self.cell_size), ())
+        return [item for item in bucket if self.rects[item].collidepoint(x, y)]
+    
+    def query_rect(self, rect):
+        found = set()
+        for cell in self.cells_for(rect):
+            for item in self.buckets.get(cell, ()):
+                if item not in found and self.rects[item].colliderect(rect):
+                    found.add(item)
+        return found
+    
+    def clear(self):
+        self.buckets.clear()
+        self.rects.clear()
@@ -0,0 +1,189 @@
+"""
+FFT Spectrum Visualizer with an Adaptive Update Rate
+"""
+
+import time
+import numpy as np
+import pygame
+from config import settings
+
+FFT_SIZE = 1024
+FLOOR_DB = -60.0
+DECAY_PER_SECOND = 0.05
+BAR_GAP = 2
+RATE_DIVISORS = (1, 2, 4, 8)
+RECOVER_AFTER = 1.0
+SMOOTHING = 0.2
+
+class SpectrumVisualizer:
+    """Log-frequency bars computed from the samples under the play position.
+    
+    Everything sized by the bar count or the surface is allocated once:
+    the window, bin edges, level and height arrays, the per-pixel mask
+    and pixel buffer. An update windows FFT_SIZE samples, takes the FFT,
+    folds bins into bars with maximum.reduceat, and writes the bars into
+    the pixel buffer with broadcast compares before one blit_array.
+    
+    Each analysis is timed against AUDIO['VISUALIZER_BUDGET_MS']. When it
+    runs over, or analyses start more than a frame late because the loop
+    cannot keep up, the update rate halves (down to 1/8 of VISUALIZER_FPS);
+    after RECOVER_AFTER seconds within budget it steps back up. The owner
+    wakes the loop for next_update() rather than running at the frame cap,
+    so a lower rate also means fewer frames.
+    """
+    
+    def __init__(self, rect, bars=48, on_invalidate=None):
+        self.rect = pygame.Rect(rect)
+        self.bars = bars
+        self.on_invalidate = on_invalidate
+        self.enabled = settings.AUDIO['VISUALIZER']
+        self.budget = settings.AUDIO['VISUALIZER_BUDGET_MS'] / 1000.0
+        self.base_interval = 1.0 / settings.AUDIO['VISUALIZER_FPS']
+        self.frame_time = 1.0 / settings.PERFORMANCE_MODES[settings.SYSTEM['PERFORMANCE_MODE']]['FPS']
+        
+        self.divisor_index = 0
+        self.elapsed = 0.0
+        self.calm = 0.0
+        self.cost = 0.0
+        self.lateness = 0.0
+        self.stats = {'updates': 0, 'throttled': 0}
+        
+        width, height = self.rect.size
+        self.surface = pygame.Surface(self.rect.size, 0, 32)
+        self.window = np.hanning(FFT_SIZE).astype(np.float32)
+        self.mono = np.zeros(FFT_SIZE, dtype=np.float32)
+        self.magnitude = np.zeros(FFT_SIZE // 2 + 1, dtype=np.float32)
+        self.edges = self.bar_edges(bars)
+        self.levels = np.zeros(bars, dtype=np.float32)
+        self.bands = np.zeros(bars, dtype=np.float32)
+        # One extra, always empty bar for the gap columns.
+        self.bar_heights = np.zeros(bars + 1, dtype=np.int32)
+        bar_width = width / bars
+        columns = np.arange(width)
+        self.column_bar = np.where(columns % bar_width < bar_width - BAR_GAP, columns // bar_width, bars).astype(np.intp)
+        self.column_heights = np.zeros(width, dtype=np.int32)
+        self.thresholds = np.zeros(width, dtype=np.int32)
+        self.rows = np.arange(height, dtype=np.int32)[None, :]
+        self.mask = np.zeros((width, height), dtype=bool)
+        self.pixels = np.zeros((width, height), dtype=np.uint32)
+        self.theme_generation = None
+        self.update_colors()
+        self.draw()
+    
+    def bar_edges(self, bars):
+        """First FFT bin of each bar, log-spaced from ~40 Hz up to Nyquist."""
+        edges = np.geomspace(1, FFT_SIZE // 2, bars + 1)[:-1]
+        edges = np.maximum(np.round(edges).astype(np.intp), np.arange(1, bars + 1))
+        return edges
+    
+    def update_colors(self):
+        from services.theme_manager import get_theme_manager
+        self.theme_generation = get_theme_manager().generation
+        height = self.rect.height
+        top = np.array(settings.COLORS['PRIMARY'][:3], dtype=np.float32)
+        bottom = np.array(settings.COLORS['SUCCESS'][:3], dtype=np.float32)
+        mix = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+        gradient = (top * (1 - mix) + bottom * mix).astype(np.uint8)
+        self.bar_colors = np.array([self.surface.map_rgb(tuple(color)) for color in gradient],
+                                   dtype=np.uint32)[None, :]
+        self.background = np.uint32(self.surface.map_rgb(settings.COLORS['DARK']))
+    
+    @property
+    def interval(self):
+        return self.base_interval * RATE_DIVISORS[self.divisor_index]
+    
+    def update(self, dt, samples, position_ms):
+        """Advance by dt; analyze and redraw when the (adaptive) interval has passed.
+        
+        ``samples`` is an (n, channels) array in the mixer's format and
+        ``position_ms`` the play position within it. Returns True if the
+        surface changed.
+        """
+        if not self.enabled or samples is None:
+            return False
+        
+        self.elapsed += dt
+        if self.elapsed < self.interval:
+            return False
+        step, self.elapsed = self.elapsed, 0.0
+        self.lateness += (step - self.interval - self.lateness) * SMOOTHING
+        
+        start = time.perf_counter()
+        rate = pygame.mixer.get_init()[0]
+        offset = int(position_ms * rate / 1000)
+        if offset + FFT_SIZE > len(samples) or offset < 0:
+            return False
+        self.analyze(samples[offset:offset + FFT_SIZE], step)
+        self.draw()
+        self.cost += (time.perf_counter() - start - self.cost) * SMOOTHING
+        self.stats['updates'] += 1
+        self.adapt(step)
+        
+        if self.on_invalidate:
+            self.on_invalidate(self.rect)
+        return True
+    
+    def next_update(self):
+        """Monotonic time the next analysis is due."""
+        return time.monotonic() + max(0.0, self.interval - self.elapsed)
+    
+    def adapt(self, step):
+        """Halve or restore the update rate from the smoothed analysis cost and lateness."""
+        if self.cost > self.budget or self.lateness > self.frame_time:
+            self.calm = 0.0
+            if self.divisor_index < len(RATE_DIVISORS) - 1:
+                self.divisor_index += 1
+                self.stats['throttled'] += 1
+        else:
+            self.calm += step
+            if self.calm >= RECOVER_AFTER and self.divisor_index:
+                self.divisor_index -= 1
+                self.calm = 0.0
+    
+    def analyze(self, frame, step):
+        if frame.ndim == 2:
+            np.sum(frame, axis=1, dtype=np.float32, out=self.mono)
+            channels = frame.shape[1]
+        else:
+            self.mono[:] = frame
+            channels = 1
+        if np.issubdtype(frame.dtype, np.integer):
+            self.mono *= 1.0 / (np.iinfo(frame.dtype).max * channels)
+        else:
+            self.mono *= 1.0 / channels
+        self.mono *= self.window
+        
+        np.abs(np.fft.rfft(self.mono), out=self.magnitude, casting='same_kind')
+        np.maximum.reduceat(self.magnitude, self.edges, out=self.bands)
+        self.bands *= 2.0 / FFT_SIZE
+        self.bands += 1e-9
+        np.log10(self.bands, out=self.bands)
+        self.bands *= 20.0 / -FLOOR_DB
+        self.bands += 1.0
+        np.clip(self.bands, 0.0, 1.0, out=self.bands)
+        
+        # Bars jump up at once and fall back smoothly.
+        self.levels *= DECAY_PER_SECOND ** step
+        np.maximum(self.levels, self.bands, out=self.levels)
+    
+    def draw(self):
+        from services.theme_manager import get_theme_manager
+        if get_theme_manager().generation != self.theme_generation:
+            self.update_colors()
+        
+        height = self.rect.height
+        np.multiply(self.levels, height, out=self.bands)
+        np.copyto(self.bar_heights[:-1], self.bands, casting='unsafe')
+        np.take(self.bar_heights, self.column_bar, out=self.column_heights)
+        np.subtract(height, self.column_heights, out=self.thresholds)
+        np.greater_equal(self.rows, self.thresholds[:, None], out=self.mask)
+        
+        self.pixels.fill(self.background)
+        np.copyto(self.pixels, self.bar_colors, where=self.mask)
+        pygame.surfarray.blit_array(self.surface, self.pixels)
+    
+    def render(self, surface):
+        surface.blit(self.surface, self.rect)
+    
+    def get_stats(self):
+        return dict(self.stats, rate=1.0 / self.interval, cost_ms=self.cost * 1000.0)
@@ -0,0 +1,246 @@
+"""
+Virtualized Scrolling List with Recycled Row Surfaces
+"""
+
+import math
+import time
+import pygame
+from config import settings
+
+TAP_SLOP = 8
+FRICTION = 5.0
+MIN_VELOCITY = 30.0
+MAX_VELOCITY = 4000.0
+
+class VirtualList:
+    """A fixed-row-height list that only ever paints the rows in view.
+    
+    Items are not stored here: the owner passes ``count`` and a
+    ``paint_row(surface, index, selected)`` callback, so a list of 100k
+    rows costs the same per frame as a list of ten. Each visible row is
+    painted once into its own surface; rows scrolling out hand their
+    surfaces to the rows scrolling in, and only those are repainted.
+    Touch drags scroll the list and carry on with decaying velocity after
+    release; a touch that does not move is a tap on the row under it.
+    """
+    
+    def __init__(self, rect, row_height, paint_row, count=0, on_activate=None, on_invalidate=None,
+                 background='SECONDARY', selectable=True):
+        self.rect = pygame.Rect(rect)
+        self.row_height = row_height
+        self.paint_row = paint_row
+        self.count = count
+        self.on_activate = on_activate
+        self.on_invalidate = on_invalidate
+        self.background = background
+        self.selectable = selectable
+        
+        self.selected = 0
+        self.scroll = 0.0
+        self.velocity = 0.0
+        self.rows = {}
+        self.spare = []
+        self.theme_generation = None
+        
+        self.touch_start = None
+        self.touch_last = None
+        self.touch_time = 0.0
+        self.dragged = False
+    
+    @property
+    def page_rows(self):
+        return max(1, self.rect.height // self.row_height)
+    
+    @property
+    def max_scroll(self):
+        return max(0, self.count * self.row_height - self.rect.height)
+    
+    def invalidate(self, index=None):
+        """Repaint one row, or every row when index is None."""
+        if index is None:
+            self.spare.extend(self.rows.values())
+            self.rows.clear()
+            self.damage(self.rect)
+        elif index in self.rows:
+            self.spare.append(self.rows.pop(index))
+            self.damage(self.row_rect(index))
+    
+    def damage(self, rect):
+        if self.on_invalidate:
+            rect = rect.clip(self.rect)
+            if rect.width and rect.height:
+                self.on_invalidate(rect)
+    
+    def row_rect(self, index):
+        y = self.rect.y + index * self.row_height - int(self.scroll)
+        return pygame.Rect(self.rect.x, y, self.rect.width, self.row_height)
+    
+    def index_at(self, pos):
+        if not self.rect.collidepoint(pos):
+            return None
+        index = int((pos[1] - self.rect.y + self.scroll) // self.row_height)
+        return index if 0 <= index < self.count else None
+    
+    def set_count(self, count):
+        if count != self.count:
+            self.count = count
+            self.selected = min(self.selected, max(count - 1, 0))
+            self.set_scroll(self.scroll)
+            self.invalidate()
+    
+    def set_scroll(self, scroll):
+        scroll = max(0.0, min(float(scroll), self.max_scroll))
+        if int(scroll) != int(self.scroll):
+            self.damage(self.rect)
+        self.scroll = scroll
+        if scroll in (0.0, self.max_scroll):
+            self.velocity = 0.0
+    
+    def scroll_to(self, index):
+        """Scroll just far enough to bring a row fully into view."""
+        top = index * self.row_height
+        if top < self.scroll:
+            self.set_scroll(top)
+        elif top + self.row_height > self.scroll + self.rect.height:
+            self.set_scroll(top + self.row_height - self.rect.height)
+    
+    def select(self, index):
+        if not self.count:
+            return
+        index = max(0, min(index, self.count - 1))
+        self.velocity = 0.0
+        if index != self.selected:
+            self.invalidate(self.selected)
+            self.selected = index
+            self.invalidate(index)
+        self.scroll_to(index)
+    
+    def move(self, delta):
+        if self.selectable:
+            self.select(self.selected + delta)
+        else:
+            self.velocity = 0.0
+            self.set_scroll(self.scroll + delta * self.row_height)
+    
+    def page(self, direction):
+        self.move(direction * self.page_rows)
+    
+    def handle_key(self, key):
+        """D-pad navigation: UP/DOWN step a row, LEFT/RIGHT a page. Returns True if handled."""
+        if key == pygame.K_UP:
+            self.move(-1)
+        elif key == pygame.K_DOWN:
+            self.move(1)
+        elif key == pygame.K_LEFT:
+            self.page(-1)
+        elif key == pygame.K_RIGHT:
+            self.page(1)
+        else:
+            return False
+        return True
+    
+    def handle_touch_down(self, pos):
+        if not self.rect.collidepoint(pos):
+            return False
+        self.touch_start = self.touch_last = pos
+        self.touch_time = time.monotonic()
+        self.velocity = 0.0
+        self.dragged = False
+        return True
+    
+    def handle_touch_drag(self, pos):
+        if self.touch_start is None:
+            return False
+        if abs(pos[1] - self.touch_start[1]) > TAP_SLOP:
+            self.dragged = True
+        if self.dragged:
+            now = time.monotonic()
+            dy = pos[1] - self.touch_last[1]
+            elapsed = max(now - self.touch_time, 1e-3)
+            # Smooth the release velocity over the last few motion events.
+            self.velocity = 0.6 * self.velocity + 0.4 * (-dy / elapsed)
+            self.touch_time = now
+            self.set_scroll(self.scroll - dy)
+        self.touch_last = pos
+        return True
+    
+    def handle_touch_up(self, pos):
+        if self.touch_start is None:
+            return False
+        self.touch_start = None
+        if self.dragged:
+            if time.monotonic() - self.touch_time > 0.1:
+                # The finger rested before lifting: no fling.
+                self.velocity = 0.0
+            self.velocity = max(-MAX_VELOCITY, min(self.velocity, MAX_VELOCITY))
+            return True
+        
+        index = self.index_at(pos)
+        if index is not None:
+            if self.selectable:
+                self.select(index)
+            if self.on_activate:
+                self.on_activate(index)
+        return True
+    
+    def handle_event(self, event, to_local):
+        """Route a pygame event; ``to_local`` maps window positions into the list's surface."""
+        if event.type == pygame.KEYDOWN:
+            return self.handle_key(event.key)
+        if event.type not in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP):
+            return False
+        pos = to_local(event.pos)
+        if pos is None:
+            if event.type == pygame.MOUSEBUTTONUP:
+                self.touch_start = None
+            return False
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            return self.handle_touch_down(pos)
+        if event.type == pygame.MOUSEMOTION:
+            return bool(event.buttons[0]) and self.handle_touch_drag(pos)
+        return self.handle_touch_up(pos)
+    
+    def is_animating(self):
+        return self.velocity != 0.0
+    
+    def update(self, dt):
+        if not self.velocity or self.touch_start is not None:
+            return
+        self.set_scroll(self.scroll + self.velocity * dt)
+        self.velocity *= math.exp(-FRICTION * dt)
+        if abs(self.velocity) < MIN_VELOCITY:
+            self.velocity = 0.0
+    
+    def get_row_surface(self, index):
+        surface = self.rows.get(index)
+        if surface is None:
+            surface = self.spare.pop() if self.spare else pygame.Surface((self.rect.width, self.row_height))
+            if self.background:
+                surface.fill(settings.COLORS[self.background])
+            self.paint_row(surface, index, self.selectable and index == self.selected)
+            self.rows[index] = surface
+        return surface
+    
+    def render(self, surface):
+        from services.theme_manager import get_theme_manager
+        generation = get_theme_manager().generation
+        if generation != self.theme_generation:
+            self.theme_generation = generation
+            self.invalidate()
+        
+        scroll = int(self.scroll)
+        first = scroll // self.row_height
+        last = min(self.count, (scroll + self.rect.height) // self.row_height + 1)
+        for index in [index for index in self.rows if not first <= index < last]:
+            self.spare.append(self.rows.pop(index))
+        
+        previous_clip = surface.get_clip()
+        surface.set_clip(self.rect.clip(previous_clip) if previous_clip else self.rect)
+        if self.background:
+            surface.fill(settings.COLORS[self.background], self.rect)
+        for index in range(first, last):
+            surface.blit(self.get_row_surface(index), (self.rect.x, self.rect.y + index * self.row_height - scroll))
+        surface.set_clip(previous_clip)
+    
+    def get_stats(self):
+        return {'count': self.count, 'rows': len(self.rows), 'spare': len(self.spare)}
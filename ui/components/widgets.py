@@ -0,0 +1,235 @@
+"""
+Retained-Mode Widgets with Cached Surfaces and Invalidation
+"""
+
+import pygame
+from config import settings
+from ui.text_cache import render_text
+from ui.components.spatial_index import SpatialIndex
+
+class Widget:
+    def __init__(self, rect, on_press=None):
+        self.rect = pygame.Rect(rect)
+        self.on_press = on_press
+        self.visible = True
+        self.dirty = True
+        self.surface = None
+        self.layer = None
+    
+    def invalidate(self):
+        self.dirty = True
+        if self.layer:
+            self.layer.invalidate_rect(self.rect)
+    
+    def set_visible(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.invalidate()
+    
+    def get_surface(self):
+        if self.surface is None or self.surface.get_size() != self.rect.size:
+            self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self.dirty = True
+        if self.dirty:
+            self.surface.fill((0, 0, 0, 0))
+            self.paint(self.surface)
+            self.dirty = False
+        return self.surface
+    
+    def paint(self, surface):
+        pass
+    
+    def press(self, pos):
+        if self.on_press:
+            self.on_press()
+            return True
+        return False
+
+class Label(Widget):
+    def __init__(self, rect, text, font, color='WHITE', align='left'):
+        super().__init__(rect)
+        self.text = text
+        self.font = font
+        self.color = color
+        self.align = align
+    
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.invalidate()
+    
+    def set_color(self, color):
+        if color != self.color:
+            self.color = color
+            self.invalidate()
+    
+    def paint(self, surface):
+        text_surf = render_text(self.font, self.text, settings.COLORS[self.color])
+        if self.align == 'center':
+            surface.blit(text_surf, text_surf.get_rect(center=surface.get_rect().center))
+        else:
+            surface.blit(text_surf, (0, 0))
+
+class Button(Widget):
+    def __init__(self, rect, text, font, on_press=None, fill='SECONDARY', text_color='WHITE',
+                 border=None, selected_fill='PRIMARY', selected_text_color='WHITE',
+                 align='center', padding=10):
+        super().__init__(rect, on_press)
+        self.text = text
+        self.font = font
+        self.fill = fill
+        self.text_color = text_color
+        self.border = border
+        self.selected_fill = selected_fill
+        self.selected_text_color = selected_text_color
+        self.align = align
+        self.padding = padding
+        self.selected = False
+    
+    def set_selected(self, selected):
+        if selected != self.selected:
+            self.selected = selected
+            self.invalidate()
+    
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.invalidate()
+    
+    def paint(self, surface):
+        rect = surface.get_rect()
+        fill = self.selected_fill if self.selected else self.fill
+        if fill:
+            pygame.draw.rect(surface, settings.COLORS[fill], rect)
+        if self.border:
+            pygame.draw.rect(surface, settings.COLORS[self.border], rect, 1)
+        
+        color = self.selected_text_color if self.selected else self.text_color
+        text_surf = render_text(self.font, self.text, settings.COLORS[color])
+        if self.align == 'left':
+            text_rect = text_surf.get_rect(midleft=(self.padding, rect.centery))
+        else:
+            text_rect = text_surf.get_rect(center=rect.center)
+        surface.blit(text_surf, text_rect)
+
+class Slider(Widget):
+    def __init__(self, rect, value, fill='PRIMARY', on_change=None):
+        super().__init__(rect)
+        self.value = value
+        self.fill = fill
+        self.on_change = on_change
+    
+    def set_value(self, value):
+        value = max(0, min(100, int(value)))
+        if value != self.value:
+            self.value = value
+            self.invalidate()
+            if self.on_change:
+                self.on_change(value)
+    
+    def set_from_x(self, x):
+        self.set_value((x - self.rect.x) / self.rect.width * 100)
+    
+    def press(self, pos):
+        self.set_from_x(pos[0])
+        return True
+    
+    def paint(self, surface):
+        rect = surface.get_rect()
+        pygame.draw.rect(surface, settings.COLORS['SECONDARY'], rect)
+        fill_rect = pygame.Rect(0, 0, int(rect.width * (self.value / 100)), rect.height)
+        pygame.draw.rect(surface, settings.COLORS[self.fill], fill_rect)
+        pygame.draw.rect(surface, settings.COLORS['WHITE'], rect, 2)
+
+class WidgetLayer:
+    """A set of widgets laid out once on a surface, hit-tested through a
+    grid-bucket index and repainted only inside damaged regions.
+    
+    With background_alpha the background is translucent over the backdrop
+    colour; the blend is composed once and cached, since damaged regions
+    are repainted over the layer's own previous frame.
+    """
+    def __init__(self, size, background='SECONDARY', on_invalidate=None, cell_size=32,
+                 background_alpha=None, backdrop='SECONDARY'):
+        self.rect = pygame.Rect((0, 0), size)
+        self.background = background
+        self.background_alpha = background_alpha
+        self.backdrop = backdrop
+        self.background_surface = None
+        self.on_invalidate = on_invalidate
+        self.widgets = []
+        self.order = {}
+        self.index = SpatialIndex(cell_size)
+        self.theme_generation = None
+    
+    def add(self, widget):
+        widget.layer = self
+        self.order[widget] = len(self.widgets)
+        self.widgets.append(widget)
+        self.index.insert(widget, widget.rect)
+        return widget
+    
+    def clear(self):
+        for widget in self.widgets:
+            widget.layer = None
+        self.widgets.clear()
+        self.order.clear()
+        self.index.clear()
+        self.invalidate_rect(self.rect)
+    
+    def invalidate_rect(self, rect):
+        if self.on_invalidate:
+            self.on_invalidate(rect)
+    
+    def invalidate(self):
+        for widget in self.widgets:
+            widget.dirty = True
+        self.invalidate_rect(self.rect)
+    
+    def widget_at(self, pos):
+        hits = [w for w in self.index.query_point(pos[0], pos[1]) if w.visible]
+        if not hits:
+            return None
+        return max(hits, key=self.order.get)
+    
+    def press(self, pos):
+        widget = self.widget_at(pos)
+        if widget:
+            widget.press(pos)
+        return widget
+    
+    def get_background(self):
+        if self.background_surface is None:
+            self.background_surface = pygame.Surface(self.rect.size)
+            self.background_surface.fill(settings.COLORS[self.backdrop])
+            overlay = pygame.Surface(self.rect.size)
+            overlay.set_alpha(self.background_alpha)
+            overlay.fill(settings.COLORS[self.background])
+            self.background_surface.blit(overlay, (0, 0))
+        return self.background_surface
+    
+    def render(self, surface, damage=None):
+        """Repaint the layer inside the damaged rects (everything when damage is None)."""
+        from services.theme_manager import get_theme_manager
+        generation = get_theme_manager().generation
+        if generation != self.theme_generation:
+            self.theme_generation = generation
+            self.background_surface = None
+            for widget in self.widgets:
+                widget.dirty = True
+        
+        previous_clip = surface.get_clip()
+        for rect in (damage or [self.rect]):
+            rect = rect.clip(self.rect)
+            if not rect.width or not rect.height:
+                continue
+            
+            surface.set_clip(rect)
+            if self.background and self.background_alpha is not None:
+                surface.blit(self.get_background(), rect, rect)
+            elif self.background:
+                surface.fill(settings.COLORS[self.background], rect)
+            for widget in sorted(self.index.query_rect(rect), key=self.order.get):
+                if widget.visible:
+                    surface.blit(widget.get_surface(), widget.rect)
+        surface.set_clip(previous_clip)
@@ -0,0 +1,27 @@
+"""
+Process-wide Font Registry so each (face, size) is parsed only once
+"""
+
+import pygame
+
+class FontRegistry:
+    def __init__(self):
+        self.fonts = {}
+        self.loads = 0
+    
+    def get(self, size, face=None):
+        key = (face, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(face, size)
+            self.fonts[key] = font
+            self.loads += 1
+        return font
+    
+    def clear(self):
+        self.fonts.clear()
+
+font_registry = FontRegistry()
+
+def get_font(size, face=None):
+    return font_registry.get(size, face)
@@ -0,0 +1,81 @@
+"""
+Adaptive Frame Scheduler driven by SYSTEM['PERFORMANCE_MODE']
+"""
+
+import math
+import time
+import pygame
+from config import settings
+
+MAX_FRAME_DT = 0.25
+
+class FrameScheduler:
+    def __init__(self, mode=None):
+        self.clock = pygame.time.Clock()
+        self.set_mode(mode or settings.SYSTEM['PERFORMANCE_MODE'])
+        
+        self.wakeup_at = None
+        self.last_frame = time.monotonic()
+        self.active_frames = 0
+        self.idle_frames = 0
+    
+    def set_mode(self, mode):
+        if mode not in settings.PERFORMANCE_MODES:
+            print(f"⚠️  Unknown performance mode '{mode}', using balanced")
+            mode = 'balanced'
+        
+        profile = settings.PERFORMANCE_MODES[mode]
+        self.mode = mode
+        self.fps_cap = min(settings.DISPLAY['FPS'], profile['FPS'])
+        self.idle_timeout = profile['IDLE_TIMEOUT']
+    
+    def request_wakeup(self, delay):
+        deadline = time.monotonic() + max(0.0, delay)
+        if self.wakeup_at is None or deadline < self.wakeup_at:
+            self.wakeup_at = deadline
+    
+    def wait_for_frame(self, animating, deadline=None):
+        """Block until the next frame is due and return (events, dt).
+        
+        While something is animating the loop runs at the mode's frame cap;
+        otherwise it sleeps in pygame.event.wait until input arrives, a
+        requested wakeup or the given monotonic deadline is due, or the
+        mode's idle timeout expires.
+        """
+        if deadline is not None:
+            self.request_wakeup(deadline - time.monotonic())
+        
+        if animating:
+            self.clock.tick(self.fps_cap)
+            events = pygame.event.get()
+            self.active_frames += 1
+        else:
+            timeout = self.idle_timeout
+            if self.wakeup_at is not None:
+                timeout = min(timeout, self.wakeup_at - time.monotonic())
+            
+            # Round up: waking a fraction of a millisecond early would only poll again.
+            timeout_ms = math.ceil(timeout * 1000)
+            if timeout_ms > 0:
+                event = pygame.event.wait(timeout_ms)
+                events = [] if event.type == pygame.NOEVENT else [event]
+                events.extend(pygame.event.get())
+            else:
+                events = pygame.event.get()
+            self.idle_frames += 1
+        
+        now = time.monotonic()
+        if self.wakeup_at is not None and now >= self.wakeup_at:
+            self.wakeup_at = None
+        
+        dt = min(now - self.last_frame, MAX_FRAME_DT)
+        self.last_frame = now
+        return events, dt
+    
+    def get_stats(self):
+        return {
+            'mode': self.mode,
+            'fps_cap': self.fps_cap,
+            'active_frames': self.active_frames,
+            'idle_frames': self.idle_frames,
+        }
@@ -0,0 +1,147 @@
+"""
+Zero-Copy Framebuffer Output for the Top (/dev/fb0) and Bottom (/dev/fb1) Panels
+"""
+
+import mmap
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pygame
+from config import gpio_pins
+
+class FramebufferDevice:
+    def __init__(self, path, width, height, bpp=None):
+        self.path = str(path)
+        self.width = width
+        self.height = height
+        self.bpp = bpp or self.read_sysfs('bits_per_pixel', 16)
+        if self.bpp not in (16, 32):
+            raise ValueError(f"Unsupported framebuffer depth: {self.bpp}bpp")
+        
+        self.stride = self.read_sysfs('stride', width * self.bpp // 8)
+        size = self.stride * height
+        
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if Path(self.path).is_file() and os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        
+        if self.bpp == 16:
+            self.pixels = np.ndarray((height, width), dtype=np.uint16, buffer=self.map,
+                                     strides=(self.stride, 2))
+            self.scratch = np.empty((height, width), dtype=np.uint16)
+            self.channel = np.empty((height, width), dtype=np.uint16)
+        else:
+            self.pixels = np.ndarray((height, width), dtype=np.uint32, buffer=self.map,
+                                     strides=(self.stride, 4))
+            self.channels = np.ndarray((height, width, 4), dtype=np.uint8, buffer=self.map,
+                                       strides=(self.stride, 4, 1))
+    
+    def read_sysfs(self, name, default):
+        device = Path(self.path).name
+        if not device.startswith('fb'):
+            return default
+        try:
+            return int((Path('/sys/class/graphics') / device / name).read_text().strip())
+        except (OSError, ValueError):
+            return default
+    
+    def write(self, surface, row_spans):
+        """Copy the given [y0, y1) row spans of surface into the mapped framebuffer."""
+        if self.bpp == 32 and surface.get_bitsize() == 32 and surface.get_masks()[:3] == (0xFF0000, 0xFF00, 0xFF):
+            source = pygame.surfarray.pixels2d(surface)
+            for y0, y1 in row_spans:
+                np.copyto(self.pixels[y0:y1], source[:, y0:y1].T, casting='unsafe')
+            del source
+            return
+        
+        source = pygame.surfarray.pixels3d(surface)
+        for y0, y1 in row_spans:
+            block = source[:, y0:y1].transpose(1, 0, 2)
+            if self.bpp == 16:
+                self.write_rgb565(block, y0, y1)
+            else:
+                self.channels[y0:y1, :, 0] = block[..., 2]
+                self.channels[y0:y1, :, 1] = block[..., 1]
+                self.channels[y0:y1, :, 2] = block[..., 0]
+        del source
+    
+    def write_rgb565(self, block, y0, y1):
+        out = self.scratch[y0:y1]
+        channel = self.channel[y0:y1]
+        
+        np.bitwise_and(block[..., 0], 0xF8, out=out)
+        np.left_shift(out, 8, out=out)
+        np.bitwise_and(block[..., 1], 0xFC, out=channel)
+        np.left_shift(channel, 3, out=channel)
+        np.bitwise_or(out, channel, out=out)
+        np.right_shift(block[..., 2], 3, out=channel)
+        np.bitwise_or(out, channel, out=self.pixels[y0:y1])
+    
+    def close(self):
+        self.pixels = None
+        self.channels = None
+        self.map.close()
+        os.close(self.fd)
+
+class FramebufferOutput:
+    def __init__(self, top_path=None, bottom_path=None):
+        top = gpio_pins.SCREENS['TOP_SCREEN']
+        bottom = gpio_pins.SCREENS['BOTTOM_SCREEN']
+        
+        self.top = FramebufferDevice(top_path or top['FRAMEBUFFER'], top['WIDTH'], top['HEIGHT'], top.get('BPP'))
+        self.bottom = FramebufferDevice(bottom_path or bottom['FRAMEBUFFER'], bottom['WIDTH'], bottom['HEIGHT'], bottom.get('BPP'))
+        self.rows_written = 0
+    
+    def present(self, top_surface, top_rects, bottom_surface, bottom_rects):
+        for device, surface, rects in ((self.top, top_surface, top_rects),
+                                       (self.bottom, bottom_surface, bottom_rects)):
+            spans = row_spans(rects, device.height)
+            if spans:
+                device.write(surface, spans)
+                self.rows_written += sum(y1 - y0 for y0, y1 in spans)
+    
+    def close(self):
+        self.top.close()
+        self.bottom.close()
+
+def row_spans(rects, height):
+    spans = sorted((max(0, r.top), min(height, r.bottom)) for r in rects if r.height > 0)
+    merged = []
+    for y0, y1 in spans:
+        if y1 <= y0:
+            continue
+        if merged and y0 <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], y1)
+        else:
+            merged.append([y0, y1])
+    return [tuple(span) for span in merged]
+
+def benchmark(path, width, height, bpp, frames=200):
+    surface = pygame.Surface((width, height))
+    device = FramebufferDevice(path, width, height, bpp)
+    full = [(0, height)]
+    
+    start = time.perf_counter()
+    for i in range(frames):
+        surface.fill((i % 256, 128, 255 - i % 256))
+        device.write(surface, full)
+    elapsed = time.perf_counter() - start
+    device.close()
+    
+    return {
+        'path': str(path),
+        'size': [width, height],
+        'bpp': bpp,
+        'frames': frames,
+        'ms_per_frame': elapsed / frames * 1000,
+    }
+
+if __name__ == '__main__':
+    if len(sys.argv) != 5:
+        print("Usage: python -m ui.framebuffer <file> <width> <height> <bpp>")
+        sys.exit(1)
+    print(benchmark(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])))
@@ -4,63 +4,238 @@ Dual Screen Manager for Top and Bottom Screens
 
 import pygame
 from config import settings
+from services.profiler import profiler
+from ui.timer_wheel import TimerWheel
+
+DIVIDER_HEIGHT = 20
+MAX_DAMAGE_RECTS = 16
 
 class ScreenManager:
-    def __init__(self):
+    def __init__(self, app_registry=None):
+        self.app_registry = app_registry
         self.top_width = settings.DISPLAY['TOP_WIDTH']
         self.top_height = settings.DISPLAY['TOP_HEIGHT']
         self.bottom_width = settings.DISPLAY['BOTTOM_WIDTH']
         self.bottom_height = settings.DISPLAY['BOTTOM_HEIGHT']
         
         window_width = max(self.top_width, self.bottom_width)
-        window_height = self.top_height + self.bottom_height + 20
+        window_height = self.top_height + self.bottom_height + DIVIDER_HEIGHT
         
-        self.window = pygame.display.set_mode((window_width, window_height))
-        pygame.display.set_caption("Gaming System")
+        self.window = None
+        self.open_display()
         
         self.top_surface = pygame.Surface((self.top_width, self.top_height))
         self.bottom_surface = pygame.Surface((self.bottom_width, self.bottom_height))
         
+        self.top_origin = ((window_width - self.top_width) // 2, 0)
+        self.bottom_origin = ((window_width - self.bottom_width) // 2, self.top_height + DIVIDER_HEIGHT)
+        
+        self.dirty_rects_enabled = settings.DISPLAY['DIRTY_RECTS']
+        self.damage = {'top': [], 'bottom': []}
+        self.full_redraw = True
+        self.overlay_rect = None
+        
+        from services.theme_manager import get_theme_manager
+        get_theme_manager().add_listener(self.invalidate_all)
+        
+        self.framebuffer = None
+        self.open_framebuffer()
+        
+        self.timers = TimerWheel()
+        
         from ui.screens.home import HomeScreen
-        self.current_screen = HomeScreen(self)
+        self.home_screen = HomeScreen(self)
+        self.current_screen = self.home_screen
         self.screen_stack = []
     
     def go_home(self):
-        from ui.screens.home import HomeScreen
+        if self.current_screen is self.home_screen and not self.screen_stack:
+            return
+        for screen in self.screen_stack + [self.current_screen]:
+            if screen is not self.home_screen:
+                self.timers.cancel_owner(screen)
         self.screen_stack.clear()
-        self.current_screen = HomeScreen(self)
+        self.current_screen = self.home_screen
+        self.invalidate_all()
     
     def push_screen(self, screen):
         if self.current_screen:
             self.screen_stack.append(self.current_screen)
         self.current_screen = screen
+        self.invalidate_all()
     
     def pop_screen(self):
         if self.screen_stack:
+            self.timers.cancel_owner(self.current_screen)
             self.current_screen = self.screen_stack.pop()
+            self.invalidate_all()
             return True
         return False
     
+    def mark_dirty(self, screen='both', rect=None):
+        """Report a changed region in surface coordinates; rect=None damages the whole surface."""
+        targets = ('top', 'bottom') if screen == 'both' else (screen,)
+        for target in targets:
+            bounds = self.top_surface.get_rect() if target == 'top' else self.bottom_surface.get_rect()
+            damaged = bounds if rect is None else pygame.Rect(rect).clip(bounds)
+            if damaged.width and damaged.height:
+                self.damage[target].append(damaged)
+    
+    def get_damage(self, screen):
+        return self.damage[screen]
+    
+    def to_bottom_local(self, pos):
+        """Translate a window position to bottom-screen coordinates, or None if it misses the screen."""
+        x = pos[0] - self.bottom_origin[0]
+        y = pos[1] - self.bottom_origin[1]
+        if 0 <= x <= self.bottom_width and 0 <= y <= self.bottom_height:
+            return (x, y)
+        return None
+    
+    def invalidate_all(self):
+        self.full_redraw = True
+    
+    def has_damage(self):
+        return self.full_redraw or bool(self.damage['top'] or self.damage['bottom'])
+    
+    def is_animating(self):
+        is_animating = getattr(self.current_screen, 'is_animating', None)
+        return bool(is_animating and is_animating())
+    
+    def next_deadline(self):
+        """Monotonic time the next frame is needed by a timer or the current screen, or None."""
+        deadlines = [self.timers.next_deadline()]
+        next_deadline = getattr(self.current_screen, 'next_deadline', None)
+        if next_deadline:
+            deadlines.append(next_deadline())
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return min(deadlines) if deadlines else None
+    
     def handle_event(self, event):
         if self.current_screen:
             self.current_screen.handle_event(event)
     
     def update(self, dt):
+        self.timers.advance()
         if self.current_screen:
-            self.current_screen.update(dt)
+            with profiler.section(f"{type(self.current_screen).__name__}.update"):
+                self.current_screen.update(dt)
     
     def render(self):
-        self.window.fill(settings.COLORS['BLACK'])
+        """Composite the current frame.
+        
+        Returns None when the whole window must be flipped, otherwise the
+        list of window rects to pass to pygame.display.update (possibly empty).
+        """
+        if not self.dirty_rects_enabled and not self.framebuffer:
+            self.mark_dirty()
+            self.render_screen()
+            self.render_full()
+            self.damage['top'].clear()
+            self.damage['bottom'].clear()
+            return None
+        
+        if self.full_redraw or not self.dirty_rects_enabled or not getattr(self.current_screen, 'tracks_damage', False):
+            self.mark_dirty()
         
+        if profiler.overlay_visible:
+            self.mark_dirty('top', self.overlay_rect)
+        
+        if not self.has_damage():
+            return []
+        
+        self.render_screen()
+        
+        if self.framebuffer:
+            self.framebuffer.present(self.top_surface, self.coalesce(self.damage['top']),
+                                     self.bottom_surface, self.coalesce(self.damage['bottom']))
+            self.full_redraw = False
+            self.damage['top'].clear()
+            self.damage['bottom'].clear()
+            return []
+        
+        if self.full_redraw:
+            self.render_full()
+            self.full_redraw = False
+            self.damage['top'].clear()
+            self.damage['bottom'].clear()
+            return [self.window.get_rect()]
+        
+        window_rects = []
+        for name, surface, origin in (('top', self.top_surface, self.top_origin),
+                                      ('bottom', self.bottom_surface, self.bottom_origin)):
+            for rect in self.coalesce(self.damage[name]):
+                dest = rect.move(origin)
+                self.window.blit(surface, dest, rect)
+                window_rects.append(dest)
+            self.damage[name].clear()
+        
+        return window_rects
+    
+    def render_screen(self):
         if self.current_screen:
-            self.current_screen.render(self.top_surface, self.bottom_surface)
+            with profiler.section(f"{type(self.current_screen).__name__}.render"):
+                self.current_screen.render(self.top_surface, self.bottom_surface)
         
-        top_x = (self.window.get_width() - self.top_width) // 2
-        self.window.blit(self.top_surface, (top_x, 0))
+        if profiler.overlay_visible:
+            self.overlay_rect = profiler.render_overlay(self.top_surface)
+            self.mark_dirty('top', self.overlay_rect)
+    
+    def render_full(self):
+        self.window.fill(settings.COLORS['BLACK'])
         
-        bottom_x = (self.window.get_width() - self.bottom_width) // 2
-        bottom_y = self.top_height + 20
-        self.window.blit(self.bottom_surface, (bottom_x, bottom_y))
+        self.window.blit(self.top_surface, self.top_origin)
+        self.window.blit(self.bottom_surface, self.bottom_origin)
         
         pygame.draw.rect(self.window, settings.COLORS['DARK'], 
-                        (0, self.top_height, self.window.get_width(), 20))
+                        (0, self.top_height, self.window.get_width(), DIVIDER_HEIGHT))
+    
+    def open_display(self):
+        window_width = max(self.top_width, self.bottom_width)
+        window_height = self.top_height + self.bottom_height + DIVIDER_HEIGHT
+        self.window = pygame.display.set_mode((window_width, window_height))
+        pygame.display.set_caption("Gaming System")
+    
+    def open_framebuffer(self):
+        if settings.DISPLAY['OUTPUT_BACKEND'] == 'framebuffer':
+            from ui.framebuffer import FramebufferOutput
+            self.framebuffer = FramebufferOutput()
+    
+    def suspend(self, release_display=True):
+        """Hand the display over to another process (e.g. a launched game)."""
+        self.close()
+        if release_display:
+            pygame.display.quit()
+            self.window = None
+        else:
+            pygame.display.iconify()
+    
+    def resume(self):
+        if self.window is None:
+            pygame.display.init()
+            self.open_display()
+        self.open_framebuffer()
+        pygame.event.clear()
+        self.invalidate_all()
+    
+    def close(self):
+        if self.framebuffer:
+            self.framebuffer.close()
+            self.framebuffer = None
+    
+    def coalesce(self, rects):
+        merged = []
+        for rect in rects:
+            rect = rect.copy()
+            i = 0
+            while i < len(merged):
+                if merged[i].colliderect(rect) or merged[i].contains(rect):
+                    rect.union_ip(merged.pop(i))
+                    i = 0
+                else:
+                    i += 1
+            merged.append(rect)
+        
+        if len(merged) > MAX_DAMAGE_RECTS:
+            return [merged[0].unionall(merged[1:])]
+        return merged
@@ -5,29 +5,70 @@ Home Screen with Status Bar and App Grid
 import pygame
 from datetime import datetime
 from config import settings
+from ui.fonts import get_font
+from ui.text_cache import render_text
+from services.profiler import profiler
+
+STATUS_BAR_HEIGHT = 30
+PREVIEW_RECT = (100, 100, 600, 300)
+GRID_START_Y = 40
+GRID_COLS = 3
+CELL_HEIGHT = 80
+SEARCH_LIMIT = 60
 
 class HomeScreen:
+    tracks_damage = True
+    
     def __init__(self, screen_manager):
         self.screen_manager = screen_manager
-        self.font_small = pygame.font.Font(None, settings.FONTS['SMALL'])
-        self.font_medium = pygame.font.Font(None, settings.FONTS['MEDIUM'])
-        self.font_large = pygame.font.Font(None, settings.FONTS['LARGE'])
-        self.font_title = pygame.font.Font(None, settings.FONTS['TITLE'])
+        self.font_small = get_font(settings.FONTS['SMALL'])
+        self.font_medium = get_font(settings.FONTS['MEDIUM'])
+        self.font_large = get_font(settings.FONTS['LARGE'])
+        self.font_title = get_font(settings.FONTS['TITLE'])
         
         self.selected_app = 0
         
         from services.app_registry import AppRegistry
+        from services.game_scanner import get_game_scanner
+        from services.prelaunch import get_prelaunch_warmer
+        from services.theme_manager import get_theme_manager
         from ui.widgets.quick_menu import QuickMenu
-        self.app_registry = AppRegistry()
-        self.apps = self.app_registry.get_all_apps()
+        from ui.widgets.keyboard import OnScreenKeyboard
+        self.app_registry = screen_manager.app_registry or AppRegistry()
+        self.game_scanner = get_game_scanner()
+        self.prelaunch_warmer = get_prelaunch_warmer()
+        if settings.SYSTEM['WATCH_GAMES']:
+            self.game_scanner.start_watching()
         self.quick_menu = QuickMenu(screen_manager)
+        self.keyboard = OnScreenKeyboard(screen_manager.bottom_width, screen_manager.bottom_height,
+                                         on_invalidate=lambda rect: self.screen_manager.mark_dirty('bottom', rect))
+        self.search_query = ""
+        self.theme_manager = get_theme_manager()
         
         self.scroll_offset = 0
+        self.visible_rows = (screen_manager.bottom_height - GRID_START_Y) // CELL_HEIGHT
+        self.library_version = None
+        self.apps = []
+        self.refresh_items()
+        self.time_text = datetime.now().strftime("%I:%M %p")
+        self.screen_manager.timers.register(60, self.refresh_clock, owner=self, align=True)
     
     def handle_event(self, event):
         if self.quick_menu.is_active():
             return self.quick_menu.handle_event(event)
         
+        if self.keyboard.visible:
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_b, pygame.K_ESCAPE):
+                self.keyboard.hide()
+                self.set_search_query("")
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+                self.keyboard.hide()
+            else:
+                self.keyboard.handle_event(event, *self.screen_manager.bottom_origin)
+            return
+        
+        previous_app = self.selected_app
+        
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_DOWN:
                 self.selected_app = min(self.selected_app + 3, len(self.apps) - 1)
@@ -39,23 +80,81 @@ class HomeScreen:
                 self.selected_app = min(self.selected_app + 1, len(self.apps) - 1)
             elif event.key == pygame.K_a or event.key == pygame.K_RETURN:
                 self.launch_selected_app()
+            elif event.key == pygame.K_w:
+                self.keyboard.show(self.search_query, callback=lambda text: self.screen_manager.mark_dirty('bottom'),
+                                   on_change=self.set_search_query)
         
         if event.type == pygame.MOUSEBUTTONDOWN:
             self.handle_touch(event.pos)
-    
-    def handle_touch(self, pos):
-        bottom_y_offset = self.screen_manager.top_height + 20
-        touch_y = pos[1] - bottom_y_offset
         
-        if touch_y < 0 or touch_y > self.screen_manager.bottom_height:
+        if self.selected_app != previous_app:
+            self.mark_selection_dirty(previous_app)
+            self.update_prewarm()
+    
+    def update_prewarm(self):
+        """Warm the highlighted game, or the most launched one while an app is highlighted."""
+        app = self.apps[self.selected_app] if 0 <= self.selected_app < len(self.apps) else None
+        if app and app.get('game'):
+            game = self.game_scanner.get_game(app['id'])
+        else:
+            game = self.prelaunch_warmer.predict(self.game_scanner.get_games())
+        self.prelaunch_warmer.select(game)
+    
+    def set_search_query(self, query):
+        self.search_query = query
+        self.selected_app = 0
+        self.scroll_offset = 0
+        self.refresh_items()
+    
+    def refresh_items(self):
+        """Rebuild the grid from the registered apps and the current game library,
+        filtered by the search query when one is set.
+        """
+        self.library_version = self.game_scanner.version
+        apps = self.app_registry.get_all_apps()
+        query = self.search_query.strip()
+        if query:
+            apps = [app for app in apps if query.lower() in app['name'].lower()]
+            games = self.game_scanner.search_games(query, SEARCH_LIMIT)
+        else:
+            games = self.game_scanner.get_games()
+        games = [{'id': game['id'], 'name': game['name'], 'icon': game.get('icon', '🎮'), 'game': True}
+                 for game in games]
+        self.apps = apps + games
+        self.selected_app = min(self.selected_app, max(len(self.apps) - 1, 0))
+        self.scroll_to_selection()
+        self.screen_manager.mark_dirty()
+        self.update_prewarm()
+    
+    def scroll_to_selection(self):
+        row = self.selected_app // GRID_COLS
+        if row < self.scroll_offset:
+            self.scroll_offset = row
+        elif row >= self.scroll_offset + self.visible_rows:
+            self.scroll_offset = row - self.visible_rows + 1
+        else:
+            return False
+        return True
+    
+    def mark_selection_dirty(self, previous_app):
+        self.screen_manager.mark_dirty('top', PREVIEW_RECT)
+        if self.scroll_to_selection():
+            self.screen_manager.mark_dirty('bottom')
             return
-        
-        window_width = self.screen_manager.window.get_width()
-        bottom_x_offset = (window_width - self.screen_manager.bottom_width) // 2
-        touch_x = pos[0] - bottom_x_offset
-        
-        if touch_x < 0 or touch_x > self.screen_manager.bottom_width:
+        self.screen_manager.mark_dirty('bottom', self.get_cell_rect(previous_app))
+        self.screen_manager.mark_dirty('bottom', self.get_cell_rect(self.selected_app))
+    
+    def get_cell_rect(self, index):
+        cell_width = self.screen_manager.bottom_width // GRID_COLS
+        row = index // GRID_COLS - self.scroll_offset
+        col = index % GRID_COLS
+        return pygame.Rect(col * cell_width, GRID_START_Y + row * CELL_HEIGHT, cell_width, CELL_HEIGHT)
+    
+    def handle_touch(self, pos):
+        local = self.screen_manager.to_bottom_local(pos)
+        if not local:
             return
+        touch_x, touch_y = local
         
         bar_height = 35
         if touch_y < bar_height:
@@ -72,15 +171,12 @@ class HomeScreen:
                 self.quick_menu.toggle()
             return
         
-        grid_start_y = 40
-        if touch_y > grid_start_y:
-            grid_cols = 3
-            cell_width = self.screen_manager.bottom_width // grid_cols
-            cell_height = 80
+        if touch_y > GRID_START_Y:
+            cell_width = self.screen_manager.bottom_width // GRID_COLS
             
-            col = touch_x // cell_width
-            row = (touch_y - grid_start_y) // cell_height
-            index = row * grid_cols + col
+            col = min(touch_x // cell_width, GRID_COLS - 1)
+            row = (touch_y - GRID_START_Y) // CELL_HEIGHT + self.scroll_offset
+            index = row * GRID_COLS + col
             
             if index < len(self.apps):
                 self.selected_app = index
@@ -91,90 +187,111 @@ class HomeScreen:
             app = self.apps[self.selected_app]
             print(f"Launching app: {app['name']}")
             
+            if app.get('game'):
+                self.game_scanner.launch_game(app['id'])
+                return
+            
             app_class = self.app_registry.get_app(app['id'])
             if app_class:
                 app_instance = app_class(self.screen_manager)
                 self.screen_manager.push_screen(app_instance)
     
+    def refresh_clock(self):
+        time_text = datetime.now().strftime("%I:%M %p")
+        if time_text != self.time_text:
+            self.time_text = time_text
+            if self.screen_manager.current_screen is self:
+                self.screen_manager.mark_dirty('top', (0, 0, self.screen_manager.top_width, STATUS_BAR_HEIGHT))
+    
     def update(self, dt):
-        pass
+        if self.library_version != self.game_scanner.version:
+            self.refresh_items()
     
     def render(self, top_surface, bottom_surface):
-        self.render_top_screen(top_surface)
-        self.render_bottom_screen(bottom_surface)
+        with profiler.section('HomeScreen.render_top_screen'):
+            self.render_top_screen(top_surface)
+        with profiler.section('HomeScreen.render_bottom_screen'):
+            self.render_bottom_screen(bottom_surface)
     
-    def render_top_screen(self, surface):
-        surface.fill(settings.COLORS['LIGHT'])
-        
-        status_bar_height = 30
+    def draw_top_chrome(self, surface):
         pygame.draw.rect(surface, settings.COLORS['PRIMARY'], 
-                        (0, 0, surface.get_width(), status_bar_height))
-        
-        now = datetime.now()
-        time_text = now.strftime("%I:%M %p")
-        time_surf = self.font_medium.render(time_text, True, settings.COLORS['WHITE'])
-        surface.blit(time_surf, (10, 5))
+                        (0, 0, surface.get_width(), STATUS_BAR_HEIGHT))
         
         wifi_text = "📶"
-        wifi_surf = self.font_medium.render(wifi_text, True, settings.COLORS['WHITE'])
+        wifi_surf = render_text(self.font_medium, wifi_text, settings.COLORS['WHITE'])
         surface.blit(wifi_surf, (surface.get_width() - 80, 5))
         
         bt_text = "🔵"
-        bt_surf = self.font_medium.render(bt_text, True, settings.COLORS['WHITE'])
+        bt_surf = render_text(self.font_medium, bt_text, settings.COLORS['WHITE'])
         surface.blit(bt_surf, (surface.get_width() - 40, 5))
+    
+    def draw_bottom_chrome(self, surface):
+        bar_height = 35
+        pygame.draw.rect(surface, settings.COLORS['DARK'], 
+                        (0, 0, surface.get_width(), bar_height))
+        
+        button_width = surface.get_width() // 4
+        buttons = ['👥', '🔔', '🌐', '☰']
+        for i, icon in enumerate(buttons):
+            text_surf = render_text(self.font_medium, icon, settings.COLORS['WHITE'])
+            text_rect = text_surf.get_rect(center=(button_width * i + button_width // 2, bar_height // 2))
+            surface.blit(text_surf, text_rect)
+    
+    def render_top_screen(self, surface):
+        background = self.theme_manager.get_background('home_top', surface.get_size(), 'LIGHT', self.draw_top_chrome)
+        surface.blit(background, (0, 0))
+        
+        time_surf = render_text(self.font_medium, self.time_text, settings.COLORS['WHITE'])
+        surface.blit(time_surf, (10, 5))
+        
+        if self.search_query:
+            query_surf = render_text(self.font_medium, f"🔍 {self.search_query}", settings.COLORS['DARK'])
+            surface.blit(query_surf, (PREVIEW_RECT[0], PREVIEW_RECT[1] - 40))
         
         if 0 <= self.selected_app < len(self.apps):
             app = self.apps[self.selected_app]
-            preview_rect = pygame.Rect(100, 100, 600, 300)
+            preview_rect = pygame.Rect(PREVIEW_RECT)
             pygame.draw.rect(surface, settings.COLORS['WHITE'], preview_rect)
             pygame.draw.rect(surface, settings.COLORS['PRIMARY'], preview_rect, 3)
             
-            icon_surf = self.font_title.render(app['icon'], True, settings.COLORS['PRIMARY'])
+            icon_surf = self.game_scanner.get_thumbnail(app['id']) if app.get('game') else None
+            if icon_surf is None:
+                icon_surf = render_text(self.font_title, app['icon'], settings.COLORS['PRIMARY'])
             icon_rect = icon_surf.get_rect(center=(preview_rect.centerx, preview_rect.centery - 40))
             surface.blit(icon_surf, icon_rect)
             
-            name_surf = self.font_large.render(app['name'], True, settings.COLORS['DARK'])
+            name_surf = render_text(self.font_large, app['name'], settings.COLORS['DARK'])
             name_rect = name_surf.get_rect(center=(preview_rect.centerx, preview_rect.centery + 40))
             surface.blit(name_surf, name_rect)
     
     def render_bottom_screen(self, surface):
-        surface.fill(settings.COLORS['SECONDARY'])
-        
         if self.quick_menu.is_active():
-            self.quick_menu.render(surface)
+            self.quick_menu.render(surface, self.screen_manager.get_damage('bottom'))
             return
         
-        bar_height = 35
-        pygame.draw.rect(surface, settings.COLORS['DARK'], 
-                        (0, 0, surface.get_width(), bar_height))
+        if self.keyboard.visible:
+            self.keyboard.render(surface, self.screen_manager.get_damage('bottom'))
+            return
         
-        button_width = surface.get_width() // 4
-        buttons = ['👥', '🔔', '🌐', '☰']
-        for i, icon in enumerate(buttons):
-            text_surf = self.font_medium.render(icon, True, settings.COLORS['WHITE'])
-            text_rect = text_surf.get_rect(center=(button_width * i + button_width // 2, bar_height // 2))
-            surface.blit(text_surf, text_rect)
+        background = self.theme_manager.get_background('home_bottom', surface.get_size(), 'SECONDARY', self.draw_bottom_chrome)
+        surface.blit(background, (0, 0))
         
-        grid_start_y = bar_height + 5
-        grid_cols = 3
-        cell_width = surface.get_width() // grid_cols
-        cell_height = 80
+        cell_width = surface.get_width() // GRID_COLS
+        first = self.scroll_offset * GRID_COLS
+        last = min(len(self.apps), first + (self.visible_rows + 1) * GRID_COLS)
         
-        for i, app in enumerate(self.apps):
-            row = i // grid_cols
-            col = i % grid_cols
-            
-            x = col * cell_width
-            y = grid_start_y + row * cell_height
+        for i in range(first, last):
+            app = self.apps[i]
+            x, y = self.get_cell_rect(i).topleft
             
             if i == self.selected_app:
                 pygame.draw.rect(surface, settings.COLORS['PRIMARY'], 
-                               (x + 2, y + 2, cell_width - 4, cell_height - 4), 3)
+                               (x + 2, y + 2, cell_width - 4, CELL_HEIGHT - 4), 3)
             
-            icon_surf = self.font_large.render(app['icon'], True, settings.COLORS['DARK'])
-            icon_rect = icon_surf.get_rect(center=(x + cell_width // 2, y + cell_height // 2 - 15))
+            icon_surf = render_text(self.font_large, app['icon'], settings.COLORS['DARK'])
+            icon_rect = icon_surf.get_rect(center=(x + cell_width // 2, y + CELL_HEIGHT // 2 - 15))
             surface.blit(icon_surf, icon_rect)
             
-            name_surf = self.font_small.render(app['name'], True, settings.COLORS['DARK'])
-            name_rect = name_surf.get_rect(center=(x + cell_width // 2, y + cell_height // 2 + 20))
+            name_surf = render_text(self.font_small, app['name'], settings.COLORS['DARK'])
+            name_rect = name_surf.get_rect(center=(x + cell_width // 2, y + CELL_HEIGHT // 2 + 20))
             surface.blit(name_surf, name_rect)
@@ -0,0 +1,69 @@
+"""
+Shared Text Surface Cache for Static Labels and Glyphs
+"""
+
+from collections import OrderedDict
+from config import settings
+
+class TextCache:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or settings.CACHE['TEXT_CACHE_BYTES']
+        self.entries = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def render(self, font, text, color, antialias=True):
+        """Return a rendered surface for text, rasterising it only on a cache miss.
+        
+        The font object identifies face and size, so callers must pass the same
+        Font instance for the same face/size to get cache hits.
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        size = self.surface_bytes(surface)
+        if size > self.max_bytes:
+            return surface
+        
+        self.entries[key] = surface
+        self.bytes_used += size
+        while self.bytes_used > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes_used -= self.surface_bytes(evicted)
+            self.evictions += 1
+        return surface
+    
+    def surface_bytes(self, surface):
+        return surface.get_pitch() * surface.get_height()
+    
+    def clear(self):
+        self.entries.clear()
+        self.bytes_used = 0
+    
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get_stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes_used,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+text_cache = TextCache()
+
+def render_text(font, text, color, antialias=True):
+    return text_cache.render(font, text, color, antialias)
@@ -0,0 +1,97 @@
+"""
+Hashed Timer Wheel for Periodic Widget Invalidation
+"""
+
+import time
+
+class Timer:
+    __slots__ = ('callback', 'interval', 'deadline', 'owner', 'repeat', 'cancelled', 'tick')
+    
+    def __init__(self, callback, interval, deadline, owner, repeat):
+        self.callback = callback
+        self.interval = interval
+        self.deadline = deadline
+        self.owner = owner
+        self.repeat = repeat
+        self.cancelled = False
+        self.tick = None
+    
+    def cancel(self):
+        self.cancelled = True
+
+class TimerWheel:
+    def __init__(self, tick=0.25, slots=256):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current_tick = self.tick_for(time.monotonic())
+        self.timers = set()
+    
+    def tick_for(self, deadline):
+        return int(deadline / self.tick)
+    
+    def register(self, interval, callback, owner=None, repeat=True, align=False):
+        """Call callback every interval seconds (once when repeat is False).
+        
+        align=True schedules the first call on the next wall-clock multiple of
+        interval, e.g. on the minute for a clock.
+        """
+        delay = interval - (time.time() % interval) if align else interval
+        timer = Timer(callback, interval, time.monotonic() + delay, owner, repeat)
+        self.schedule(timer)
+        self.timers.add(timer)
+        return timer
+    
+    def schedule(self, timer):
+        # A timer goes in the first tick that starts at or after its deadline,
+        # so it is always due by the time that slot is swept.
+        timer.tick = max(self.tick_for(timer.deadline) + 1, self.current_tick + 1)
+        self.slots[timer.tick % len(self.slots)].append(timer)
+    
+    def cancel(self, timer):
+        timer.cancel()
+        self.timers.discard(timer)
+    
+    def cancel_owner(self, owner):
+        for timer in [t for t in self.timers if t.owner is owner]:
+            self.cancel(timer)
+    
+    def advance(self, now=None):
+        """Fire every timer that is due and return how many fired."""
+        now = time.monotonic() if now is None else now
+        now_tick = self.tick_for(now)
+        if now_tick <= self.current_tick:
+            return 0
+        
+        ticks = min(now_tick - self.current_tick, len(self.slots))
+        due = []
+        for offset in range(1, ticks + 1):
+            slot = self.slots[(self.current_tick + offset) % len(self.slots)]
+            waiting = []
+            for timer in slot:
+                if timer.cancelled:
+                    continue
+                if timer.deadline <= now:
+                    due.append(timer)
+                else:
+                    waiting.append(timer)
+            slot[:] = waiting
+        self.current_tick = now_tick
+        
+        due.sort(key=lambda t: t.deadline)
+        for timer in due:
+            timer.callback()
+            if timer.repeat and not timer.cancelled:
+                timer.deadline = max(timer.deadline + timer.interval, now)
+                self.schedule(timer)
+            else:
+                self.timers.discard(timer)
+        return len(due)
+    
+    def next_deadline(self):
+        """Start of the earliest tick whose sweep will fire a timer.
+        
+        Timers fire when their slot is swept, not at their exact deadline,
+        so waking any earlier would only find nothing due.
+        """
+        ticks = [t.tick for t in self.timers if not t.cancelled]
+        return min(ticks) * self.tick if ticks else None
@@ -4,16 +4,21 @@ On-Screen Touch Keyboard Widget
 
 import pygame
 from config import settings
+from ui.fonts import get_font
+from ui.components.widgets import WidgetLayer, Label, Button
+
+KEY_HEIGHT = 28
 
 class OnScreenKeyboard:
-    def __init__(self, width, height):
+    def __init__(self, width, height, on_invalidate=None):
         self.width = width
         self.height = height
         self.visible = False
         self.text = ""
         self.callback = None
+        self.on_change = None
         
-        self.font = pygame.font.Font(None, 18)
+        self.font = get_font(18)
         
         self.keys = [
             ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
@@ -24,11 +29,32 @@ class OnScreenKeyboard:
         ]
         
         self.shift = False
+        
+        self.layer = WidgetLayer((width, height), background='DARK', on_invalidate=on_invalidate)
+        self.text_label = self.layer.add(Label((10, 10, width - 20, 20), "|", self.font))
+        self.key_buttons = {}
+        self.build_keys()
+    
+    def build_keys(self):
+        key_start_y = self.height - len(self.keys) * KEY_HEIGHT - 5
+        
+        for row_idx, row in enumerate(self.keys):
+            key_width = self.width // len(row)
+            y = key_start_y + row_idx * KEY_HEIGHT
+            
+            for key_idx, key in enumerate(row):
+                x = key_idx * key_width
+                button = Button((x + 2, y + 2, key_width - 4, KEY_HEIGHT - 4), key, self.font,
+                                on_press=lambda key=key: self.handle_key(key), border='WHITE')
+                self.key_buttons[key] = self.layer.add(button)
     
-    def show(self, initial_text="", callback=None):
+    def show(self, initial_text="", callback=None, on_change=None):
         self.visible = True
         self.text = initial_text
         self.callback = callback
+        self.on_change = on_change
+        self.text_label.set_text(self.text + "|")
+        self.layer.invalidate()
     
     def hide(self):
         self.visible = False
@@ -40,31 +66,15 @@ class OnScreenKeyboard:
             return False
         
         if event.type == pygame.MOUSEBUTTONDOWN:
-            touch_x = event.pos[0] - offset_x
-            touch_y = event.pos[1] - offset_y
-            
-            key_height = 28
-            key_start_y = self.height - len(self.keys) * key_height - 5
-            
-            if touch_y < key_start_y:
-                return True
-            
-            row_index = int((touch_y - key_start_y) / key_height)
-            if row_index < 0 or row_index >= len(self.keys):
-                return True
-            
-            row = self.keys[row_index]
-            key_width = self.width // len(row)
-            key_index = int(touch_x / key_width)
-            
-            if key_index >= 0 and key_index < len(row):
-                key = row[key_index]
-                self.handle_key(key)
-            
+            self.layer.press((event.pos[0] - offset_x, event.pos[1] - offset_y))
             return True
         
         return False
     
+    def get_key_center(self, key):
+        button = self.key_buttons.get(key)
+        return button.rect.center if button else None
+    
     def handle_key(self, key):
         if key == '⌫':
             self.text = self.text[:-1]
@@ -72,36 +82,18 @@ class OnScreenKeyboard:
             self.text += ' '
         elif key == '✓':
             self.hide()
+            return
         else:
             if self.shift:
                 key = key.upper()
             self.text += key
+        
+        self.text_label.set_text(self.text + "|")
+        if self.on_change:
+            self.on_change(self.text)
     
-    def render(self, surface):
+    def render(self, surface, damage=None):
         if not self.visible:
             return
         
-        bg_rect = pygame.Rect(0, 0, self.width, self.height)
-        pygame.draw.rect(surface, settings.COLORS['DARK'], bg_rect)
-        
-        text_surf = self.font.render(self.text + "|", True, settings.COLORS['WHITE'])
-        surface.blit(text_surf, (10, 10))
-        
-        key_height = 28
-        key_start_y = self.height - len(self.keys) * key_height - 5
-        
-        for row_idx, row in enumerate(self.keys):
-            key_width = self.width // len(row)
-            y = key_start_y + row_idx * key_height
-            
-            for key_idx, key in enumerate(row):
-                x = key_idx * key_width
-                
-                key_rect = pygame.Rect(x + 2, y + 2, key_width - 4, key_height - 4)
-                pygame.draw.rect(surface, settings.COLORS['SECONDARY'], key_rect)
-                pygame.draw.rect(surface, settings.COLORS['WHITE'], key_rect, 1)
-                
-                key_text = 'space' if key == 'space' else key
-                text_surf = self.font.render(key_text, True, settings.COLORS['WHITE'])
-                text_rect = text_surf.get_rect(center=key_rect.center)
-                surface.blit(text_surf, text_rect)
+        self.layer.render(surface, damage)